@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of Classifier.yaml"""
 
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def artifacts_list_file_callable(output_dir, inputs, stdout, stderr):
@@ -28,6 +29,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L312 of <nipype-install>/interfaces/fsl/fix.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outputs["artifacts_list_file"] = _gen_artifacts_list_file(
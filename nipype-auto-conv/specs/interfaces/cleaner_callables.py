@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of Cleaner.yaml"""
 
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def cleaned_functional_file_callable(output_dir, inputs, stdout, stderr):
@@ -30,6 +31,7 @@ def _get_cleaned_functional_filename(
 
 
 # Original source at L388 of <nipype-install>/interfaces/fsl/fix.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outputs["cleaned_functional_file"] = _get_cleaned_functional_filename(
@@ -4,6 +4,7 @@ import attrs
 import os
 import os.path as op
 from pathlib import Path
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def out_file_default(inputs):
@@ -27,6 +28,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1567 of <nipype-install>/interfaces/fsl/utils.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outfile = inputs.out_file
@@ -4,6 +4,7 @@ import attrs
 import os
 import os.path as op
 from pathlib import Path
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def distance_map_default(inputs):
@@ -34,6 +35,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1519 of <nipype-install>/interfaces/fsl/dti.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     _si = inputs
@@ -2,6 +2,7 @@
 
 import attrs
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def out_dir_default(inputs):
@@ -22,6 +23,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L2190 of <nipype-install>/interfaces/fsl/model.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     if inputs.out_dir is not attrs.NOTHING:
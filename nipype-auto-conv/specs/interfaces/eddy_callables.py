@@ -2,6 +2,7 @@
 
 import attrs
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def out_cnr_maps_callable(output_dir, inputs, stdout, stderr):
@@ -115,6 +116,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1008 of <nipype-install>/interfaces/fsl/epi.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outputs["out_corrected"] = os.path.abspath("%s.nii.gz" % inputs.out_base)
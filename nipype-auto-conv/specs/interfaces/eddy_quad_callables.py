@@ -3,6 +3,7 @@
 import attrs
 import os
 from glob import glob
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def avg_b0_pe_png_callable(output_dir, inputs, stdout, stderr):
@@ -67,6 +68,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1673 of <nipype-install>/interfaces/fsl/epi.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     from glob import glob
 
@@ -2,6 +2,7 @@
 
 import attrs
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def epi2str_inv_callable(output_dir, inputs, stdout, stderr):
@@ -108,6 +109,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1271 of <nipype-install>/interfaces/fsl/epi.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outputs["out_file"] = os.path.join(output_dir, inputs.out_base + ".nii.gz")
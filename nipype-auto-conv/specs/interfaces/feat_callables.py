@@ -2,6 +2,7 @@
 
 import os
 from glob import glob
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def feat_dir_callable(output_dir, inputs, stdout, stderr):
@@ -17,6 +18,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L465 of <nipype-install>/interfaces/fsl/model.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     is_ica = False
@@ -2,6 +2,7 @@
 
 import os
 from glob import glob
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def con_file_callable(output_dir, inputs, stdout, stderr):
@@ -51,6 +52,7 @@ def _get_design_root(infile, inputs=None, stdout=None, stderr=None, output_dir=N
 
 
 # Original source at L538 of <nipype-install>/interfaces/fsl/model.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     # TODO: figure out file names and get rid off the globs
     outputs = {}
@@ -2,6 +2,7 @@
 
 import attrs
 import os.path as op
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def bvars_callable(output_dir, inputs, stdout, stderr):
@@ -80,6 +81,7 @@ def _gen_mesh_names(
 
 
 # Original source at L2230 of <nipype-install>/interfaces/fsl/preprocess.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
 
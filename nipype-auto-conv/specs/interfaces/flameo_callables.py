@@ -4,6 +4,7 @@ import attrs
 import os
 import re
 from glob import glob
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def copes_callable(output_dir, inputs, stdout, stderr):
@@ -96,6 +97,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1143 of <nipype-install>/interfaces/fsl/model.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     pth = os.path.join(output_dir, inputs.log_dir)
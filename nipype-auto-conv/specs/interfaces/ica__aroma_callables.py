@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of ICA_AROMA.yaml"""
 
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def aggr_denoised_file_callable(output_dir, inputs, stdout, stderr):
@@ -30,6 +31,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L151 of <nipype-install>/interfaces/fsl/aroma.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outputs["out_dir"] = os.path.abspath(inputs.out_dir)
@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of L2Model.yaml"""
 
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def design_con_callable(output_dir, inputs, stdout, stderr):
@@ -25,6 +26,7 @@ def design_mat_callable(output_dir, inputs, stdout, stderr):
 
 
 # Original source at L1431 of <nipype-install>/interfaces/fsl/model.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     for field in list(outputs.keys()):
@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of Level1Design.yaml"""
 
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def ev_files_callable(output_dir, inputs, stdout, stderr):
@@ -27,6 +28,7 @@ def _format_session_info(
 
 
 # Original source at L414 of <nipype-install>/interfaces/fsl/model.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     cwd = output_dir
@@ -3,6 +3,7 @@
 import attrs
 import os.path as op
 from pathlib import Path
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def projected_data_callable(output_dir, inputs, stdout, stderr):
@@ -25,6 +26,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L1445 of <nipype-install>/interfaces/fsl/dti.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     _si = inputs
@@ -2,6 +2,7 @@
 
 import attrs
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def trained_wts_file_callable(output_dir, inputs, stdout, stderr):
@@ -17,6 +18,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L200 of <nipype-install>/interfaces/fsl/fix.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     if inputs.trained_wts_filestem is not attrs.NOTHING:
@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of TrainingSetCreator.yaml"""
 
 import os
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def mel_icas_out_callable(output_dir, inputs, stdout, stderr):
@@ -11,6 +12,7 @@ def mel_icas_out_callable(output_dir, inputs, stdout, stderr):
 
 
 # Original source at L122 of <nipype-install>/interfaces/fsl/fix.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     mel_icas = []
     for item in inputs.mel_icas_in:
@@ -1,6 +1,7 @@
 """Module to put any functions that are referred to in the "callables" section of WarpPointsFromStd.yaml"""
 
 import os.path as op
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def out_file_callable(output_dir, inputs, stdout, stderr):
@@ -16,6 +17,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L2744 of <nipype-install>/interfaces/fsl/utils.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     outputs = {}
     outputs["out_file"] = op.abspath("stdout.nipype")
@@ -4,6 +4,7 @@ import attrs
 import logging
 import os
 import os.path as op
+from pydra.tasks.fsl.outputs import cache_outputs
 
 
 def out_file_callable(output_dir, inputs, stdout, stderr):
@@ -117,6 +118,7 @@ def _gen_filename(name, inputs=None, stdout=None, stderr=None, output_dir=None):
 
 
 # Original source at L891 of <nipype-install>/interfaces/base/core.py
+@cache_outputs
 def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
     metadata = dict(name_source=lambda t: t is not None)
     traits = inputs.traits(**metadata)
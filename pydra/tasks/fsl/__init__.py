@@ -4,8 +4,13 @@ imported.
 
 >>> import pydra.engine
 >>> import pydra.tasks.fsl
+
+Tasks of the latest supported version of FSL are loaded lazily upon first access:
+
+>>> from pydra.tasks.fsl import BET, FSLMerge
 """
 
+import importlib
 from warnings import warn
 from pathlib import Path
 
@@ -36,3 +41,18 @@ if "nipype" not in __version__:
 
 
 __all__ = ["__version__"]
+
+
+def __getattr__(name):
+    # Expose the tasks of the latest version without importing them upfront (PEP 562).
+    latest = importlib.import_module(".latest", __name__)
+    if name in latest.__all__:
+        value = getattr(latest, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    latest = importlib.import_module(".latest", __name__)
+    return sorted(set(globals()) | set(latest.__all__))
@@ -0,0 +1,82 @@
+"""
+Backends
+========
+
+Dispatch of FSL tasks to their in-process backends.
+
+Tasks whose ``backend`` input is set to ``numpy`` evaluate their operation in-process,
+with the implementations of :mod:`pydra.tasks.fsl.native`, instead of running their
+executable. Their command line is kept as the reference of what they compute, and their
+outputs are collected the same way, from the files they write and the standard output
+they return. Images whose templates lack an extension are given the one of the output
+type before running, as FSL tools do, so that both backends write them, and pydra
+collects them, at the same path.
+
+Examples
+--------
+
+>>> import attrs
+>>> is_set(attrs.NOTHING), is_set(None), is_set(0)
+(False, False, True)
+>>> value_or_none(attrs.NOTHING) is None
+True
+"""
+
+__all__ = ["NativeBackendMixin", "is_set", "value_or_none"]
+
+import os
+import typing as ty
+from pathlib import Path
+
+import attrs
+
+from .environment import OUTPUT_TYPES, output_type, output_type_to_ext
+
+
+def is_set(value) -> bool:
+    """Whether an input is set, as opposed to unset or None."""
+    return value is not None and value is not attrs.NOTHING
+
+
+def value_or_none(value):
+    """Return the value of an input, None if unset."""
+    return value if is_set(value) else None
+
+
+class NativeBackendMixin:
+    """Run a task in-process when its ``backend`` input is set to ``numpy``.
+
+    To be placed after :class:`pydra.tasks.fsl.trace.TraceMixin`, so that in-process
+    runs are traced as executions, and before
+    :class:`pydra.tasks.fsl.usage.ResourceUsageMixin` in the bases of tasks, which
+    implement :meth:`_run_native`.
+    """
+
+    #: templated outputs which are images, written with the extension of the output
+    #: type when their template lacks one
+    image_outputs: ty.Tuple[str, ...] = ()
+
+    def _modify_inputs(self):
+        orig_inputs = super()._modify_inputs()
+        for name in self.image_outputs:
+            value = getattr(self.inputs, name)
+            if isinstance(value, (str, os.PathLike)):
+                path = os.fspath(value)
+                if not path.endswith(tuple(OUTPUT_TYPES.values())):
+                    path += output_type_to_ext(output_type())
+                    setattr(self.inputs, name, type(value)(path))
+        return orig_inputs
+
+    def _run_task(self, *args, **kwargs):
+        if self.inputs.backend != "numpy":
+            return super()._run_task(*args, **kwargs)
+        stdout = self._run_native()
+        self.output_ = {"return_code": 0, "stdout": stdout or "", "stderr": ""}
+
+    def _run_native(self) -> ty.Optional[str]:
+        """Run the task in-process, returning its standard output, if any."""
+        raise NotImplementedError
+
+    def _output_path(self, name: str) -> Path:
+        """Return the path of a templated output, as resolved for this run."""
+        return Path(self.output_dir) / getattr(self.inputs, name)
@@ -0,0 +1,346 @@
+"""
+Compression
+===========
+
+Per-node output types, so that images only read by other nodes of a workflow are
+written uncompressed, and only the outputs of the workflow are compressed.
+
+FSL tools write images in the format set by ``$FSLOUTPUTTYPE``, whatever the extension
+of the output paths they are given. Tasks may override it with their own
+``output_type`` input, which is part of their checksum. It is passed to the tool as
+``FSLOUTPUTTYPE`` in its environment, overrides
+:func:`pydra.tasks.fsl.environment.output_type` for the output callables and numpy
+backends while the task runs, and replaces the extension of the images of its templated
+outputs. The environment of the process is left untouched.
+
+FSL compresses images on a single core. When ``PYDRA_FSL_COMPRESSION_THREADS`` is set
+to a number of threads, tasks writing ``NIFTI_GZ`` images have the tool write them
+uncompressed instead, then compress them with :func:`compress` across threads, as pigz
+does, before collecting their outputs. Compressed images are single gzip members,
+readable by FSL, nibabel and any gzip reader.
+
+:func:`set_output_types` sets the output type of the nodes of a workflow: ``NIFTI`` for
+nodes whose outputs only feed other nodes, and ``NIFTI_GZ`` for nodes producing outputs
+of the workflow.
+
+Examples
+--------
+
+>>> import pydra
+>>> from pydra.tasks.fsl.v6_0.maths import Mul, Threshold
+>>> wf = pydra.Workflow(name="wf", input_spec=["image", "mask"])
+>>> wf.add(Threshold(name="threshold", input_image=wf.lzin.image, threshold=0.5))
+<pydra.engine.core.Workflow object at ...>
+>>> wf.add(
+...     Mul(
+...         name="mask",
+...         input_image=wf.threshold.lzout.output_image,
+...         other_image=wf.lzin.mask,
+...     )
+... )
+<pydra.engine.core.Workflow object at ...>
+>>> wf.set_output([("masked", wf.mask.lzout.output_image)])
+>>> set_output_types(wf)
+{'threshold': 'NIFTI', 'mask': 'NIFTI_GZ'}
+
+>>> with_output_type("/tmp/image.nii.gz", "NIFTI")
+'/tmp/image.nii'
+
+>>> import gzip, tempfile
+>>> from pathlib import Path
+>>> path = Path(tempfile.mkdtemp()) / "image.nii"
+>>> _ = path.write_bytes(bytes(range(256)) * 2**14)
+>>> output = compress(path, threads=4, block_size=2**20)
+>>> output.name, path.exists()
+('image.nii.gz', False)
+>>> gzip.decompress(output.read_bytes()) == bytes(range(256)) * 2**14
+True
+"""
+
+__all__ = [
+    "BLOCK_SIZE",
+    "OutputTypeMixin",
+    "OutputTypeSpec",
+    "compress",
+    "compression_threads",
+    "set_output_types",
+    "with_output_type",
+]
+
+import collections
+import os
+import struct
+import typing as ty
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import attrs
+
+import pydra
+
+from .environment import OUTPUT_TYPES, output_type_to_ext, use_output_type
+
+# Longest extensions first, so that .nii.gz is not mistaken for .gz.
+_EXTENSIONS = sorted(OUTPUT_TYPES.values(), key=len, reverse=True)
+
+#: Size of the blocks of uncompressed data compressed by each thread.
+BLOCK_SIZE = 2**20
+
+# Blocks are primed with the end of the previous block, as deflate looks back 32 KiB.
+_WINDOW = 2**15
+
+# Header of a gzip member (deflate, no name, no modification time, Unix).
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\x03"
+
+
+def with_output_type(path: str, output_type: str) -> str:
+    """Replace the extension of an image with the one of an FSL output type.
+
+    Paths without the extension of an image are returned unchanged.
+    """
+    for ext in _EXTENSIONS:
+        if path.endswith(ext):
+            return path[: -len(ext)] + output_type_to_ext(output_type)
+    return path
+
+
+def compression_threads() -> ty.Optional[int]:
+    """Return the threads set by ``$PYDRA_FSL_COMPRESSION_THREADS``, None if unset."""
+    threads = os.getenv("PYDRA_FSL_COMPRESSION_THREADS")
+    return int(threads) if threads and int(threads) > 0 else None
+
+
+def _deflate(block: bytes, previous: bytes, level: int, last: bool) -> bytes:
+    compressor = zlib.compressobj(
+        level,
+        zlib.DEFLATED,
+        -zlib.MAX_WBITS,
+        **({"zdict": previous} if previous else {}),
+    )
+    # Blocks other than the last end on a byte boundary, without closing the stream.
+    return compressor.compress(block) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    )
+
+
+def compress(
+    path: os.PathLike,
+    threads: ty.Optional[int] = None,
+    level: int = 6,
+    block_size: int = BLOCK_SIZE,
+) -> Path:
+    """Compress a file with gzip across threads, replacing it.
+
+    Blocks of the file are deflated in parallel, each primed with the end of the
+    previous one, into a single gzip member, as pigz does. Blocks are read and written
+    as they are compressed, so that memory is bounded by a few blocks per thread.
+
+    Parameters
+    ----------
+    path : path-like
+        File to compress.
+    threads : int, optional
+        Number of threads, the number of CPUs by default.
+    level : int
+        Compression level, from 1 (fastest) to 9 (smallest).
+    block_size : int
+        Size of the blocks compressed by each thread.
+
+    Returns
+    -------
+    Path
+        Compressed file, the path of the original file with a ``.gz`` suffix.
+    """
+    path = Path(path)
+    output = path.with_name(path.name + ".gz")
+    threads = threads or os.cpu_count() or 1
+    crc, size = 0, 0
+    with open(path, "rb") as src, open(output, "wb") as dst, ThreadPoolExecutor(
+        threads
+    ) as pool:
+        dst.write(_GZIP_HEADER)
+        pending = collections.deque()
+        previous, block = b"", src.read(block_size)
+        while True:
+            following = src.read(block_size)
+            crc, size = zlib.crc32(block, crc), size + len(block)
+            pending.append(
+                pool.submit(_deflate, block, previous[-_WINDOW:], level, not following)
+            )
+            while len(pending) > 2 * threads or (pending and not following):
+                dst.write(pending.popleft().result())
+            if not following:
+                break
+            previous, block = block, following
+        dst.write(struct.pack("<II", crc & 0xFFFFFFFF, size & 0xFFFFFFFF))
+    path.unlink()
+    return output
+
+
+@attrs.define(slots=False, kw_only=True)
+class OutputTypeSpec(pydra.specs.ShellSpec):
+    """Specifications of the output type of a task."""
+
+    output_type: ty.Optional[str] = attrs.field(
+        default=None,
+        metadata={
+            "help_string": "output type of the images, $FSLOUTPUTTYPE if None",
+            "allowed_values": {None, *OUTPUT_TYPES},
+        },
+    )
+
+
+def _with_output_type(
+    spec: ty.Optional[pydra.specs.SpecInfo],
+) -> pydra.specs.SpecInfo:
+    spec = spec or pydra.specs.SpecInfo(name="Input", fields=[])
+    bases = spec.bases or ()
+    if any(issubclass(base, OutputTypeSpec) for base in bases):
+        return spec
+    # OutputTypeSpec already derives from ShellSpec.
+    bases = tuple(base for base in bases if base is not pydra.specs.ShellSpec)
+    return pydra.specs.SpecInfo(
+        name=spec.name, fields=spec.fields, bases=(*bases, OutputTypeSpec)
+    )
+
+
+class OutputTypeMixin:
+    """Write the images of a task in its own output type, when set.
+
+    To be placed before :class:`pydra.engine.ShellCommandTask` and the other mixins
+    setting the environment of the tool in the bases of tasks, whose input
+    specifications are extended with :class:`OutputTypeSpec`.
+    """
+
+    # Whether images of the current run are compressed after it.
+    _compress = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.input_spec = _with_output_type(cls.input_spec)
+
+    def __init__(self, *args, **kwargs):
+        # Specifications given to instances, e.g. by MathsChain, are extended as well.
+        if kwargs.get("input_spec") is not None:
+            kwargs["input_spec"] = _with_output_type(kwargs["input_spec"])
+        super().__init__(*args, **kwargs)
+
+    @property
+    def _tool_output_type(self) -> ty.Optional[str]:
+        # Output type the tool writes images in, $FSLOUTPUTTYPE if None.
+        if self._compress:
+            return "NIFTI"
+        return self.inputs.output_type
+
+    def _run(self, *args, **kwargs):
+        output_type = kwargs.get("output_type", self.inputs.output_type)
+        # Compressed images are written uncompressed, then compressed across threads.
+        self._compress = compression_threads() is not None and (
+            (output_type or os.getenv("FSLOUTPUTTYPE")) == "NIFTI_GZ"
+        )
+        try:
+            with use_output_type("NIFTI" if self._compress else output_type):
+                return super()._run(*args, **kwargs)
+        finally:
+            self._compress = False
+
+    def command_args(self, root=None):
+        args = super().command_args(root=root)
+        output_type = self._tool_output_type
+        if output_type is None:
+            return args
+        variable = f"FSLOUTPUTTYPE={output_type}"
+        # Variables of other mixins, e.g. OMP_NUM_THREADS, are set by the same env.
+        if args[0] == "env":
+            return ["env", variable, *args[1:]]
+        return ["env", variable, *args]
+
+    def _set_output_type(self, output_type: str):
+        # Templated outputs are resolved by now, into the paths given to the tool.
+        for field in attrs.fields(type(self.inputs)):
+            value = getattr(self.inputs, field.name)
+            if field.metadata.get("output_file_template") and isinstance(
+                value, (str, os.PathLike)
+            ):
+                path = with_output_type(os.fspath(value), output_type)
+                setattr(self.inputs, field.name, type(value)(path))
+
+    def _modify_inputs(self):
+        orig_inputs = super()._modify_inputs()
+        if self._tool_output_type is not None:
+            self._set_output_type(self._tool_output_type)
+        if self._compress:
+            # Images already there, e.g. inputs copied by pydra, are left untouched.
+            self._existing = set(_images(self.output_dir))
+        return orig_inputs
+
+    def _collect_outputs(self, *args, **kwargs):
+        if not self._compress:
+            return super()._collect_outputs(*args, **kwargs)
+        threads = compression_threads()
+        for path in _images(self.output_dir):
+            if path not in self._existing:
+                compress(path, threads=threads)
+        # Outputs are resolved, by templates and callables, as compressed images.
+        self._set_output_type("NIFTI_GZ")
+        with use_output_type("NIFTI_GZ"):
+            return super()._collect_outputs(*args, **kwargs)
+
+
+def _images(directory: os.PathLike) -> ty.Iterator[Path]:
+    # Uncompressed images of a directory, including those of its subdirectories.
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith(".nii"):
+                yield Path(root) / name
+
+
+def set_output_types(
+    wf: pydra.Workflow, intermediate: str = "NIFTI", final: str = "NIFTI_GZ"
+) -> ty.Dict[str, str]:
+    """Set the output type of the nodes of a workflow, by their use.
+
+    Parameters
+    ----------
+    wf : pydra.Workflow
+        Workflow whose outputs are set.
+    intermediate : str
+        Output type of nodes whose outputs only feed other nodes.
+    final : str
+        Output type of nodes producing outputs of the workflow.
+
+    Returns
+    -------
+    dict
+        Output type of each FSL task, by node name, nested workflows included.
+    """
+    # Invalid output types are rejected before any node is set.
+    for output_type in (intermediate, final):
+        output_type_to_ext(output_type)
+    return _set_output_types(wf, intermediate, final, is_final=True)
+
+
+def _set_output_types(wf, intermediate, final, is_final):
+    # Nodes producing outputs of a workflow only produce final outputs if the workflow
+    # itself does, nested workflows producing outputs of the workflow which uses them.
+    producers = set()
+    if is_final:
+        producers = {
+            connection.name
+            for _, connection in wf._connections or ()
+            if isinstance(connection, pydra.engine.specs.LazyOutField)
+        }
+
+    output_types = {}
+    for node in wf.nodes:
+        node_is_final = node.name in producers
+        if isinstance(node, pydra.Workflow):
+            output_types.update(
+                _set_output_types(node, intermediate, final, node_is_final)
+            )
+        # FSL tasks, as opposed to function tasks which follow $FSLOUTPUTTYPE.
+        elif hasattr(node, "_set_output_type"):
+            node.inputs.output_type = final if node_is_final else intermediate
+            output_types[node.name] = node.inputs.output_type
+    return output_types
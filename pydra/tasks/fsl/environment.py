@@ -0,0 +1,172 @@
+"""
+Environment
+===========
+
+Process-wide registry of the FSL installation in use.
+
+The FSL version (read from ``$FSLDIR/etc/fslversion``), the output type
+(``$FSLOUTPUTTYPE``) and the listing of standard images (``$FSLDIR/data/standard``)
+are resolved once per process and cached on the value of the environment variables
+they depend upon, so that changing ``FSLDIR`` or ``FSLOUTPUTTYPE`` invalidates them.
+
+The output type may be overridden within a block with :func:`use_output_type`, e.g. by
+tasks writing images in their own output type, without changing the environment of the
+process, which concurrent tasks share.
+
+Examples
+--------
+
+>>> output_type_to_ext("NIFTI_GZ")
+'.nii.gz'
+>>> import os
+>>> os.environ["FSLOUTPUTTYPE"] = "NIFTI_PAIR"
+>>> Info.output_type()
+'NIFTI_PAIR'
+>>> with use_output_type("NIFTI_GZ"):
+...     output_type()
+'NIFTI_GZ'
+>>> output_type()
+'NIFTI_PAIR'
+>>> del os.environ["FSLOUTPUTTYPE"]
+"""
+
+__all__ = [
+    "Info",
+    "OUTPUT_TYPES",
+    "clear_cache",
+    "fsl_dir",
+    "fsl_version",
+    "output_type",
+    "output_type_to_ext",
+    "standard_image",
+    "use_output_type",
+]
+
+import contextlib
+import contextvars
+import functools
+import os
+import typing as ty
+from glob import glob
+from warnings import warn
+
+#: Mapping between FSL output types and their file extension.
+OUTPUT_TYPES = {
+    "NIFTI": ".nii",
+    "NIFTI_PAIR": ".img",
+    "NIFTI_GZ": ".nii.gz",
+    "NIFTI_PAIR_GZ": ".img.gz",
+}
+
+DEFAULT_OUTPUT_TYPE = "NIFTI"
+
+# Output type overriding $FSLOUTPUTTYPE in the current thread or coroutine, if any.
+_output_type = contextvars.ContextVar("output_type", default=None)
+
+
+def fsl_dir() -> ty.Optional[str]:
+    """Return the root directory of the FSL installation, if any."""
+    return os.getenv("FSLDIR") or None
+
+
+@functools.lru_cache(maxsize=None)
+def _read_version(version_file: str) -> ty.Optional[str]:
+    try:
+        with open(version_file, "rt") as f:
+            return f.readline().strip() or None
+    except OSError:
+        return None
+
+
+def fsl_version() -> ty.Optional[str]:
+    """Return the version of FSL found in ``$FSLDIR/etc/fslversion``, if any."""
+    fsldir = fsl_dir()
+    if fsldir is None:
+        return None
+    return _read_version(os.path.join(fsldir, "etc", "fslversion"))
+
+
+@functools.lru_cache(maxsize=None)
+def _check_output_type(value: ty.Optional[str]) -> str:
+    # Only warn once per process about a missing FSLOUTPUTTYPE.
+    if value is None:
+        warn(
+            "FSLOUTPUTTYPE environment variable is not set. "
+            f"Setting FSLOUTPUTTYPE={DEFAULT_OUTPUT_TYPE}"
+        )
+        return DEFAULT_OUTPUT_TYPE
+    return value
+
+
+def output_type() -> str:
+    """Return the FSL output type set by ``$FSLOUTPUTTYPE`` (NIFTI if unset).
+
+    Overridden within :func:`use_output_type` blocks.
+    """
+    return _output_type.get() or _check_output_type(os.getenv("FSLOUTPUTTYPE"))
+
+
+@contextlib.contextmanager
+def use_output_type(output_type: ty.Optional[str]):
+    """Override ``$FSLOUTPUTTYPE`` within a block, unless None."""
+    token = _output_type.set(output_type or _output_type.get())
+    try:
+        yield
+    finally:
+        _output_type.reset(token)
+
+
+def output_type_to_ext(output_type: str) -> str:
+    """Return the file extension corresponding to an FSL output type."""
+    try:
+        return OUTPUT_TYPES[output_type]
+    except KeyError:
+        raise KeyError(f"Invalid FSLOUTPUTTYPE: {output_type}")
+
+
+@functools.lru_cache(maxsize=None)
+def _list_standard_images(stdpath: str) -> ty.Tuple[str, ...]:
+    return tuple(
+        filename.replace(stdpath + "/", "")
+        for filename in glob(os.path.join(stdpath, "*nii*"))
+    )
+
+
+def standard_image(img_name: ty.Optional[str] = None):
+    """Return the path to a standard image, or list all of them if no name is given."""
+    fsldir = fsl_dir()
+    if fsldir is None:
+        raise Exception("FSL environment variables not set")
+    stdpath = os.path.join(fsldir, "data", "standard")
+    if img_name is None:
+        return list(_list_standard_images(stdpath))
+    return os.path.join(stdpath, img_name)
+
+
+def clear_cache():
+    """Discard cached values, e.g. after updating an FSL installation in place."""
+    _read_version.cache_clear()
+    _check_output_type.cache_clear()
+    _list_standard_images.cache_clear()
+
+
+class Info:
+    """Version and output type information, compatible with Nipype's ``fsl.Info``."""
+
+    ftypes = OUTPUT_TYPES
+
+    @staticmethod
+    def version() -> ty.Optional[str]:
+        return fsl_version()
+
+    @staticmethod
+    def output_type() -> str:
+        return output_type()
+
+    @staticmethod
+    def output_type_to_ext(output_type: str) -> str:
+        return output_type_to_ext(output_type)
+
+    @staticmethod
+    def standard_image(img_name: ty.Optional[str] = None):
+        return standard_image(img_name)
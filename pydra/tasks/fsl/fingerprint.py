@@ -0,0 +1,230 @@
+"""
+Fingerprint
+===========
+
+Fingerprints of large image files, used in place of full content hashes.
+
+Three strategies trade certainty for speed, selected with ``PYDRA_FSL_FINGERPRINT``:
+
+``full`` (default)
+    Digest of the whole content, read and hashed in chunks by parallel threads.
+``sampled``
+    Digest of the size, the first block (holding the header), the last block and
+    evenly spaced blocks in between, reading a fixed amount of data whatever the size.
+``stat``
+    Digest of the path, inode, size and modification time, without reading the file.
+
+Contents are hashed with XXH3, a fast non-cryptographic hash, when ``xxhash`` is
+installed (with the ``fingerprint`` extra), and with BLAKE2 from the standard library
+otherwise. Fingerprints only need to tell apart the versions of files, not to resist
+tampering, but their hash is part of their index key, so that fingerprints computed
+with either hash are never mixed up.
+
+Fingerprints are memoized by each process, and may be recorded in a small index, an
+SQLite database set by ``PYDRA_FSL_FINGERPRINT_INDEX``, keyed on the path, inode, size
+and modification time of files, so that fingerprinting an unchanged file again is a
+lookup, across processes and runs.
+
+Pydra hashes inputs with its own hashing by default. NIfTI and ANALYZE images passed to
+tasks as ``fileformats`` objects are hashed through their fingerprint instead once
+:func:`register_image_hashing` is called. This is done when importing
+:mod:`pydra.tasks.fsl.v6_0`, which holds the FSL tasks (loaded lazily from
+:mod:`pydra.tasks.fsl`), if ``PYDRA_FSL_FINGERPRINT`` is set, and applies to every pydra
+task of the process, not only FSL ones.
+
+Examples
+--------
+
+>>> import os
+>>> os.environ["PYDRA_FSL_FINGERPRINT"] = "sampled"
+>>> fingerprint_mode()
+'sampled'
+>>> fingerprint("dwi.nii.gz")  # doctest: +SKIP
+'sampled:5c1d9e0b6f6a3c1f0f2c8a4e3b9d7e21'
+>>> del os.environ["PYDRA_FSL_FINGERPRINT"]
+"""
+
+__all__ = [
+    "MODES",
+    "clear_cache",
+    "fingerprint",
+    "fingerprint_mode",
+    "register_image_hashing",
+]
+
+import contextlib
+import functools
+import hashlib
+import os
+import typing as ty
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fileformats.medimage import Analyze, Nifti
+from pydra.utils.hash import Cache, register_serializer
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+#: Available fingerprinting strategies.
+MODES = ("full", "sampled", "stat")
+
+DEFAULT_MODE = "full"
+
+# Chunks hashed in parallel by the full strategy.
+_CHUNK_SIZE = 16 << 20
+_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Blocks read by the sampled strategy.
+_BLOCK_SIZE = 64 << 10
+_NUM_BLOCKS = 16
+
+# Fingerprints memoized by each process, keyed on the stat of their files.
+_MEMO_SIZE = 4096
+
+# Hash of the contents of files, recorded in the index along with the strategy.
+_HASH = "xxh3_128" if xxhash is not None else "blake2b"
+
+
+def _hasher(data: bytes = b""):
+    if xxhash is not None:
+        return xxhash.xxh3_128(data)
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def fingerprint_mode() -> str:
+    """Return the strategy set by ``$PYDRA_FSL_FINGERPRINT`` (full if unset)."""
+    mode = os.getenv("PYDRA_FSL_FINGERPRINT") or DEFAULT_MODE
+    if mode not in MODES:
+        raise ValueError(
+            f"Invalid PYDRA_FSL_FINGERPRINT: {mode} (expected one of {MODES})"
+        )
+    return mode
+
+
+def _index_path() -> ty.Optional[Path]:
+    path = os.getenv("PYDRA_FSL_FINGERPRINT_INDEX")
+    return Path(path) if path else None
+
+
+@contextlib.contextmanager
+def _index(path: Path):
+    import sqlite3
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.closing(sqlite3.connect(path, timeout=60)) as db:
+        with db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints (path TEXT, mode TEXT, "
+                "inode INTEGER, size INTEGER, mtime_ns INTEGER, digest TEXT, "
+                "PRIMARY KEY (path, mode))"
+            )
+        yield db
+
+
+def _full(path: str, size: int) -> bytes:
+    def _chunk(offset):
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return _hasher(f.read(_CHUNK_SIZE)).digest()
+
+    # Chunks are read and hashed by parallel threads, their digests combined in order.
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        digests = executor.map(_chunk, range(0, size, _CHUNK_SIZE))
+        digest = _hasher(str(size).encode())
+        for chunk in digests:
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _sampled(path: str, size: int) -> bytes:
+    digest = _hasher(str(size).encode())
+    last = max(size - _BLOCK_SIZE, 0)
+    offsets = sorted(
+        {last * index // (_NUM_BLOCKS - 1) for index in range(_NUM_BLOCKS)}
+    )
+    with open(path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            digest.update(f.read(_BLOCK_SIZE))
+    return digest.digest()
+
+
+def _stat(path: str, stat: os.stat_result) -> bytes:
+    key = f"{path}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+def fingerprint(path: os.PathLike, mode: ty.Optional[str] = None) -> str:
+    """Return the fingerprint of a file, prefixed with the strategy used.
+
+    Parameters
+    ----------
+    path : path-like
+        File to fingerprint.
+    mode : {"full", "sampled", "stat"}, optional
+        Strategy, set by ``$PYDRA_FSL_FINGERPRINT`` if not given.
+    """
+    mode = mode or fingerprint_mode()
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    if mode == "stat":
+        return f"stat:{_stat(path, stat).hex()}"
+    return _fingerprint(
+        path, mode, stat.st_ino, stat.st_size, stat.st_mtime_ns, _index_path()
+    )
+
+
+@functools.lru_cache(maxsize=_MEMO_SIZE)
+def _fingerprint(
+    path: str,
+    mode: str,
+    inode: int,
+    size: int,
+    mtime_ns: int,
+    index: ty.Optional[Path],
+) -> str:
+    key = (path, f"{mode}:{_HASH}", inode, size, mtime_ns)
+    if index is not None:
+        with _index(index) as db:
+            row = db.execute(
+                "SELECT digest FROM fingerprints WHERE path = ? AND mode = ? "
+                "AND inode = ? AND size = ? AND mtime_ns = ?",
+                key,
+            ).fetchone()
+        if row is not None:
+            return row[0]
+
+    compute = _full if mode == "full" else _sampled
+    digest = f"{mode}:{compute(path, size).hex()}"
+    if index is not None:
+        with _index(index) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                key + (digest,),
+            )
+    return digest
+
+
+def clear_cache():
+    """Discard the fingerprints memoized by this process."""
+    _fingerprint.cache_clear()
+
+
+def register_image_hashing():
+    """Have pydra hash NIfTI and ANALYZE images through their fingerprints.
+
+    This replaces the hashing of these images by every pydra task of the process.
+    """
+    register_serializer(Nifti, _bytes_repr_image)
+    register_serializer(Analyze, _bytes_repr_image)
+
+
+def _bytes_repr_image(image, cache: Cache) -> ty.Iterator[bytes]:
+    # Images are hashed by pydra through the fingerprints of their files.
+    cls = type(image)
+    yield f"{cls.__module__}.{cls.__name__}:".encode()
+    for path in sorted(image.fspaths):
+        yield f"{path.name}={fingerprint(path)},".encode()
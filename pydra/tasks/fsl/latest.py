@@ -1,3 +1,18 @@
 PACKAGE_VERSION = "v6_0"
 
-from .v6_0 import *  # noqa
+import importlib
+
+from .v6_0 import __all__  # noqa
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{PACKAGE_VERSION}", __package__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,21 @@
+"""
+Native
+======
+
+In-process implementations of FSL tools based on NumPy and NiBabel.
+
+These are optional backends for tasks that are cheaper to evaluate within the Python
+process than to delegate to an FSL executable. They require the ``native`` extra:
+
+.. code-block:: console
+
+    pip install pydra-fsl[native]
+
+.. automodule:: pydra.tasks.fsl.native.bedpostx
+.. automodule:: pydra.tasks.fsl.native.maths
+.. automodule:: pydra.tasks.fsl.native.coords
+.. automodule:: pydra.tasks.fsl.native.probtrackx
+.. automodule:: pydra.tasks.fsl.native.randomise
+.. automodule:: pydra.tasks.fsl.native.volumes
+.. automodule:: pydra.tasks.fsl.native.xfm
+"""
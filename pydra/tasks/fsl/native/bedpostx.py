@@ -0,0 +1,187 @@
+"""
+BEDPOSTX
+========
+
+In-process pre- and post-processing of bedpostx runs fitted slice by slice.
+
+The diffusion data and the brain mask are split into axial slices, each one being
+fitted separately by xfibres as bedpostx does. Samples fitted for each slice are then
+reassembled into volumes, with their means over samples and, for each fibre, the
+principal direction of its samples (dyads) and their dispersion, as computed by
+``bedpostx_postproc.sh`` and ``make_dyadic_vectors``.
+
+Examples
+--------
+
+>>> dwi_slices, mask_slices = split_slices("data.nii.gz", "nodif_brain_mask.nii.gz")
+... # doctest: +SKIP
+>>> merge_slices(["data_slice_0000", "data_slice_0001"], mask="nodif_brain_mask.nii.gz")
+... # doctest: +SKIP
+{'merged_thsamples': [PosixPath('merged_th1samples.nii.gz'), ...], ...}
+"""
+
+__all__ = ["dyadic_vectors", "merge_slices", "split_slices"]
+
+import os
+import typing as ty
+from pathlib import Path
+
+import nibabel as nib
+import numpy as np
+
+from ..environment import OUTPUT_TYPES
+from .volumes import _load, _save, merge, split
+
+# Samples of each fibre, fitted by xfibres.
+_SAMPLES = ("th", "ph", "f")
+
+# Means over samples of the parameters shared by all fibres, depending on the model.
+_MEANS = ("dsamples", "d_stdsamples", "f0samples", "tausamples", "S0samples")
+
+
+def split_slices(
+    dwi: os.PathLike,
+    mask: os.PathLike,
+    output_dir: ty.Optional[os.PathLike] = None,
+) -> ty.Tuple[ty.List[Path], ty.List[Path]]:
+    """Split diffusion data and its brain mask into axial slices, as bedpostx does.
+
+    Returns
+    -------
+    tuple of list of Path
+        Slices of the diffusion data and of the mask, named ``data_slice_0000`` and
+        ``nodif_brain_mask_slice_0000`` onwards.
+    """
+    return (
+        split(dwi, "data_slice_", direction="z", output_dir=output_dir),
+        split(mask, "nodif_brain_mask_slice_", direction="z", output_dir=output_dir),
+    )
+
+
+def _find(directory: Path, name: str) -> ty.Optional[Path]:
+    for ext in OUTPUT_TYPES.values():
+        path = directory / f"{name}{ext}"
+        if path.exists():
+            return path
+    return None
+
+
+def dyadic_vectors(
+    theta: np.ndarray, phi: np.ndarray, mask: ty.Optional[np.ndarray] = None
+) -> ty.Tuple[np.ndarray, np.ndarray]:
+    """Principal direction and dispersion of samples of fibre orientations.
+
+    The principal direction is the main eigenvector of the mean dyadic tensor of the
+    samples, and the dispersion is one minus its eigenvalue, as computed by
+    make_dyadic_vectors.
+
+    Parameters
+    ----------
+    theta, phi : array
+        Polar and azimuthal angles of the samples, along the last axis.
+    mask : array, optional
+        Voxels to compute, others being set to zero.
+
+    Returns
+    -------
+    tuple of array
+        Principal directions, with a last axis of size 3, and dispersions.
+    """
+    sin_theta = np.sin(theta)
+    vectors = np.stack(
+        [sin_theta * np.cos(phi), sin_theta * np.sin(phi), np.cos(theta)], axis=-1
+    )
+    tensors = np.einsum("...si,...sj->...ij", vectors, vectors) / theta.shape[-1]
+    eigenvalues, eigenvectors = np.linalg.eigh(tensors)
+    dyads = eigenvectors[..., :, -1]
+    dispersion = 1.0 - eigenvalues[..., -1]
+    if mask is not None:
+        dyads = np.where(mask[..., None] != 0, dyads, 0.0)
+        dispersion = np.where(mask != 0, dispersion, 0.0)
+    return dyads.astype(np.float32), dispersion.astype(np.float32)
+
+
+def _data(path: Path) -> np.ndarray:
+    return np.asanyarray(nib.load(path).dataobj)
+
+
+def _stack(slices: ty.Sequence[np.ndarray]) -> np.ndarray:
+    # Slices of shape (x, y, 1, ...) are stacked along z.
+    return np.concatenate(slices, axis=2)
+
+
+def merge_slices(
+    slice_dirs: ty.Sequence[os.PathLike],
+    mask: os.PathLike,
+    output_dir: ty.Optional[os.PathLike] = None,
+) -> ty.Dict[str, ty.List[Path]]:
+    """Reassemble the samples fitted by xfibres for each slice, as bedpostx does.
+
+    Parameters
+    ----------
+    slice_dirs : sequence of path-like
+        Output directories of xfibres, ordered by slice.
+    mask : path-like
+        Brain mask of the diffusion data.
+    output_dir : path-like, optional
+        Directory of the outputs, defaults to the working directory.
+
+    Returns
+    -------
+    dict of list of Path
+        Outputs by kind, named as those of BEDPOSTX5: ``merged_thsamples``,
+        ``mean_thsamples`` and ``dyads`` hold one image per fibre, ``mean_dsamples``
+        and ``mean_S0samples`` a single image.
+    """
+    slice_dirs = [Path(path) for path in slice_dirs]
+    output_dir = Path(output_dir or Path.cwd())
+    reference, mask_data = _load(mask)
+    mask_data = np.asanyarray(mask_data).reshape(reference.shape[:3])
+
+    outputs = {}
+    fibre = 1
+    while _find(slice_dirs[0], f"th{fibre}samples") is not None:
+        for parameter in _SAMPLES:
+            name = f"{parameter}{fibre}samples"
+            paths = [_find(directory, name) for directory in slice_dirs]
+            if None in paths:
+                raise FileNotFoundError(f"Missing {name} in some slices")
+            merged = merge(paths, output_dir / f"merged_{name}", dimension="z")
+            outputs.setdefault(f"merged_{parameter}samples", []).append(merged)
+
+            # Means are computed slice by slice, never loading all samples at once.
+            mean = _stack([_data(path).mean(axis=-1) for path in paths])
+            outputs.setdefault(f"mean_{parameter}samples", []).append(
+                _save(mean.astype(np.float32), reference, output_dir / f"mean_{name}")
+            )
+
+        dyads, dispersions = [], []
+        for index, directory in enumerate(slice_dirs):
+            dyad, dispersion = dyadic_vectors(
+                _data(_find(directory, f"th{fibre}samples")),
+                _data(_find(directory, f"ph{fibre}samples")),
+                mask_data[:, :, index : index + 1],
+            )
+            dyads.append(dyad)
+            dispersions.append(dispersion)
+        outputs.setdefault("dyads", []).append(
+            _save(_stack(dyads), reference, output_dir / f"dyads{fibre}")
+        )
+        outputs.setdefault("dyads_dispersion", []).append(
+            _save(
+                _stack(dispersions), reference, output_dir / f"dyads{fibre}_dispersion"
+            )
+        )
+        fibre += 1
+
+    if fibre == 1:
+        raise FileNotFoundError(f"No samples of fibre orientations in {slice_dirs[0]}")
+
+    for name in _MEANS:
+        paths = [_find(directory, f"mean_{name}") for directory in slice_dirs]
+        if None not in paths:
+            outputs[f"mean_{name}"] = [
+                merge(paths, output_dir / f"mean_{name}", dimension="z")
+            ]
+
+    return outputs
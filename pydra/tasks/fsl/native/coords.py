@@ -0,0 +1,485 @@
+"""
+Coords
+======
+
+In-process transformation of point coordinates, as performed by img2imgcoord,
+img2stdcoord and std2imgcoord.
+
+Conversions between voxel, FSL scaled-voxel and millimeter coordinates and the FLIRT
+matrix are composed into a single 4x4 matrix, applied to all points at once.
+
+Nonlinear transformations sample FNIRT warp fields (not coefficients) with trilinear
+interpolation, chunk by chunk so that memory usage is bounded whatever the number of
+points. Uncompressed warp fields are memory-mapped. As with applywarp, a warp field
+is defined on the grid of the standard (reference) image and maps it onto the input
+image, after the optional ``postmat`` and before the inverse of ``premat``; mapping
+points the other way inverts the warp field iteratively.
+
+Examples
+--------
+
+>>> points = img2img(
+...     "coordinates.txt", "source.nii.gz", "target.nii.gz", "source2target.mat"
+... )  # doctest: +SKIP
+>>> points.shape  # doctest: +SKIP
+(1000000, 3)
+
+Warp tractography-scale point sets to the standard space, e.g. streamline vertices:
+
+>>> points = img2std(
+...     vertices, "dwi.nii.gz", "MNI152_T1_1mm.nii.gz",
+...     warpfield="dwi2mni_warp.nii", premat="dwi2struct.mat",
+... )  # doctest: +SKIP
+"""
+
+__all__ = [
+    "WarpField",
+    "format_points",
+    "img2img",
+    "img2img_matrix",
+    "img2std",
+    "img2std_matrix",
+    "read_points",
+    "std2img",
+    "std2img_matrix",
+    "transform_points",
+    "warp_points",
+    "warp_points_from_std",
+    "warp_points_to_std",
+]
+
+import io
+import itertools
+import os
+import typing as ty
+from concurrent.futures import ThreadPoolExecutor
+
+import nibabel as nib
+import numpy as np
+
+from .xfm import read_matrix
+
+Points = ty.Union[os.PathLike, np.ndarray]
+Matrix = ty.Optional[ty.Union[os.PathLike, np.ndarray]]
+
+#: Number of points processed at once when warping points.
+CHUNK_SIZE = 1 << 18
+
+
+def read_points(points: Points) -> np.ndarray:
+    """Read points from a text file with one point per row, or pass arrays through."""
+    if isinstance(points, (str, os.PathLike)):
+        points = np.loadtxt(points, ndmin=2)
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] < 3:
+        raise ValueError(f"Expected an (N, 3) array of points, got {points.shape}")
+    return points[:, :3]
+
+
+def format_points(points: np.ndarray, header: ty.Optional[str] = None) -> str:
+    """Format points as printed by the coordinate tools of FSL."""
+    buffer = io.StringIO()
+    if header:
+        buffer.write(header + "\n")
+    np.savetxt(buffer, points, fmt="%g", delimiter="  ")
+    return buffer.getvalue()
+
+
+def transform_points(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Apply a 4x4 affine matrix to an (N, 3) array of points."""
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def _matrix(matrix: Matrix) -> np.ndarray:
+    if matrix is None:
+        return np.eye(4)
+    if isinstance(matrix, (str, os.PathLike)):
+        return read_matrix(matrix)
+    return np.asarray(matrix, dtype=np.float64)
+
+
+def _geometry(image) -> ty.Tuple[np.ndarray, np.ndarray]:
+    """Return the voxel-to-mm and voxel-to-scaled-voxel matrices of an image."""
+    if isinstance(image, (str, os.PathLike)):
+        image = nib.load(os.fspath(image))
+    header = image.header
+    vox2mm = header.get_best_affine()
+    vox2fsl = np.diag(tuple(header.get_zooms()[:3]) + (1.0,))
+    # FSL flips the x axis of images stored in neurological order.
+    if np.linalg.det(vox2mm[:3, :3]) > 0:
+        flip = np.eye(4)
+        flip[0, 0], flip[0, 3] = -1.0, header.get_data_shape()[0] - 1
+        vox2fsl = vox2fsl @ flip
+    return vox2mm, vox2fsl
+
+
+def img2img_matrix(
+    source_image: os.PathLike,
+    destination_image: os.PathLike,
+    affine_matrix: Matrix = None,
+    unit: str = "vox",
+) -> np.ndarray:
+    """Return the matrix mapping coordinates of the source to the destination image."""
+    source_vox2mm, source_vox2fsl = _geometry(source_image)
+    destination_vox2mm, destination_vox2fsl = _geometry(destination_image)
+
+    matrix = (
+        np.linalg.inv(destination_vox2fsl) @ _matrix(affine_matrix) @ source_vox2fsl
+    )
+    if unit == "mm":
+        matrix = destination_vox2mm @ matrix @ np.linalg.inv(source_vox2mm)
+    return matrix
+
+
+def img2std_matrix(
+    input_image: os.PathLike,
+    standard_image: ty.Optional[os.PathLike] = None,
+    affine_matrix: Matrix = None,
+    unit: str = "vox",
+) -> np.ndarray:
+    """Return the matrix mapping coordinates of an image to standard-space mm."""
+    matrix = img2img_matrix(
+        input_image, standard_image or input_image, affine_matrix, unit=unit
+    )
+    if unit == "vox":
+        standard_vox2mm, _ = _geometry(standard_image or input_image)
+        matrix = standard_vox2mm @ matrix
+    return matrix
+
+
+def std2img_matrix(
+    input_image: os.PathLike,
+    standard_image: ty.Optional[os.PathLike] = None,
+    affine_matrix: Matrix = None,
+    unit: str = "vox",
+) -> np.ndarray:
+    """Return the matrix mapping standard-space mm to coordinates of an image."""
+    return np.linalg.inv(
+        img2std_matrix(input_image, standard_image, affine_matrix, unit)
+    )
+
+
+def img2img(
+    points: Points,
+    source_image: os.PathLike,
+    destination_image: os.PathLike,
+    affine_matrix: Matrix = None,
+    unit: str = "vox",
+    warpfield: ty.Optional[os.PathLike] = None,
+    premat: Matrix = None,
+    warpfield_as: ty.Optional[str] = None,
+) -> np.ndarray:
+    """Transform points from a source to a destination image, as img2imgcoord does.
+
+    Parameters
+    ----------
+    points : path-like or array
+        Text file of coordinates, or an (N, 3) array of points.
+    source_image, destination_image : path-like
+        Images defining the source and destination spaces.
+    affine_matrix : path-like or array, optional
+        FLIRT matrix from the source to the destination image, identity by default.
+    unit : {"vox", "mm"}
+        Unit of both input and output coordinates.
+    warpfield : path-like, optional
+        FNIRT warp field from the source to the destination image, replacing
+        ``affine_matrix``.
+    premat : path-like or array, optional
+        Affine matrix applied before the warp field.
+    warpfield_as : {"rel", "abs"}, optional
+        Whether the warp field is relative or absolute, guessed if not set.
+
+    Returns
+    -------
+    array
+        (N, 3) array of transformed points.
+    """
+    if warpfield is not None:
+        return warp_points(
+            points,
+            source_image,
+            destination_image,
+            warpfield,
+            premat=premat,
+            unit=unit,
+            warpfield_as=warpfield_as,
+        )
+    matrix = img2img_matrix(source_image, destination_image, affine_matrix, unit)
+    return transform_points(read_points(points), matrix)
+
+
+def img2std(
+    points: Points,
+    input_image: os.PathLike,
+    standard_image: ty.Optional[os.PathLike] = None,
+    affine_matrix: Matrix = None,
+    unit: str = "vox",
+    warpfield: ty.Optional[os.PathLike] = None,
+    premat: Matrix = None,
+    warpfield_as: ty.Optional[str] = None,
+) -> np.ndarray:
+    """Transform points of an image to standard-space mm, as img2stdcoord does.
+
+    ``unit`` is the unit of the input coordinates. With a ``warpfield``, estimated
+    by FNIRT from the image to the standard space, ``affine_matrix`` is ignored and
+    ``premat`` is applied before the warp field, as with ``img2stdcoord -warp``.
+    """
+    if warpfield is not None:
+        return warp_points_to_std(
+            points,
+            input_image,
+            standard_image,
+            warpfield,
+            premat=premat,
+            unit=unit,
+            warpfield_as=warpfield_as,
+        )
+    matrix = img2std_matrix(input_image, standard_image, affine_matrix, unit)
+    return transform_points(read_points(points), matrix)
+
+
+def std2img(
+    points: Points,
+    input_image: os.PathLike,
+    standard_image: ty.Optional[os.PathLike] = None,
+    affine_matrix: Matrix = None,
+    unit: str = "vox",
+    warpfield: ty.Optional[os.PathLike] = None,
+    premat: Matrix = None,
+    warpfield_as: ty.Optional[str] = None,
+) -> np.ndarray:
+    """Transform standard-space mm to coordinates of an image, as std2imgcoord does.
+
+    ``unit`` is the unit of the output coordinates and ``affine_matrix`` maps the
+    image to the standard space. With a ``warpfield``, ``affine_matrix`` is ignored
+    and ``premat`` is applied before the warp field, as with ``std2imgcoord -warp``.
+    """
+    if warpfield is not None:
+        return warp_points_from_std(
+            points,
+            input_image,
+            standard_image,
+            warpfield,
+            premat=premat,
+            unit=unit,
+            warpfield_as=warpfield_as,
+        )
+    matrix = std2img_matrix(input_image, standard_image, affine_matrix, unit)
+    return transform_points(read_points(points), matrix)
+
+
+def _trilinear(data: np.ndarray, voxels: np.ndarray) -> np.ndarray:
+    # Voxel coordinates must lie within the grid. Corners are gathered from each
+    # component flattened in Fortran order, as stored, so that memory-mapped fields
+    # are read without copies, then interpolated along x, y and z in turn.
+    shape = np.array(data.shape[:3])
+    lower = np.minimum(voxels.astype(np.intp), np.maximum(shape - 2, 0))
+    fraction = (voxels - lower).astype(data.dtype, copy=False)
+    strides = np.array([1, shape[0], shape[0] * shape[1]])
+    origin = lower @ strides
+    steps = np.where(lower + 1 < shape, strides, 0)
+    corners = [
+        origin + steps @ np.array(corner)
+        for corner in itertools.product((0, 1), repeat=3)
+    ]
+
+    values = np.empty((len(voxels), data.shape[3]))
+    for component in range(data.shape[3]):
+        volume = data[..., component].reshape(-1, order="F")
+        samples = [volume.take(corner) for corner in corners]
+        # Corners are ordered with z varying fastest, so that each pass halves them.
+        for axis in (2, 1, 0):
+            samples = [
+                low + fraction[:, axis] * (high - low)
+                for low, high in zip(samples[0::2], samples[1::2])
+            ]
+        values[:, component] = samples[0]
+    return values
+
+
+class WarpField:
+    """FNIRT warp field, mapping scaled-voxel coordinates of its grid to another space.
+
+    Parameters
+    ----------
+    path : path-like
+        Warp field, as written by fnirt --fout or convertwarp (not coefficients).
+    warpfield_as : {"rel", "abs"}, optional
+        Whether the field holds relative displacements or absolute positions, guessed
+        from its values if not set.
+    """
+
+    def __init__(self, path: os.PathLike, warpfield_as: ty.Optional[str] = None):
+        image = nib.load(os.fspath(path))
+        if "coef" in image.header.get_intent()[0]:
+            raise ValueError(
+                f"{path} holds spline coefficients, convert it to a warp field first"
+            )
+        if len(image.shape) != 4 or image.shape[3] != 3:
+            raise ValueError(f"{path} is not a warp field of shape (X, Y, Z, 3)")
+
+        proxy = image.dataobj
+        if proxy.slope == 1 and proxy.inter == 0:
+            # Memory-mapped when uncompressed, so that only sampled voxels are read.
+            self.data = proxy.get_unscaled()
+        else:
+            self.data = np.asanyarray(proxy)
+
+        _, self.vox2fsl = _geometry(image)
+        self.fsl2vox = np.linalg.inv(self.vox2fsl)
+        self.relative = (
+            self._guess_relative() if warpfield_as is None else warpfield_as == "rel"
+        )
+
+    def _guess_relative(self) -> bool:
+        # Absolute fields hold positions close to those of their own grid.
+        step = max(1, min(self.data.shape[:3]) // 8)
+        grid = np.stack(
+            np.meshgrid(
+                *(np.arange(0, size, step) for size in self.data.shape[:3]),
+                indexing="ij",
+            ),
+            axis=-1,
+        ).reshape(-1, 3)
+        values = self.data[grid[:, 0], grid[:, 1], grid[:, 2]].astype(np.float64)
+        positions = transform_points(grid.astype(np.float64), self.vox2fsl)
+        return np.abs(values).mean() <= np.abs(values - positions).mean()
+
+    def displacement(self, points: np.ndarray) -> np.ndarray:
+        """Sample displacements at points, in scaled-voxel coordinates of the grid."""
+        # Points outside of the grid take the displacement of the nearest edge.
+        voxels = transform_points(points, self.fsl2vox)
+        voxels = np.clip(voxels, 0, np.array(self.data.shape[:3]) - 1)
+        values = _trilinear(self.data, voxels)
+        if self.relative:
+            return values
+        return values - transform_points(voxels, self.vox2fsl)
+
+    def __call__(self, points: np.ndarray) -> np.ndarray:
+        """Map points of the grid onto the other space."""
+        return points + self.displacement(points)
+
+    def inverse(
+        self, points: np.ndarray, iterations: int = 20, tolerance: float = 1e-4
+    ) -> np.ndarray:
+        """Map points of the other space back onto the grid, by fixed-point iteration."""
+        inverse = points.copy()
+        for _ in range(iterations):
+            update = points - self.displacement(inverse)
+            converged = np.abs(update - inverse).max(initial=0) < tolerance
+            inverse = update
+            if converged:
+                break
+        return inverse
+
+
+def _warp(
+    function,
+    points: np.ndarray,
+    before: np.ndarray,
+    after: np.ndarray,
+    chunk_size: int,
+    max_workers: ty.Optional[int],
+) -> np.ndarray:
+    # Apply ``before``, the warp function then ``after`` chunk by chunk. Chunks are
+    # processed in threads, NumPy releasing the GIL, and written in place so that
+    # only the chunks being processed hold temporary arrays.
+    output = np.empty_like(points)
+
+    def _process(start):
+        chunk = transform_points(points[start : start + chunk_size], before)
+        output[start : start + chunk_size] = transform_points(function(chunk), after)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(_process, range(0, len(points), chunk_size)):
+            pass
+    return output
+
+
+def _to_fsl(image, unit):
+    vox2mm, vox2fsl = _geometry(image)
+    return vox2fsl if unit == "vox" else vox2fsl @ np.linalg.inv(vox2mm)
+
+
+def warp_points(
+    points: Points,
+    source_image: os.PathLike,
+    destination_image: os.PathLike,
+    warpfield: os.PathLike,
+    premat: Matrix = None,
+    postmat: Matrix = None,
+    unit: str = "vox",
+    warpfield_as: ty.Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_workers: ty.Optional[int] = None,
+) -> np.ndarray:
+    """Warp points of a source image onto a destination image, as img2imgcoord -warp.
+
+    The warp field is defined on the grid of the destination image, as estimated by
+    FNIRT from the source image. ``unit`` is the unit of both input and output
+    coordinates.
+    """
+    # Map source to standard-space scaled-voxel coordinates, inverting the field.
+    field = WarpField(warpfield, warpfield_as=warpfield_as)
+    before = _matrix(premat) @ _to_fsl(source_image, unit)
+    after = np.linalg.inv(_to_fsl(destination_image, unit)) @ _matrix(postmat)
+    return _warp(
+        field.inverse, read_points(points), before, after, chunk_size, max_workers
+    )
+
+
+def warp_points_to_std(
+    points: Points,
+    input_image: os.PathLike,
+    standard_image: os.PathLike,
+    warpfield: os.PathLike,
+    premat: Matrix = None,
+    postmat: Matrix = None,
+    unit: str = "vox",
+    warpfield_as: ty.Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_workers: ty.Optional[int] = None,
+) -> np.ndarray:
+    """Warp points of an image to standard-space mm, as img2stdcoord -warp does.
+
+    ``unit`` is the unit of the input coordinates.
+    """
+    points = warp_points(
+        points,
+        input_image,
+        standard_image,
+        warpfield,
+        premat=premat,
+        postmat=postmat,
+        unit=unit,
+        warpfield_as=warpfield_as,
+        chunk_size=chunk_size,
+        max_workers=max_workers,
+    )
+    if unit == "vox":
+        standard_vox2mm, _ = _geometry(standard_image)
+        points = transform_points(points, standard_vox2mm)
+    return points
+
+
+def warp_points_from_std(
+    points: Points,
+    input_image: os.PathLike,
+    standard_image: os.PathLike,
+    warpfield: os.PathLike,
+    premat: Matrix = None,
+    postmat: Matrix = None,
+    unit: str = "vox",
+    warpfield_as: ty.Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_workers: ty.Optional[int] = None,
+) -> np.ndarray:
+    """Warp standard-space mm to coordinates of an image, as std2imgcoord -warp does.
+
+    ``unit`` is the unit of the output coordinates.
+    """
+    # Map standard-space to input scaled-voxel coordinates, as applywarp samples.
+    field = WarpField(warpfield, warpfield_as=warpfield_as)
+    before = np.linalg.inv(_matrix(postmat)) @ _to_fsl(standard_image, "mm")
+    after = np.linalg.inv(_matrix(premat) @ _to_fsl(input_image, unit))
+    return _warp(field, read_points(points), before, after, chunk_size, max_workers)
@@ -0,0 +1,204 @@
+"""
+Maths
+=====
+
+In-process evaluation of fslmaths operations.
+
+A chain of operations is fused into a single pass over the input image: each volume is
+read once from the (memory-mapped, when uncompressed) input, goes through every
+operation in the working datatype, and is stored into a preallocated output buffer
+written once at the end.
+
+Operations are given as ``(flag, operand)`` pairs using the fslmaths flags, with
+``None`` as operand for flags that do not take any, so that the same chain can be
+rendered as a command line.
+
+Examples
+--------
+
+>>> evaluate(
+...     "input.nii.gz",
+...     [("-mul", "mask.nii.gz"), ("-thr", 0.3)],
+...     output_image="output.nii.gz",
+... )  # doctest: +SKIP
+PosixPath('output.nii.gz')
+"""
+
+__all__ = ["DATATYPES", "OPERATIONS", "evaluate"]
+
+import os
+import typing as ty
+from pathlib import Path
+
+import nibabel as nib
+import numpy as np
+
+#: Mapping between fslmaths datatypes and NumPy datatypes.
+DATATYPES = {
+    "char": np.uint8,
+    "short": np.int16,
+    "int": np.int32,
+    "float": np.float32,
+    "double": np.float64,
+}
+
+
+def _binarise(data, _):
+    return np.greater(data, 0, out=data, casting="unsafe")
+
+
+def _threshold(data, value):
+    data[data < value] = 0
+    return data
+
+
+def _upper_threshold(data, value):
+    data[data > value] = 0
+    return data
+
+
+def _mask(data, mask):
+    return np.multiply(data, np.greater(mask, 0), out=data, casting="unsafe")
+
+
+#: Supported operations, each taking the working data and an (optional) operand.
+OPERATIONS: ty.Dict[str, ty.Callable] = {
+    "-add": lambda data, other: np.add(data, other, out=data, casting="unsafe"),
+    "-sub": lambda data, other: np.subtract(data, other, out=data, casting="unsafe"),
+    "-mul": lambda data, other: np.multiply(data, other, out=data, casting="unsafe"),
+    "-max": lambda data, other: np.maximum(data, other, out=data, casting="unsafe"),
+    "-min": lambda data, other: np.minimum(data, other, out=data, casting="unsafe"),
+    "-mas": _mask,
+    "-thr": _threshold,
+    "-uthr": _upper_threshold,
+    "-abs": lambda data, _: np.abs(data, out=data),
+    "-bin": _binarise,
+}
+
+
+def _resolve_datatype(datatype, input_dtype, default):
+    if datatype is None:
+        return np.dtype(default)
+    if datatype == "input":
+        return np.dtype(input_dtype)
+    try:
+        return np.dtype(DATATYPES[datatype])
+    except KeyError:
+        raise ValueError(f"Unsupported datatype: {datatype}")
+
+
+def _cast(data, dtype):
+    # Round to the nearest integer and saturate when converting to integer types.
+    if np.issubdtype(dtype, np.integer) and not np.issubdtype(data.dtype, np.integer):
+        info = np.iinfo(dtype)
+        data = np.clip(np.rint(data), info.min, info.max)
+    return data.astype(dtype, copy=False)
+
+
+class _Operand:
+    """Operand of an operation, either a scalar or an image read volume by volume."""
+
+    def __init__(self, value, shape, dtype):
+        self.image = None
+        self.value = None
+
+        if value is None or isinstance(value, (int, float)):
+            self.value = value
+            return
+
+        image = nib.load(os.fspath(value))
+        if image.shape[:3] != shape[:3]:
+            raise ValueError(
+                f"Image {value} of shape {image.shape} does not match input shape {shape}"
+            )
+        if len(image.shape) > 3 and image.shape != shape:
+            raise ValueError(
+                f"Image {value} of shape {image.shape} does not match input shape {shape}"
+            )
+
+        if len(image.shape) <= 3:
+            # Volumes are broadcast to every volume of the input, so load them once.
+            self.value = np.asarray(image.dataobj, dtype=dtype).reshape(shape[:3])
+        else:
+            self.image, self.dtype = image, dtype
+
+    def __getitem__(self, index):
+        if self.image is None:
+            return self.value
+        return np.asarray(self.image.dataobj[index], dtype=self.dtype)
+
+
+def _default_output_image(input_image):
+    name = Path(input_image).name
+    stem, dot, ext = name.partition(".")
+    return Path.cwd() / f"{stem}_fslmaths{dot}{ext}"
+
+
+def evaluate(
+    input_image: os.PathLike,
+    operations: ty.Iterable[ty.Tuple[str, ty.Any]] = (),
+    output_image: ty.Optional[os.PathLike] = None,
+    internal_datatype: ty.Optional[str] = None,
+    output_datatype: ty.Optional[str] = None,
+) -> Path:
+    """Evaluate a chain of fslmaths operations in-process.
+
+    Parameters
+    ----------
+    input_image : path-like
+        Input image.
+    operations : iterable of (str, any)
+        Sequence of fslmaths flags (e.g. ``-mul``) with their operand, either a number,
+        a path to an image or None.
+    output_image : path-like, optional
+        Output image, defaults to ``<input>_fslmaths`` in the working directory.
+    internal_datatype : str, optional
+        Datatype used for calculations, as with ``-dt``. Defaults to float, or double
+        for double images.
+    output_datatype : str, optional
+        Datatype of the output image, as with ``-odt``. Defaults to float.
+
+    Returns
+    -------
+    Path
+        Path to the output image.
+    """
+    image = nib.load(os.fspath(input_image))
+    shape = image.shape
+    input_dtype = image.get_data_dtype()
+
+    internal_dtype = _resolve_datatype(
+        internal_datatype,
+        input_dtype,
+        np.float64 if input_dtype == np.float64 else np.float32,
+    )
+    output_dtype = _resolve_datatype(output_datatype, input_dtype, np.float32)
+
+    chain = []
+    for flag, operand in operations:
+        try:
+            function = OPERATIONS[flag]
+        except KeyError:
+            raise ValueError(f"Unsupported fslmaths operation: {flag}")
+        chain.append((function, _Operand(operand, shape, internal_dtype)))
+
+    output = np.empty(shape, dtype=output_dtype)
+
+    # Evaluate the chain one volume at a time, which bounds the working memory to a
+    # single volume on top of the output buffer.
+    for volume in np.ndindex(*shape[3:]):
+        index = (Ellipsis, *volume)
+        data = np.array(image.dataobj[index], dtype=internal_dtype)
+        for function, operand in chain:
+            data = function(data, operand[index])
+        output[index] = _cast(data, output_dtype)
+
+    output_image = Path(output_image or _default_output_image(input_image))
+
+    header = image.header.copy()
+    header.set_data_dtype(output_dtype)
+    header.set_slope_inter(1, 0)
+    klass = nib.Nifti2Image if isinstance(image, nib.Nifti2Image) else nib.Nifti1Image
+    nib.save(klass(output, image.affine, header), output_image)
+
+    return output_image
@@ -0,0 +1,262 @@
+"""
+ProbTrackX
+==========
+
+In-process partitioning of the seeds of probtrackx2 runs and merging of their outputs.
+
+Seeds are partitioned into contiguous shards, in the order probtrackx2 visits them:
+seed voxels of a mask in x-fastest order, or the lines of a list of coordinates in
+simple mode. Runs over disjoint shards then merge into the outputs of a single run:
+
+- path distributions (``fdt_paths``), seeds to targets images and way totals are
+  summed,
+- rows of seed to low resolution mask matrices (``fdt_matrix2.dot``) are offset by
+  the number of seeds of previous shards,
+- entries of NxN matrices between voxels of a target mask (``fdt_matrix3.dot``) are
+  summed.
+
+Seed to seed matrices (``fdt_matrix1.dot``) cannot be merged, since each run only
+records the paths reaching the seeds of its own shard.
+
+Outputs are merged one shard at a time, so that memory is bounded by the merged
+output and a single shard, whatever the number of shards.
+
+Examples
+--------
+
+>>> seeds, num_seeds = split_seeds("thalamus.nii.gz", num_shards=4)  # doctest: +SKIP
+>>> merge_shards(["shard0", "shard1", "shard2", "shard3"], num_seeds)  # doctest: +SKIP
+{'fdt_paths': PosixPath('fdt_paths.nii.gz'), 'way_total': PosixPath('waytotal'), ...}
+"""
+
+__all__ = ["merge_shards", "split_seeds"]
+
+import os
+import shutil
+import typing as ty
+from pathlib import Path
+
+import numpy as np
+
+from ..environment import OUTPUT_TYPES
+from .volumes import _load, _save
+
+
+def split_seeds(
+    seed: os.PathLike,
+    num_shards: int,
+    simple: bool = False,
+    output_dir: ty.Optional[os.PathLike] = None,
+) -> ty.Tuple[ty.List[Path], ty.List[int]]:
+    """Partition the seeds of probtrackx2 into contiguous shards.
+
+    Parameters
+    ----------
+    seed : path-like
+        Seed mask, or list of voxel coordinates in simple mode.
+    num_shards : int
+        Number of shards, fewer being returned if there are fewer seeds.
+    simple : bool
+        Whether seeds are a list of coordinates (``--simple``).
+    output_dir : path-like, optional
+        Directory of the shards, defaults to the working directory.
+
+    Returns
+    -------
+    tuple
+        Seed masks (or lists) of the shards, and their number of seeds.
+    """
+    output_dir = Path(output_dir or Path.cwd())
+
+    if simple:
+        lines = [line for line in Path(seed).read_text().splitlines() if line.strip()]
+        bounds = _bounds(len(lines), num_shards)
+        shards = []
+        for index, (start, stop) in enumerate(bounds):
+            path = output_dir / f"seeds_shard{index:04d}.txt"
+            path.write_text("".join(line + "\n" for line in lines[start:stop]))
+            shards.append(path)
+        return shards, [stop - start for start, stop in bounds]
+
+    image, data = _load(seed)
+    data = np.asanyarray(data).reshape(image.shape[:3])
+    # Seed voxels, in the x-fastest order in which probtrackx2 visits them.
+    voxels = np.flatnonzero(data.ravel(order="F") > 0)
+
+    shards, num_seeds = [], []
+    for index, (start, stop) in enumerate(_bounds(len(voxels), num_shards)):
+        mask = np.zeros(data.size, dtype=np.uint8)
+        mask[voxels[start:stop]] = 1
+        shards.append(
+            _save(
+                mask.reshape(data.shape, order="F"),
+                image,
+                output_dir / f"seeds_shard{index:04d}",
+            )
+        )
+        num_seeds.append(stop - start)
+    return shards, num_seeds
+
+
+def _bounds(size: int, num_shards: int) -> ty.List[ty.Tuple[int, int]]:
+    num_shards = max(min(num_shards, size), 1)
+    edges = [size * index // num_shards for index in range(num_shards + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _load_dot(path: os.PathLike) -> ty.Tuple[np.ndarray, ty.Tuple[int, int]]:
+    # Entries of a sparse matrix as rows of (row, column, value), with 1-based indices,
+    # the last entry possibly being a zero only recording the shape of the matrix.
+    entries = np.loadtxt(path, ndmin=2).reshape(-1, 3)
+    if not len(entries):
+        return entries, (0, 0)
+    shape = (int(entries[:, 0].max()), int(entries[:, 1].max()))
+    return entries[entries[:, 2] != 0], shape
+
+
+def _write_dot(f, entries: ty.Iterable[ty.Sequence[float]]):
+    for row, column, value in entries:
+        f.write(f"{int(row)} {int(column)} {value:g}\n")
+
+
+def _add_dot(totals: ty.Dict[ty.Tuple[int, int], float], entries: np.ndarray):
+    # Entries are summed by (row, column), so that each shard is added to the entries
+    # merged so far without sorting them again. Shards whose seeds reach no pair of
+    # target voxels have no entries, only recording the shape.
+    for row, column, value in entries.tolist():
+        key = (int(row), int(column))
+        totals[key] = totals.get(key, 0.0) + value
+
+
+def _find(directory: Path, name: str) -> ty.Optional[Path]:
+    for ext in OUTPUT_TYPES.values():
+        path = directory / f"{name}{ext}"
+        if path.exists():
+            return path
+    return None
+
+
+def _sum_images(paths: ty.Sequence[Path], output: Path) -> Path:
+    reference, total = None, None
+    for path in paths:
+        image, data = _load(path)
+        if total is None:
+            reference, total = image, np.zeros(image.shape, dtype=np.float64)
+        total += data
+    return _save(total.astype(np.float32), reference, output)
+
+
+def _concat_coords(paths: ty.Sequence[Path], num_seeds: ty.Sequence[int], output: Path):
+    # Coordinates of the seeds of each row, the last column being the row index.
+    if not all(path.exists() for path in paths):
+        return
+    with open(output, "wt") as f:
+        offset = 0
+        for path, count in zip(paths, num_seeds):
+            coords = np.loadtxt(path, ndmin=2, dtype=np.int64)
+            if coords.size:
+                coords[:, -1] += offset
+                np.savetxt(f, coords, fmt="%d")
+            offset += count
+
+
+def merge_shards(
+    shard_dirs: ty.Sequence[os.PathLike],
+    num_seeds: ty.Sequence[int],
+    output_dir: ty.Optional[os.PathLike] = None,
+) -> ty.Dict[str, ty.Union[Path, ty.List[Path]]]:
+    """Merge the outputs of probtrackx2 runs over the shards of a partition of seeds.
+
+    Parameters
+    ----------
+    shard_dirs : sequence of path-like
+        Output directories of the runs, ordered as the shards.
+    num_seeds : sequence of int
+        Number of seeds of each shard.
+    output_dir : path-like, optional
+        Directory of the merged outputs, defaults to the working directory.
+
+    Returns
+    -------
+    dict
+        Merged outputs, named as those of ProbTrackX2: ``fdt_paths``, ``way_total``,
+        ``matrix2_dot``, ``lookup_tractspace``, ``matrix3_dot`` and ``targets``.
+    """
+    shard_dirs = [Path(path) for path in shard_dirs]
+    output_dir = Path(output_dir or Path.cwd())
+    first = shard_dirs[0]
+    if (first / "fdt_matrix1.dot").exists():
+        raise ValueError(
+            "Cannot merge seed to seed matrices (fdt_matrix1.dot) of runs over "
+            "different seeds"
+        )
+
+    outputs = {}
+    paths = _find(first, "fdt_paths")
+    if paths is not None:
+        outputs["fdt_paths"] = _sum_images(
+            [_find(directory, "fdt_paths") for directory in shard_dirs],
+            output_dir / paths.name,
+        )
+
+    if (first / "waytotal").exists():
+        total = sum(
+            np.loadtxt(directory / "waytotal", ndmin=1) for directory in shard_dirs
+        )
+        outputs["way_total"] = output_dir / "waytotal"
+        np.savetxt(outputs["way_total"], total, fmt="%d")
+
+    targets = sorted(
+        path.name for path in first.iterdir() if path.name.startswith("seeds_to_")
+    )
+    if targets:
+        outputs["targets"] = [
+            _sum_images(
+                [directory / name for directory in shard_dirs], output_dir / name
+            )
+            for name in targets
+        ]
+
+    if (first / "fdt_matrix2.dot").exists():
+        # Rows are seeds, numbered after those of previous shards, so that entries of
+        # each shard are written as they are read.
+        outputs["matrix2_dot"] = output_dir / "fdt_matrix2.dot"
+        offset, columns = 0, 0
+        with open(outputs["matrix2_dot"], "wt") as f:
+            for directory, count in zip(shard_dirs, num_seeds):
+                entries, shape = _load_dot(directory / "fdt_matrix2.dot")
+                entries[:, 0] += offset
+                _write_dot(f, entries)
+                offset, columns = offset + count, max(columns, shape[1])
+            f.write(f"{offset} {columns} 0\n")
+        _concat_coords(
+            [directory / "coords_for_fdt_matrix2" for directory in shard_dirs],
+            num_seeds,
+            output_dir / "coords_for_fdt_matrix2",
+        )
+        # The tract space is the low resolution mask, shared by all shards.
+        lookup = _find(first, "lookup_tractspace_fdt_matrix2")
+        if lookup is not None:
+            outputs["lookup_tractspace"] = output_dir / lookup.name
+            shutil.copyfile(lookup, outputs["lookup_tractspace"])
+        coords = first / "tract_space_coords_for_fdt_matrix2"
+        if coords.exists():
+            shutil.copyfile(coords, output_dir / coords.name)
+
+    if (first / "fdt_matrix3.dot").exists():
+        outputs["matrix3_dot"] = output_dir / "fdt_matrix3.dot"
+        # Rows and columns are voxels of the target mask, shared by all shards.
+        totals, shape = {}, (0, 0)
+        for directory in shard_dirs:
+            entries, other = _load_dot(directory / "fdt_matrix3.dot")
+            _add_dot(totals, entries)
+            shape = tuple(max(a, b) for a, b in zip(shape, other))
+        with open(outputs["matrix3_dot"], "wt") as f:
+            # Entries are written in row-major order, once all shards are summed.
+            _write_dot(f, (key + (value,) for key, value in sorted(totals.items())))
+            f.write(f"{shape[0]} {shape[1]} 0\n")
+        for name in ("coords_for_fdt_matrix3", "tract_space_coords_for_fdt_matrix3"):
+            if (first / name).exists():
+                shutil.copyfile(first / name, output_dir / name)
+
+    return outputs
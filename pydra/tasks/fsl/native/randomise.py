@@ -0,0 +1,162 @@
+"""
+Randomise
+=========
+
+In-process merging of randomise runs over disjoint sets of permutations.
+
+Each run includes the unpermuted design as its first permutation, which is counted
+once in the merged results. Uncorrected p-values are merged from the exceedance
+counts of each run, and FWE-corrected p-values are recomputed from the concatenated
+null distributions of the maximum statistic (``-P``) and the raw statistic images
+(``-R``), so that merged results match a single run over all permutations.
+
+As with randomise, p-value images hold 1 - p.
+
+Examples
+--------
+
+>>> merge_shards(
+...     [glob("shard0/randomise_*"), glob("shard1/randomise_*")],
+...     num_permutations=[2501, 2500],
+... )  # doctest: +SKIP
+['randomise_tstat1.nii.gz', 'randomise_tfce_corrp_tstat1.nii.gz', ...]
+"""
+
+__all__ = ["OutputName", "merge_shards", "parse_output_name"]
+
+import os
+import re
+import shutil
+import typing as ty
+from pathlib import Path
+
+import nibabel as nib
+import numpy as np
+
+_OUTPUT_NAME = re.compile(
+    r"^(?P<basename>.+?)_"
+    r"(?:(?P<kind>vox|tfce|clustere|clusterm)_)?"
+    r"(?:(?P<test>p|corrp)_)?"
+    r"(?P<stat>[tf]stat\d+)"
+    r"(?P<ext>\..+)$"
+)
+
+
+class OutputName(ty.NamedTuple):
+    """Parts of the name of an output of randomise."""
+
+    basename: str
+    #: statistic the p-values derive from: vox, tfce, clustere or clusterm
+    kind: ty.Optional[str]
+    #: p for uncorrected p-values, corrp for FWE-corrected p-values
+    test: ty.Optional[str]
+    #: contrast statistic, e.g. tstat1
+    stat: str
+    ext: str
+
+
+def parse_output_name(name: str) -> ty.Optional[OutputName]:
+    """Parse the name of an output of randomise, None if not a statistic output."""
+    match = _OUTPUT_NAME.match(os.path.basename(name))
+    return OutputName(**match.groupdict()) if match else None
+
+
+def _load(path: os.PathLike) -> ty.Tuple[nib.Nifti1Image, np.ndarray]:
+    image = nib.load(os.fspath(path))
+    return image, np.asanyarray(image.dataobj, dtype=np.float64)
+
+
+def _save(reference: nib.Nifti1Image, data: np.ndarray, path: os.PathLike):
+    image = reference.__class__(
+        data.astype(np.float32), reference.affine, reference.header
+    )
+    image.set_data_dtype(np.float32)
+    nib.save(image, os.fspath(path))
+
+
+def _merge_p(paths: ty.Sequence[os.PathLike], num_permutations, output: Path):
+    # Exceedance counts of each run include the unpermuted design, counted once.
+    counts, reference = 0.0, None
+    for path, count in zip(paths, num_permutations):
+        reference, data = _load(path)
+        counts = counts + np.rint((1.0 - data) * count)
+    extra = len(paths) - 1
+    total = sum(num_permutations) - extra
+    _save(reference, 1.0 - (counts - extra) / total, output)
+
+
+def _merge_null(paths: ty.Sequence[os.PathLike]) -> np.ndarray:
+    # The first value of each null distribution is that of the unpermuted design.
+    nulls = [np.loadtxt(path, ndmin=1) for path in paths]
+    return np.concatenate([nulls[0]] + [null[1:] for null in nulls[1:]])
+
+
+def _merge_corrp(observed: os.PathLike, null: np.ndarray, output: Path):
+    reference, data = _load(observed)
+    null = np.sort(null)
+    exceedances = len(null) - np.searchsorted(null, data, side="left")
+    _save(reference, 1.0 - exceedances / len(null), output)
+
+
+def merge_shards(
+    shards: ty.Sequence[ty.Sequence[os.PathLike]],
+    num_permutations: ty.Sequence[int],
+    output_dir: os.PathLike = ".",
+) -> ty.List[str]:
+    """Merge the outputs of randomise runs over disjoint sets of permutations.
+
+    Parameters
+    ----------
+    shards : sequence of sequence of path-like
+        Output files of each run, with the same names across runs.
+    num_permutations : sequence of int
+        Number of permutations of each run, including the unpermuted design.
+    output_dir : path-like
+        Directory of the merged outputs, named as those of the runs.
+
+    Returns
+    -------
+    list of str
+        Merged output files.
+    """
+    if len(shards) != len(num_permutations):
+        raise ValueError("Expected one number of permutations per shard")
+
+    by_name = [{os.path.basename(path): path for path in shard} for shard in shards]
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    outputs = []
+    for name, path in sorted(by_name[0].items()):
+        parsed = parse_output_name(name)
+        output = output_dir / name
+        if parsed is None or parsed.test is None:
+            if "_perm_" in name:
+                # Permutation vectors of each run are not meaningful once merged.
+                continue
+            # Raw statistic images do not depend on permutations.
+            shutil.copyfile(path, output)
+        elif parsed.ext == ".txt":
+            np.savetxt(output, _merge_null([names[name] for names in by_name]))
+        elif parsed.test == "p":
+            _merge_p([names[name] for names in by_name], num_permutations, output)
+        else:
+            null_name = name[: -len(parsed.ext)] + ".txt"
+            prefix = f"{parsed.kind}_" if parsed.kind == "tfce" else ""
+            observed = f"{parsed.basename}_{prefix}{parsed.stat}{parsed.ext}"
+            if parsed.kind not in ("vox", "tfce"):
+                raise ValueError(
+                    f"Cannot merge {name}: only voxelwise and TFCE corrected p-values "
+                    "can be merged"
+                )
+            if observed not in by_name[0] or any(
+                null_name not in names for names in by_name
+            ):
+                raise ValueError(
+                    f"Cannot merge {name} without the null distributions (-P) and "
+                    "raw statistic images (-R) of every run"
+                )
+            null = _merge_null([names[null_name] for names in by_name])
+            _merge_corrp(by_name[0][observed], null, output)
+        outputs.append(str(output))
+    return outputs
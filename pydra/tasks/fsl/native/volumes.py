@@ -0,0 +1,413 @@
+"""
+Volumes
+=======
+
+In-process splitting, merging and cropping of images, as performed by fslsplit,
+fslmerge, fslroi and fslselectvols.
+
+These tools only move data around, so uncompressed inputs are memory-mapped and
+outputs are written from views of the mapped data, without any copy or conversion.
+Compression only happens when writing outputs with a ``.gz`` extension.
+
+Merged images are streamed to disk one volume at a time, so that merging thousands of
+volumes never requires holding the full series in memory.
+
+Examples
+--------
+
+>>> split("bold.nii", "vol", output_dir="volumes")  # doctest: +SKIP
+[PosixPath('volumes/vol0000.nii.gz'), PosixPath('volumes/vol0001.nii.gz'), ...]
+>>> roi("bold.nii", "bold_roi.nii", t_min=5)  # doctest: +SKIP
+PosixPath('bold_roi.nii')
+"""
+
+__all__ = ["merge", "output_path", "roi", "select_volumes", "split"]
+
+import os
+import re
+import typing as ty
+from pathlib import Path
+
+import nibabel as nib
+import numpy as np
+from nibabel.nifti1 import Nifti1PairHeader
+from nibabel.nifti2 import Nifti2PairHeader
+from nibabel.openers import Opener
+
+from ..environment import OUTPUT_TYPES, output_type, output_type_to_ext
+
+_AXES = {"x": 0, "y": 1, "z": 2, "t": 3}
+
+
+def output_path(path: os.PathLike) -> Path:
+    """Append the extension of ``$FSLOUTPUTTYPE`` to a path lacking one, as FSL does."""
+    path = Path(path)
+    if any(path.name.endswith(ext) for ext in OUTPUT_TYPES.values()):
+        return path
+    return path.with_name(path.name + output_type_to_ext(output_type()))
+
+
+def _load(path: os.PathLike):
+    """Load an image and its data, memory-mapped when uncompressed and unscaled."""
+    image = nib.load(os.fspath(path))
+    proxy = image.dataobj
+    if proxy.slope == 1 and proxy.inter == 0:
+        return image, proxy.get_unscaled()
+    return image, np.asanyarray(proxy)
+
+
+def _pad(data: np.ndarray, ndim: int = 4) -> np.ndarray:
+    return data.reshape(data.shape + (1,) * (ndim - data.ndim))
+
+
+def _squeeze_shape(shape: ty.Tuple[int, ...]) -> ty.Tuple[int, ...]:
+    # Trailing singleton dimensions beyond the third are dropped, as FSL does.
+    shape = tuple(shape)
+    while len(shape) > 3 and shape[-1] == 1:
+        shape = shape[:-1]
+    return shape
+
+
+def _squeeze(data: np.ndarray) -> np.ndarray:
+    return data.reshape(_squeeze_shape(data.shape))
+
+
+def _translate(affine: np.ndarray, offset: ty.Sequence[int]) -> np.ndarray:
+    # Keep the world coordinates of the voxels of a cropped image.
+    affine = affine.copy()
+    affine[:3, 3] += affine[:3, :3] @ np.asarray(offset[:3], dtype=float)
+    return affine
+
+
+def _save(
+    data: np.ndarray,
+    reference,
+    path: os.PathLike,
+    affine: ty.Optional[np.ndarray] = None,
+    repetition_time: ty.Optional[float] = None,
+) -> Path:
+    data = _squeeze(data)
+    header = reference.header.copy()
+    header.set_data_shape(data.shape)
+    header.set_data_dtype(data.dtype)
+    header.set_slope_inter(1, 0)
+    if repetition_time is not None and data.ndim > 3:
+        header["pixdim"][4] = repetition_time
+
+    klass = (
+        nib.Nifti2Image if isinstance(reference, nib.Nifti2Image) else nib.Nifti1Image
+    )
+    image = klass(data, reference.affine if affine is None else affine, header)
+
+    path = output_path(path)
+    nib.save(image, path)
+    return path
+
+
+def split(
+    input_image: os.PathLike,
+    output_basename: str,
+    direction: str = "t",
+    output_dir: ty.Optional[os.PathLike] = None,
+) -> ty.List[Path]:
+    """Split an image into one image per index along a direction, as fslsplit does.
+
+    Parameters
+    ----------
+    input_image : path-like
+        Input image.
+    output_basename : str
+        Basename of the output images, numbered from ``0000``.
+    direction : {"x", "y", "z", "t"}
+        Direction along which to split the image.
+    output_dir : path-like, optional
+        Directory of the output images, defaults to the working directory.
+
+    Returns
+    -------
+    list of Path
+        Paths to the output images.
+    """
+    image, data = _load(input_image)
+    data = _pad(data)
+    axis = _AXES[direction]
+    output_dir = Path(output_dir or Path.cwd())
+    ext = output_type_to_ext(output_type())
+
+    output_images = []
+    for index in range(data.shape[axis]):
+        offset = [0, 0, 0, 0]
+        offset[axis] = index
+        slicer = [slice(None)] * data.ndim
+        slicer[axis] = slice(index, index + 1)
+        output_images.append(
+            _save(
+                data[tuple(slicer)],
+                image,
+                output_dir / f"{output_basename}{index:04d}{ext}",
+                affine=_translate(image.affine, offset),
+            )
+        )
+    return output_images
+
+
+def roi(
+    input_image: os.PathLike,
+    output_image: os.PathLike,
+    x_min: int = 0,
+    x_size: int = -1,
+    y_min: int = 0,
+    y_size: int = -1,
+    z_min: int = 0,
+    z_size: int = -1,
+    t_min: int = 0,
+    t_size: int = -1,
+) -> Path:
+    """Crop an image to a region of interest, as fslroi does.
+
+    Sizes of -1 extend the region of interest to the end of the dimension.
+
+    Returns
+    -------
+    Path
+        Path to the output image.
+    """
+    image, data = _load(input_image)
+    data = _pad(data)
+
+    starts = (x_min, y_min, z_min, t_min)
+    slicer = tuple(
+        slice(start, None if size < 0 else start + size)
+        for start, size in zip(starts, (x_size, y_size, z_size, t_size))
+    )
+    return _save(
+        data[slicer],
+        image,
+        output_image,
+        affine=_translate(image.affine, starts),
+    )
+
+
+def _read_volumes(volumes) -> ty.List[int]:
+    if isinstance(volumes, (str, os.PathLike)):
+        with open(volumes, "rt") as f:
+            volumes = re.split(r"[\s,]+", f.read().strip())
+    return [int(volume) for volume in volumes]
+
+
+def select_volumes(
+    input_image: os.PathLike,
+    output_image: os.PathLike,
+    volumes: ty.Union[os.PathLike, ty.Iterable[int]],
+    calculate_mean: bool = False,
+    calculate_variance: bool = False,
+) -> Path:
+    """Select volumes of an image, as fslselectvols does.
+
+    Parameters
+    ----------
+    input_image : path-like
+        Input image.
+    output_image : path-like
+        Output image.
+    volumes : path-like or iterable of int
+        Indices of the volumes to select, or a text file listing them.
+    calculate_mean : bool
+        Output the mean of the selected volumes instead of the volumes themselves.
+    calculate_variance : bool
+        Output the (unbiased) variance of the selected volumes instead.
+
+    Returns
+    -------
+    Path
+        Path to the output image.
+    """
+    image, data = _load(input_image)
+    data = _pad(data)
+    volumes = _read_volumes(volumes)
+
+    if not (calculate_mean or calculate_variance):
+        # Selected volumes are copied one by one into the output buffer.
+        output = np.empty(data.shape[:3] + (len(volumes),), dtype=data.dtype)
+        for index, volume in enumerate(volumes):
+            output[..., index] = data[..., volume]
+        return _save(output, image, output_image)
+
+    # Accumulate volume by volume, so that only the selected volumes are read.
+    total = np.zeros(data.shape[:3], dtype=np.float64)
+    squares = np.zeros_like(total) if calculate_variance else None
+    for volume in volumes:
+        values = data[..., volume].astype(np.float64)
+        total += values
+        if squares is not None:
+            squares += values * values
+
+    count = len(volumes)
+    mean = total / count
+    if squares is None:
+        output = mean
+    else:
+        output = (squares - count * mean * mean) / max(count - 1, 1)
+    return _save(output.astype(np.float32), image, output_image)
+
+
+def _merge_axis(images, dimension: str) -> int:
+    if dimension == "a":
+        # Single slices are stacked into a volume, volumes into a series.
+        single_slices = all(_pad_shape(image.shape)[2:] == (1, 1) for image in images)
+        dimension = "z" if single_slices else "t"
+    elif dimension == "tr":
+        dimension = "t"
+    return _AXES[dimension]
+
+
+def _pad_shape(shape: ty.Tuple[int, ...], ndim: int = 4) -> ty.Tuple[int, ...]:
+    return tuple(shape) + (1,) * (ndim - len(shape))
+
+
+def _output_header(reference, path: Path, shape, dtype, repetition_time):
+    v2 = isinstance(reference.header, nib.Nifti2Header)
+    if path.name.endswith((".img", ".img.gz")):
+        klass = Nifti2PairHeader if v2 else Nifti1PairHeader
+    else:
+        klass = nib.Nifti2Header if v2 else nib.Nifti1Header
+
+    header = klass.from_header(reference.header)
+    header.set_data_shape(shape)
+    header.set_data_dtype(dtype)
+    header.set_slope_inter(1, 0)
+    header["vox_offset"] = 0
+    header.extensions.clear()
+    if repetition_time is not None and len(shape) > 3:
+        header["pixdim"][4] = repetition_time
+    return header
+
+
+def _pair_paths(path: Path) -> ty.Tuple[Path, Path]:
+    # Paths to the data and the header of an image, which differ for NIfTI pairs.
+    for hdr_ext, img_ext in ((".hdr", ".img"), (".hdr.gz", ".img.gz")):
+        if path.name.endswith(img_ext):
+            return path, path.with_name(path.name[: -len(img_ext)] + hdr_ext)
+    return path, path
+
+
+def merge(
+    input_images: ty.Sequence[os.PathLike],
+    output_image: os.PathLike,
+    dimension: str = "t",
+    repetition_time: ty.Optional[float] = None,
+    volume_index: ty.Optional[int] = None,
+) -> Path:
+    """Concatenate images along a dimension, as fslmerge does.
+
+    The output header is computed from the headers of the inputs, then the output is
+    written volume by volume, so that memory usage is bounded by a single volume
+    whatever the number of inputs.
+
+    Parameters
+    ----------
+    input_images : sequence of path-like
+        Images to concatenate, in order.
+    output_image : path-like
+        Output image.
+    dimension : {"x", "y", "z", "t", "a", "tr"}
+        Dimension along which to concatenate images. ``a`` stacks single slices into a
+        volume and volumes into a series, ``tr`` concatenates in time and sets the
+        repetition time.
+    repetition_time : float, optional
+        Repetition time of the output series, in seconds.
+    volume_index : int, optional
+        Concatenate only this volume of each input image in time.
+
+    Returns
+    -------
+    Path
+        Path to the output image.
+    """
+    # Images are loaded lazily: only their headers are read at this point, and their
+    # files are opened again for each volume read, so that at most one input is open
+    # at a time whatever the number of inputs.
+    images = [nib.load(os.fspath(path)) for path in input_images]
+    if not images:
+        raise ValueError("No input images to merge")
+
+    if volume_index is not None:
+        axis = _AXES["t"]
+        volumes = [(image, [volume_index]) for image in images]
+    else:
+        axis = _merge_axis(images, dimension)
+        volumes = [(image, range(_pad_shape(image.shape)[3])) for image in images]
+
+    shape = list(_pad_shape(images[0].shape))
+    for path, image in zip(input_images, images):
+        other = _pad_shape(image.shape)
+        if other[:axis] + other[axis + 1 : 3] != tuple(
+            shape[:axis] + shape[axis + 1 : 3]
+        ):
+            raise ValueError(
+                f"Image {path} of shape {image.shape} cannot be merged along axis "
+                f"{axis} with images of shape {images[0].shape}"
+            )
+        if axis < 3 and other[3] != shape[3]:
+            raise ValueError(
+                f"Image {path} of {other[3]} volumes cannot be merged along axis {axis} "
+                f"with images of {shape[3]} volumes"
+            )
+    if axis < 3:
+        shape[axis] = sum(_pad_shape(image.shape)[axis] for image in images)
+    else:
+        shape[3] = sum(len(indices) for _, indices in volumes)
+
+    scaled = any(
+        not (image.dataobj.slope == 1 and image.dataobj.inter == 0) for image in images
+    )
+    dtype = (
+        np.dtype(np.float32)
+        if scaled
+        else np.result_type(*(image.get_data_dtype() for image in images))
+    )
+
+    output_image = output_path(output_image)
+    data_path, header_path = _pair_paths(output_image)
+    header = _output_header(
+        images[0],
+        output_image,
+        _squeeze_shape(shape),
+        dtype,
+        repetition_time,
+    )
+    # Volumes are written in the byte order of the header.
+    disk_dtype = header.get_data_dtype()
+
+    def _volumes():
+        if axis == 3:
+            for image, indices in volumes:
+                for index in indices:
+                    yield _volume(image, index)
+        else:
+            # Volumes along x, y or z are interleaved, so assemble one output volume at
+            # a time from the corresponding volume of every input.
+            for index in range(shape[3]):
+                yield np.concatenate(
+                    [_volume(image, index) for image in images], axis=axis
+                )
+
+    with Opener(header_path, "wb") as fileobj:
+        header.write_to(fileobj)
+        if header_path == data_path:
+            fileobj.write(b"\x00" * (int(header["vox_offset"]) - fileobj.tell()))
+            for volume in _volumes():
+                fileobj.write(volume.astype(disk_dtype).tobytes(order="F"))
+    if header_path != data_path:
+        with Opener(data_path, "wb") as fileobj:
+            for volume in _volumes():
+                fileobj.write(volume.astype(disk_dtype).tobytes(order="F"))
+
+    return output_image
+
+
+def _volume(image, index: int) -> np.ndarray:
+    # Only the requested volume is read (and decompressed) from the image.
+    if len(image.shape) <= 3:
+        return _pad(np.asanyarray(image.dataobj), 3)
+    return np.asanyarray(image.dataobj[..., index])
@@ -0,0 +1,189 @@
+"""
+XFM
+===
+
+In-process affine algebra on FSL transformation matrices, as performed by convert_xfm.
+
+Matrices are read from and written to the 4x4 ASCII format of FSL, and every operation
+accepts stacks of matrices, so that composing or inverting the transformations of a
+whole series (e.g. the ``MAT_####`` files of MCFLIRT) is a single vectorized call.
+
+Examples
+--------
+
+>>> import numpy as np
+>>> shift = np.eye(4)
+>>> shift[:3, 3] = [1.0, 2.0, 3.0]
+>>> print(format_matrix(invert(shift)), end="")  # doctest: +NORMALIZE_WHITESPACE
+1  0  0  -1
+0  1  0  -2
+0  0  1  -3
+0  0  0  1
+
+Concatenate all the volume-to-reference transformations of MCFLIRT with a
+reference-to-standard transformation:
+
+>>> convert_xfm(
+...     sorted(glob("mcflirt.mat/MAT_*")),
+...     [f"vol{index:04d}_to_std.mat" for index in range(300)],
+...     concat_matrix="ref_to_std.mat",
+... )  # doctest: +SKIP
+"""
+
+__all__ = [
+    "compose",
+    "convert_xfm",
+    "fix_scale_skew",
+    "format_matrix",
+    "invert",
+    "read_matrices",
+    "read_matrix",
+    "write_matrix",
+]
+
+import os
+import typing as ty
+
+import numpy as np
+
+
+def read_matrix(path: os.PathLike) -> np.ndarray:
+    """Read a 4x4 matrix in FSL ASCII format."""
+    matrix = np.loadtxt(path, ndmin=2)
+    if matrix.shape != (4, 4):
+        raise ValueError(f"{path} does not contain a 4x4 matrix")
+    return matrix
+
+
+def read_matrices(paths: ty.Iterable[os.PathLike]) -> np.ndarray:
+    """Read many matrices in FSL ASCII format into a (N, 4, 4) stack."""
+    return np.stack([read_matrix(path) for path in paths])
+
+
+def format_matrix(matrix: np.ndarray) -> str:
+    """Format a 4x4 matrix as convert_xfm does, with 10 significant digits."""
+    return "".join("".join(f"{value:.10g}  " for value in row) + "\n" for row in matrix)
+
+
+def write_matrix(path: os.PathLike, matrix: np.ndarray) -> os.PathLike:
+    """Write a 4x4 matrix in FSL ASCII format."""
+    with open(path, "wt") as f:
+        f.write(format_matrix(matrix))
+    return path
+
+
+def compose(second: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Compose transformations, applying ``first`` then ``second``.
+
+    Both arguments may be single matrices or stacks of matrices, broadcast against
+    each other, as with ``convert_xfm -concat second first``.
+    """
+    return np.matmul(second, first)
+
+
+def invert(matrices: np.ndarray) -> np.ndarray:
+    """Invert a matrix or a stack of matrices, as with ``convert_xfm -inverse``."""
+    return np.linalg.inv(matrices)
+
+
+def _dot(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return np.sum(u * v, axis=-1)
+
+
+def _float(value: np.ndarray) -> np.ndarray:
+    return value.astype(np.float32).astype(np.float64)
+
+
+def _scales_skews(matrices: np.ndarray) -> ty.Tuple[np.ndarray, np.ndarray]:
+    # Decompose the linear part into R @ K @ S, with S diagonal scales and K an upper
+    # triangular skew, as FSL's decompose_aff does. Scales and skews are rounded to
+    # single precision, FSL storing them as floats.
+    x, y, z = (matrices[..., :3, i] for i in range(3))
+
+    sx = _float(np.sqrt(_dot(x, x)))
+    sy = _float(np.sqrt(_dot(y, y) - _dot(x, y) ** 2 / sx**2))
+    a = _float(_dot(x, y) / (sx * sy))
+    x0 = x / sx[..., None]
+    y0 = y / sy[..., None] - a[..., None] * x0
+    sz = _float(np.sqrt(_dot(z, z) - _dot(x0, z) ** 2 - _dot(y0, z) ** 2))
+    b = _float(_dot(x0, z) / sz)
+    c = _float(_dot(y0, z) / sz)
+
+    scales = np.zeros(matrices.shape[:-2] + (3, 3))
+    scales[..., 0, 0], scales[..., 1, 1], scales[..., 2, 2] = sx, sy, sz
+    skews = np.broadcast_to(np.eye(3), scales.shape).copy()
+    skews[..., 0, 1], skews[..., 0, 2], skews[..., 1, 2] = a, b, c
+    return scales, skews
+
+
+def fix_scale_skew(matrices: np.ndarray, fix: np.ndarray) -> np.ndarray:
+    """Replace the scales and skews of transformations with those of ``fix``.
+
+    Rotations and translations of ``matrices`` are kept, as with
+    ``convert_xfm -fixscaleskew fix``. Both arguments may be stacks of matrices.
+    """
+    matrices, fix = np.broadcast_arrays(matrices, fix)
+    scales, skews = _scales_skews(matrices)
+    rotations = matrices[..., :3, :3] @ np.linalg.inv(scales) @ np.linalg.inv(skews)
+    fix_scales, fix_skews = _scales_skews(fix)
+
+    output = matrices.copy()
+    output[..., :3, :3] = rotations @ fix_skews @ fix_scales
+    return output
+
+
+def convert_xfm(
+    input_matrices: ty.Union[os.PathLike, ty.Sequence[os.PathLike]],
+    output_matrices: ty.Union[os.PathLike, ty.Sequence[os.PathLike]],
+    concat_matrix: ty.Optional[ty.Union[os.PathLike, ty.Sequence[os.PathLike]]] = None,
+    fixscaleskew_matrix: ty.Optional[
+        ty.Union[os.PathLike, ty.Sequence[os.PathLike]]
+    ] = None,
+    inverse: bool = False,
+):
+    """Apply the operations of convert_xfm to one or many matrix files.
+
+    Operations are applied in the order of convert_xfm: concatenation, then fixing of
+    scales and skews, then inversion.
+
+    Parameters
+    ----------
+    input_matrices : path-like or sequence of path-like
+        Input matrices.
+    output_matrices : path-like or sequence of path-like
+        Output matrices, one per input matrix.
+    concat_matrix : path-like or sequence of path-like, optional
+        Matrix, or matrices (one per input matrix), to concatenate after the input.
+    fixscaleskew_matrix : path-like or sequence of path-like, optional
+        Matrix, or matrices, whose scales and skews replace those of the result.
+    inverse : bool
+        Invert the result.
+
+    Returns
+    -------
+    path-like or list of path-like
+        Output matrices.
+    """
+
+    def _read(paths):
+        if isinstance(paths, (str, os.PathLike)):
+            return read_matrix(paths)
+        return read_matrices(paths)
+
+    matrices = _read(input_matrices)
+    if concat_matrix is not None:
+        matrices = compose(_read(concat_matrix), matrices)
+    if fixscaleskew_matrix is not None:
+        matrices = fix_scale_skew(matrices, _read(fixscaleskew_matrix))
+    if inverse:
+        matrices = invert(matrices)
+
+    if isinstance(output_matrices, (str, os.PathLike)):
+        return write_matrix(output_matrices, matrices)
+    if len(output_matrices) != len(matrices):
+        raise ValueError(
+            f"Expected {len(matrices)} output matrices, got {len(output_matrices)}"
+        )
+    return [
+        write_matrix(path, matrix) for path, matrix in zip(output_matrices, matrices)
+    ]
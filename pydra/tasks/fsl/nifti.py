@@ -0,0 +1,193 @@
+"""
+NIfTI
+=====
+
+Lightweight access to the header of NIfTI-1, NIfTI-2 and ANALYZE images.
+
+Only the first 348 (NIfTI-1, ANALYZE) or 540 (NIfTI-2) bytes of an image are read,
+through a gzip stream when the image is compressed, so that probing the geometry of a
+large series does not require loading or decompressing its data.
+Parsed headers are cached per path, modification time and size.
+
+Examples
+--------
+
+>>> header = read_header("dwi.nii.gz")  # doctest: +SKIP
+>>> header.shape  # doctest: +SKIP
+(96, 96, 60, 300)
+>>> num_volumes("dwi.nii.gz")  # doctest: +SKIP
+300
+"""
+
+__all__ = ["NiftiHeader", "read_header", "image_shape", "num_volumes"]
+
+import functools
+import gzip
+import os
+import struct
+import typing as ty
+
+NIFTI1_HEADER_SIZE = 348
+NIFTI2_HEADER_SIZE = 540
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class NiftiHeader(ty.NamedTuple):
+    """Essential fields of a NIfTI header."""
+
+    #: NIfTI version (1 or 2), 0 for ANALYZE 7.5
+    version: int
+    #: byte order of the header and data ("<" or ">")
+    endianness: str
+    #: size of each of the used dimensions
+    shape: ty.Tuple[int, ...]
+    #: NIfTI data type code
+    datatype: int
+    bitpix: int
+    #: voxel spacing of each of the used dimensions
+    pixdim: ty.Tuple[float, ...]
+    #: sign of the qform determinant
+    qfac: float
+    vox_offset: int
+    scl_slope: float
+    scl_inter: float
+    cal_max: float
+    cal_min: float
+    qform_code: int
+    sform_code: int
+    #: quaternion parameters (b, c, d) of the qform
+    quatern: ty.Tuple[float, float, float]
+    #: offsets (x, y, z) of the qform
+    qoffset: ty.Tuple[float, float, float]
+    #: rows of the sform affine
+    srow: ty.Tuple[ty.Tuple[float, ...], ...]
+    xyzt_units: int
+    #: magic string (n+1, ni1, n+2, ni2 or empty for ANALYZE)
+    magic: str
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def single_file(self) -> bool:
+        """Whether header and data are stored in a single file."""
+        return self.magic.startswith("n+")
+
+
+def _header_path(path: str) -> str:
+    # The header of a NIfTI or ANALYZE pair is stored in a separate .hdr file.
+    for img_ext, hdr_ext in ((".img", ".hdr"), (".img.gz", ".hdr.gz")):
+        if path.endswith(img_ext):
+            return path[: -len(img_ext)] + hdr_ext
+    return path
+
+
+def _read_bytes(path: str, size: int) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read(size)
+    if data[:2] == _GZIP_MAGIC:
+        with gzip.open(path, "rb") as f:
+            data = f.read(size)
+    return data
+
+
+def _parse_nifti1(data: bytes, endianness: str) -> NiftiHeader:
+    e = endianness
+    dim = struct.unpack_from(e + "8h", data, 40)
+    pixdim = struct.unpack_from(e + "8f", data, 76)
+    ndim = max(0, min(dim[0], 7))
+    magic = data[344:348].rstrip(b"\x00").decode("latin-1")
+    return NiftiHeader(
+        version=1 if magic else 0,
+        endianness=e,
+        shape=tuple(dim[1 : ndim + 1]),
+        datatype=struct.unpack_from(e + "h", data, 70)[0],
+        bitpix=struct.unpack_from(e + "h", data, 72)[0],
+        pixdim=tuple(pixdim[1 : ndim + 1]),
+        qfac=-1.0 if pixdim[0] < 0 else 1.0,
+        vox_offset=int(struct.unpack_from(e + "f", data, 108)[0]),
+        scl_slope=struct.unpack_from(e + "f", data, 112)[0],
+        scl_inter=struct.unpack_from(e + "f", data, 116)[0],
+        cal_max=struct.unpack_from(e + "f", data, 124)[0],
+        cal_min=struct.unpack_from(e + "f", data, 128)[0],
+        qform_code=struct.unpack_from(e + "h", data, 252)[0],
+        sform_code=struct.unpack_from(e + "h", data, 254)[0],
+        quatern=struct.unpack_from(e + "3f", data, 256),
+        qoffset=struct.unpack_from(e + "3f", data, 268),
+        srow=tuple(struct.unpack_from(e + "4f", data, 280 + 16 * i) for i in range(3)),
+        xyzt_units=data[123],
+        magic=magic,
+    )
+
+
+def _parse_nifti2(data: bytes, endianness: str) -> NiftiHeader:
+    e = endianness
+    dim = struct.unpack_from(e + "8q", data, 16)
+    pixdim = struct.unpack_from(e + "8d", data, 104)
+    ndim = max(0, min(dim[0], 7))
+    return NiftiHeader(
+        version=2,
+        endianness=e,
+        shape=tuple(dim[1 : ndim + 1]),
+        datatype=struct.unpack_from(e + "h", data, 12)[0],
+        bitpix=struct.unpack_from(e + "h", data, 14)[0],
+        pixdim=tuple(pixdim[1 : ndim + 1]),
+        qfac=-1.0 if pixdim[0] < 0 else 1.0,
+        vox_offset=struct.unpack_from(e + "q", data, 168)[0],
+        scl_slope=struct.unpack_from(e + "d", data, 176)[0],
+        scl_inter=struct.unpack_from(e + "d", data, 184)[0],
+        cal_max=struct.unpack_from(e + "d", data, 192)[0],
+        cal_min=struct.unpack_from(e + "d", data, 200)[0],
+        qform_code=struct.unpack_from(e + "i", data, 344)[0],
+        sform_code=struct.unpack_from(e + "i", data, 348)[0],
+        quatern=struct.unpack_from(e + "3d", data, 352),
+        qoffset=struct.unpack_from(e + "3d", data, 376),
+        srow=tuple(struct.unpack_from(e + "4d", data, 400 + 32 * i) for i in range(3)),
+        xyzt_units=struct.unpack_from(e + "i", data, 500)[0],
+        magic=data[4:8].rstrip(b"\x00").decode("latin-1"),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_header(path: str, mtime_ns: int, size: int) -> NiftiHeader:
+    data = _read_bytes(path, NIFTI2_HEADER_SIZE)
+
+    for endianness in "<>":
+        (sizeof_hdr,) = struct.unpack_from(endianness + "i", data, 0)
+        if sizeof_hdr == NIFTI1_HEADER_SIZE and len(data) >= NIFTI1_HEADER_SIZE:
+            return _parse_nifti1(data, endianness)
+        if sizeof_hdr == NIFTI2_HEADER_SIZE and len(data) >= NIFTI2_HEADER_SIZE:
+            return _parse_nifti2(data, endianness)
+
+    raise ValueError(f"{path} is not a valid NIfTI or ANALYZE image")
+
+
+def read_header(path: os.PathLike) -> NiftiHeader:
+    """Read the header of a NIfTI or ANALYZE image.
+
+    Parameters
+    ----------
+    path : path-like
+        Path to the image, compressed or not.
+
+    Returns
+    -------
+    NiftiHeader
+        Parsed header, cached until the file is modified.
+    """
+    path = _header_path(os.fspath(path))
+    stat = os.stat(path)
+    return _read_header(path, stat.st_mtime_ns, stat.st_size)
+
+
+def image_shape(path: os.PathLike) -> ty.Tuple[int, ...]:
+    """Return the shape of an image, as found in its header."""
+    return read_header(path).shape
+
+
+def num_volumes(path: os.PathLike) -> int:
+    """Return the number of volumes of an image, 1 for 3D images."""
+    shape = read_header(path).shape
+    return shape[3] if len(shape) > 3 else 1
@@ -0,0 +1,116 @@
+"""
+Outputs
+=======
+
+Helpers shared by the output callables of FSL tasks.
+
+Interfaces converted from Nipype resolve every output field through a single
+``_list_outputs`` function, which each ``*_callable`` then indexes for its own
+field. Decorating ``_list_outputs`` with :func:`cache_outputs` makes all the
+callables of one task run share a single resolution of the outputs.
+
+Examples
+--------
+
+>>> calls = []
+>>> @cache_outputs
+... def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
+...     calls.append(output_dir)
+...     return {"out_file": f"{output_dir}/out.nii.gz"}
+>>> _list_outputs(inputs=None, stdout="", stderr="", output_dir="/nonexistent")
+{'out_file': '/nonexistent/out.nii.gz'}
+>>> _list_outputs(inputs=None, stdout="", stderr="", output_dir="/nonexistent")
+{'out_file': '/nonexistent/out.nii.gz'}
+>>> len(calls)
+1
+>>> clear_outputs_cache()
+"""
+
+__all__ = ["cache_outputs", "clear_outputs_cache"]
+
+import functools
+import os
+import threading
+from collections import OrderedDict
+
+import attrs
+
+# Enough entries to cover the tasks of a worker running concurrently, while keeping
+# the memory footprint of long-lived workers bounded.
+_CACHE_SIZE = 256
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _inputs_key(inputs):
+    """Build a hashable key from the values of the input fields.
+
+    File inputs are keyed on their path rather than their content, the output directory
+    of a pydra task already being derived from the content hash of its inputs.
+    """
+    if attrs.has(type(inputs)):
+        return tuple(
+            (f.name, repr(getattr(inputs, f.name))) for f in attrs.fields(type(inputs))
+        )
+    return repr(inputs)
+
+
+def _output_dir_key(output_dir):
+    # The modification time of the output directory changes whenever files are added to
+    # or removed from it, which invalidates outputs resolved by globbing a previous run.
+    try:
+        return str(output_dir), os.stat(output_dir).st_mtime_ns
+    except (OSError, TypeError, ValueError):
+        return str(output_dir), None
+
+
+def cache_outputs(list_outputs):
+    """Memoize the outputs resolved by a ``_list_outputs`` function.
+
+    Resolved outputs are keyed on the input values and the output directory of the
+    task run, as well as the captured stdout and stderr which some interfaces parse
+    and the current working directory which relative output paths depend upon.
+
+    The returned dictionary is shared between callers and must not be modified.
+    """
+
+    @functools.wraps(list_outputs)
+    def wrapper(inputs=None, stdout=None, stderr=None, output_dir=None, **kwargs):
+        key = (
+            list_outputs,
+            _inputs_key(inputs),
+            _output_dir_key(output_dir),
+            stdout,
+            stderr,
+            os.getcwd(),
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
+
+        with _lock:
+            try:
+                outputs = _cache[key]
+            except KeyError:
+                pass
+            else:
+                _cache.move_to_end(key)
+                return outputs
+
+        outputs = list_outputs(
+            inputs=inputs, stdout=stdout, stderr=stderr, output_dir=output_dir, **kwargs
+        )
+
+        with _lock:
+            _cache[key] = outputs
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+
+        return outputs
+
+    return wrapper
+
+
+def clear_outputs_cache():
+    """Discard all memoized outputs."""
+    with _lock:
+        _cache.clear()
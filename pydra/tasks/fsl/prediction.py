@@ -0,0 +1,279 @@
+"""
+Prediction
+==========
+
+Prediction of the runtime and peak memory of FSL tasks from the geometry of their main
+input image, before they are submitted.
+
+The resources used by FNIRT, Eddy, Topup, FAST and BET grow with the number of voxels
+and volumes of their input and with its data type. For each task, a predictor fits
+linear models of the wall time and peak memory recorded by
+:mod:`pydra.tasks.fsl.usage`::
+
+    a + b * voxels * volumes + c * voxels * volumes * bytes_per_voxel
+
+scaled by a safety margin, the 95th percentile of the ratios of recorded to fitted
+values, so that few runs exceed their prediction.
+
+When ``PYDRA_FSL_PREDICTOR`` is set to the path of a fitted predictor, tasks declaring
+resource hints (see :mod:`pydra.tasks.fsl.resources`) request the predicted memory and
+runtime from schedulers instead of their static hints.
+
+Predictors are fitted from the records found in pydra cache directories with the
+``pydra-fsl-refit`` command::
+
+    pydra-fsl-refit --output predictor.json ~/.cache/pydra /scratch/pydra-cache
+
+Examples
+--------
+
+>>> records = [
+...     {
+...         "task": "BET",
+...         "return_code": 0,
+...         "geometry": {"voxels": n * 10**6, "volumes": 1, "bytes_per_voxel": 2},
+...         "usage": {"wall_time": 1 + n, "peak_rss": 2**26 + 8 * n * 10**6},
+...     }
+...     for n in (1, 2, 4, 8, 16)
+... ]
+>>> models = Predictor.fit(records)
+>>> models
+Predictor(['BET'])
+>>> geometry = {"voxels": 3 * 10**6, "volumes": 1, "bytes_per_voxel": 2}
+>>> prediction = models.predict("BET", geometry)
+>>> round(prediction.runtime, 1), round(prediction.memory_gb, 3)
+(4.0, 0.085)
+"""
+
+__all__ = [
+    "DEFAULT_QUANTILE",
+    "MIN_RECORDS",
+    "LinearModel",
+    "Prediction",
+    "Predictor",
+    "collect_records",
+    "main",
+    "predict",
+    "predictor",
+]
+
+import argparse
+import functools
+import json
+import os
+import sys
+import typing as ty
+from pathlib import Path
+
+from .usage import GEOMETRY_INPUTS, USAGE_FILE, input_geometry
+
+#: Quantile of the ratios of recorded to fitted values used as safety margin.
+DEFAULT_QUANTILE = 0.95
+
+#: Minimum number of records of a task to fit its models.
+MIN_RECORDS = 5
+
+
+def _features(geometry: ty.Mapping[str, int]) -> ty.List[float]:
+    size = geometry["voxels"] * geometry["volumes"]
+    return [1.0, float(size), float(size * geometry["bytes_per_voxel"])]
+
+
+class LinearModel(ty.NamedTuple):
+    """Linear model of a resource, with a safety margin."""
+
+    #: coefficients of the features of the geometry
+    coefficients: ty.Tuple[float, ...]
+    #: factor applied to fitted values
+    margin: float = 1.0
+    #: lowest recorded value, below which predictions are clipped
+    minimum: float = 0.0
+
+    def __call__(self, geometry: ty.Mapping[str, int]) -> float:
+        fitted = sum(c * x for c, x in zip(self.coefficients, _features(geometry)))
+        return max(fitted * self.margin, self.minimum)
+
+    @classmethod
+    def fit(
+        cls, geometries: ty.Sequence[ty.Mapping[str, int]], values: ty.Sequence[float]
+    ) -> "LinearModel":
+        """Fit a model to the values recorded for the given geometries."""
+        import numpy as np
+
+        features = np.array([_features(geometry) for geometry in geometries])
+        values = np.asarray(values, dtype=float)
+        # Features are scaled, as sizes dwarf the intercept.
+        scale = np.abs(features).max(axis=0)
+        coefficients = np.linalg.lstsq(features / scale, values, rcond=None)[0] / scale
+        fitted = np.maximum(features @ coefficients, np.finfo(float).tiny)
+        margin = max(float(np.quantile(values / fitted, DEFAULT_QUANTILE)), 1.0)
+        return cls(tuple(coefficients.tolist()), margin, float(values.min()))
+
+
+class Prediction(ty.NamedTuple):
+    """Resources predicted for a run of a task."""
+
+    #: wall time, in seconds
+    runtime: float
+    #: peak resident memory, in bytes
+    memory: float
+
+    @property
+    def memory_gb(self) -> float:
+        """Peak resident memory, in GiB."""
+        return self.memory / 2**30
+
+
+class Predictor:
+    """Models of the runtime and peak memory of tasks, by task name."""
+
+    def __init__(self, models: ty.Mapping[str, ty.Tuple[LinearModel, LinearModel]]):
+        #: models of the runtime and of the memory of each task
+        self.models = dict(models)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({sorted(self.models)})"
+
+    @classmethod
+    def fit(
+        cls, records: ty.Iterable[ty.Mapping], min_records: int = MIN_RECORDS
+    ) -> "Predictor":
+        """Fit models to the records of successful runs.
+
+        Parameters
+        ----------
+        records : iterable of dict
+            Records of runs, as written by :mod:`pydra.tasks.fsl.usage`.
+        min_records : int
+            Minimum number of records of a task to fit its models.
+
+        Returns
+        -------
+        Predictor
+            Models of the tasks with enough records.
+        """
+        by_task = {}
+        for record in records:
+            if record.get("return_code") or not record.get("geometry"):
+                continue
+            by_task.setdefault(record["task"], []).append(record)
+
+        models = {}
+        for task, runs in by_task.items():
+            if len(runs) < min_records:
+                continue
+            geometries = [run["geometry"] for run in runs]
+            models[task] = (
+                LinearModel.fit(
+                    geometries, [run["usage"]["wall_time"] for run in runs]
+                ),
+                LinearModel.fit(geometries, [run["usage"]["peak_rss"] for run in runs]),
+            )
+        return cls(models)
+
+    def predict(
+        self, task: str, geometry: ty.Optional[ty.Mapping[str, int]]
+    ) -> ty.Optional[Prediction]:
+        """Predict the resources of a run of a task on an image of the given geometry."""
+        if task not in self.models or not geometry:
+            return None
+        runtime, memory = self.models[task]
+        return Prediction(runtime(geometry), memory(geometry))
+
+    def save(self, path: os.PathLike):
+        """Save models as JSON."""
+        models = {
+            task: {"runtime": runtime._asdict(), "memory": memory._asdict()}
+            for task, (runtime, memory) in self.models.items()
+        }
+        Path(path).write_text(json.dumps(models, indent=2))
+
+    @classmethod
+    def load(cls, path: os.PathLike) -> "Predictor":
+        """Load models saved as JSON."""
+        models = json.loads(Path(path).read_text())
+        return cls(
+            {
+                task: (
+                    LinearModel(**model["runtime"]),
+                    LinearModel(**model["memory"]),
+                )
+                for task, model in models.items()
+            }
+        )
+
+
+@functools.lru_cache(maxsize=4)
+def _load(path: str, mtime_ns: int) -> Predictor:
+    return Predictor.load(path)
+
+
+def predictor() -> ty.Optional[Predictor]:
+    """Return the predictor set by ``$PYDRA_FSL_PREDICTOR``, if any."""
+    path = os.getenv("PYDRA_FSL_PREDICTOR")
+    if not path or not os.path.exists(path):
+        return None
+    return _load(path, os.stat(path).st_mtime_ns)
+
+
+def predict(task) -> ty.Optional[Prediction]:
+    """Predict the resources of a run of a task, if a predictor is set and knows it."""
+    if type(task).__name__ not in GEOMETRY_INPUTS:
+        return None
+    models = predictor()
+    if models is None:
+        return None
+    return models.predict(type(task).__name__, input_geometry(task))
+
+
+def collect_records(paths: ty.Iterable[os.PathLike]) -> ty.Iterator[dict]:
+    """Collect the records of runs found in directories (e.g. pydra caches) or files."""
+    for path in paths:
+        path = Path(path)
+        for record in [path] if path.is_file() else path.rglob(USAGE_FILE):
+            try:
+                yield json.loads(record.read_text())
+            except (OSError, ValueError):
+                continue
+
+
+def main(argv: ty.Optional[ty.Sequence[str]] = None) -> int:
+    """Refit the predictor from the records of previous runs."""
+    parser = argparse.ArgumentParser(
+        prog="pydra-fsl-refit",
+        description="Fit the runtime and memory predictor of FSL tasks from the "
+        f"records of previous runs ({USAGE_FILE}).",
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="pydra cache directories or records to learn from"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=os.getenv("PYDRA_FSL_PREDICTOR"),
+        help="predictor to write, $PYDRA_FSL_PREDICTOR by default",
+    )
+    parser.add_argument(
+        "--min-records",
+        type=int,
+        default=MIN_RECORDS,
+        help=f"minimum number of records of a task (default: {MIN_RECORDS})",
+    )
+    args = parser.parse_args(argv)
+    if not args.output:
+        parser.error("no output given and PYDRA_FSL_PREDICTOR is not set")
+
+    fitted = Predictor.fit(collect_records(args.paths), min_records=args.min_records)
+    fitted.save(args.output)
+    for task, (runtime, memory) in sorted(fitted.models.items()):
+        print(
+            f"{task}: runtime margin {runtime.margin:.2f}, "
+            f"memory margin {memory.margin:.2f}"
+        )
+    if not fitted.models:
+        print(f"No task with at least {args.min_records} records", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Resources
+=========
+
+Resource hints of multi-threaded and long-running FSL tasks.
+
+Each hinted task declares the number of threads it runs, its estimated peak memory and
+its expected runtime class. The number of threads follows the ``num_threads`` input of
+the task when set, and is passed on to the tool through its own flag (e.g. ``--nthr``)
+or the ``OMP_NUM_THREADS`` environment variable.
+
+Hints are exposed to pydra workers as ``qsub_args``, from which the SGE worker groups
+tasks by slots and memory, and can be rendered as ``sbatch`` arguments for SLURM.
+
+Examples
+--------
+
+>>> hints = ResourceHints(threads=8, memory_gb=6, runtime="hours")
+>>> hints.qsub_args()
+'-pe smp 8 -l mem_free=6G'
+>>> hints.sbatch_args()
+'--cpus-per-task=8 --mem=6G --time=24:00:00'
+
+Tasks whose resources scale with the geometry of their input image request the
+memory and runtime predicted by :mod:`pydra.tasks.fsl.prediction` instead, when a
+predictor is set by ``PYDRA_FSL_PREDICTOR``.
+
+>>> runtime_class(3 * 3600)
+'hours'
+
+Hints are looked up on tasks and task classes, unhinted ones getting the defaults:
+
+>>> from pydra.tasks.fsl.v6_0.randomise import Randomise
+>>> resource_hints(Randomise)
+ResourceHints(threads=1, memory_gb=2.0, runtime='days')
+"""
+
+__all__ = [
+    "RUNTIMES",
+    "ResourceHints",
+    "ResourceHintsMixin",
+    "resource_hints",
+    "runtime_class",
+]
+
+import math
+import typing as ty
+
+import attrs
+
+from .prediction import predict
+
+#: Runtime classes, mapped to the wall time requested from schedulers.
+RUNTIMES = {
+    "seconds": "00:10:00",
+    "minutes": "02:00:00",
+    "hours": "24:00:00",
+    "days": "7-00:00:00",
+}
+
+
+class ResourceHints(ty.NamedTuple):
+    """Resources required by a run of a task."""
+
+    #: number of threads run concurrently
+    threads: int = 1
+    #: estimated peak memory, in GiB
+    memory_gb: float = 1.0
+    #: expected runtime class, one of RUNTIMES
+    runtime: str = "minutes"
+
+    def qsub_args(self) -> str:
+        """Render hints as arguments of qsub, as used by the SGE worker of pydra."""
+        return f"-pe smp {self.threads} -l mem_free={math.ceil(self.memory_gb)}G"
+
+    def sbatch_args(self) -> str:
+        """Render hints as arguments of sbatch."""
+        return (
+            f"--cpus-per-task={self.threads} --mem={math.ceil(self.memory_gb)}G "
+            f"--time={RUNTIMES[self.runtime]}"
+        )
+
+
+def _seconds(limit: str) -> int:
+    days, _, time = limit.rpartition("-")
+    hours, minutes, seconds = (int(value) for value in time.split(":"))
+    return ((int(days or 0) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def runtime_class(seconds: float) -> str:
+    """Return the shortest runtime class whose wall time covers a duration."""
+    for runtime, limit in RUNTIMES.items():
+        if seconds <= _seconds(limit):
+            return runtime
+    return "days"
+
+
+def resource_hints(task) -> ResourceHints:
+    """Return the resource hints of a task or a task class."""
+    if isinstance(task, ResourceHintsMixin):
+        return task.resources
+    if not isinstance(task, type):
+        task = type(task)
+    return getattr(task, "resource_hints", None) or ResourceHints()
+
+
+class ResourceHintsMixin:
+    """Declare the resources of a task and pass its number of threads on to the tool.
+
+    To be placed before :class:`pydra.engine.ShellCommandTask` in the bases of tasks,
+    which set ``resource_hints`` and may have a ``num_threads`` input.
+    """
+
+    #: resources of a run with the default number of threads
+    resource_hints = ResourceHints()
+
+    #: environment variables set to the number of threads, for tools without a flag
+    thread_variables: ty.Tuple[str, ...] = ()
+
+    @property
+    def num_threads(self) -> ty.Optional[int]:
+        """Number of threads set by the ``num_threads`` input, if any."""
+        value = getattr(self.inputs, "num_threads", attrs.NOTHING)
+        return None if value is attrs.NOTHING or value is None else value
+
+    @property
+    def resources(self) -> ResourceHints:
+        """Resource hints of this run, with predicted memory and runtime if any."""
+        hints = self.resource_hints
+        prediction = predict(self)
+        if prediction is not None:
+            hints = hints._replace(
+                memory_gb=prediction.memory_gb,
+                runtime=runtime_class(prediction.runtime),
+            )
+        if self.num_threads is not None:
+            hints = hints._replace(threads=self.num_threads)
+        return hints
+
+    @property
+    def qsub_args(self) -> str:
+        """Arguments of qsub, derived from the resource hints unless set."""
+        return self.__dict__.get("_qsub_args") or self.resources.qsub_args()
+
+    @qsub_args.setter
+    def qsub_args(self, value: str):
+        self.__dict__["_qsub_args"] = value
+
+    def command_args(self, root=None):
+        args = super().command_args(root=root)
+        if self.num_threads is None or not self.thread_variables:
+            return args
+        variables = [f"{name}={self.num_threads}" for name in self.thread_variables]
+        return ["env", *variables, *args]
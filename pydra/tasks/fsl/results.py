@@ -0,0 +1,309 @@
+"""
+Results
+=======
+
+Content-addressed store of the results of deterministic FSL tasks, shared across
+workflows and cache directories.
+
+Results are keyed on the fingerprints of the input files (see
+:mod:`pydra.tasks.fsl.fingerprint`), the command line (with paths
+replaced by placeholders, so that the location of inputs and of the pydra cache does
+not matter) and the FSL version read from ``$FSLDIR/etc/fslversion``. The store is
+consulted before running a task, populated after a successful run and evicted in
+least-recently-used order once it exceeds its maximum size. The total size of the
+store is kept as a running total, so that stored results are only scanned when it is
+exceeded, results then being evicted down to 90% of the maximum size.
+
+The store is enabled by setting ``PYDRA_FSL_RESULT_STORE`` to its directory, which
+may be shared between users and compute nodes, and optionally its maximum size in
+bytes with ``PYDRA_FSL_RESULT_STORE_SIZE``.
+
+Examples
+--------
+
+>>> import os
+>>> os.environ["PYDRA_FSL_RESULT_STORE"] = "/shared/fsl-results"
+>>> os.environ["PYDRA_FSL_RESULT_STORE_SIZE"] = str(500 * 2**30)
+>>> result_store()
+ResultStore('/shared/fsl-results', max_size=536870912000)
+>>> del os.environ["PYDRA_FSL_RESULT_STORE"]
+>>> del os.environ["PYDRA_FSL_RESULT_STORE_SIZE"]
+>>> result_store() is None
+True
+"""
+
+__all__ = [
+    "DEFAULT_MAX_SIZE",
+    "ResultStore",
+    "StoredResultsMixin",
+    "result_store",
+    "task_key",
+]
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+import typing as ty
+import uuid
+from pathlib import Path
+
+import attrs
+
+from .environment import fsl_version, output_type
+from .fingerprint import fingerprint
+
+#: Maximum size of the store when ``PYDRA_FSL_RESULT_STORE_SIZE`` is not set.
+DEFAULT_MAX_SIZE = 100 * 2**30
+
+# Metadata of a stored result, whose modification time records its last use.
+_RESULT_FILE = "result.json"
+
+# Running total of the sizes of the stored results.
+_LEDGER_FILE = "size"
+
+# Fraction of the maximum size down to which results are evicted, so that a full store
+# is not scanned again on each save.
+_LOW_WATER_MARK = 0.9
+
+# Placeholder of the output directory in command lines and captured outputs.
+_OUTPUT_DIR = "{output_dir}"
+
+
+def _related_files(path: str) -> ty.List[str]:
+    # Files an FSL tool reads for a path: the file itself and the header of a NIfTI
+    # pair, every file of a directory, or the files sharing a basename (e.g. the
+    # outputs of topup passed as --topup to eddy or applytopup).
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+        )
+    if os.path.isfile(path):
+        files = [path]
+        for image, header in ((".img", ".hdr"), (".img.gz", ".hdr.gz")):
+            if path.endswith(image):
+                header = path[: -len(image)] + header
+                if os.path.isfile(header):
+                    files.append(header)
+        return files
+    directory, basename = os.path.split(path)
+    try:
+        names = os.listdir(directory or ".")
+    except OSError:
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in names
+        if name.startswith(basename)
+        and name[len(basename) : len(basename) + 1] in ("_", ".")
+        and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def task_key(task) -> str:
+    """Return the key of the result of a task, independent of where files are."""
+    output_dir = str(task.output_dir)
+    cmdline = task.cmdline.replace(output_dir, _OUTPUT_DIR)
+
+    files = {}
+    for field in attrs.fields(type(task.inputs)):
+        value = getattr(task.inputs, field.name)
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for index, value in enumerate(values):
+            if not isinstance(value, (str, os.PathLike)) or not os.fspath(value):
+                continue
+            path = os.fspath(value)
+            related = _related_files(path)
+            if not related:
+                continue
+            placeholder = f"{{{field.name}.{index}}}"
+            # Longest paths first, so that a path is not replaced within another one.
+            for candidate in sorted({path, os.path.abspath(path)}, key=len)[::-1]:
+                cmdline = cmdline.replace(candidate, placeholder)
+            files[placeholder] = [
+                (os.path.relpath(name, os.path.dirname(path) or "."), fingerprint(name))
+                for name in related
+            ]
+
+    key = {
+        "cmdline": cmdline,
+        "files": files,
+        "fsl_version": fsl_version(),
+        # $FSLOUTPUTTYPE, unless overridden for the run by environment.use_output_type.
+        "output_type": output_type(),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def _is_pydra_file(name: str) -> bool:
+    # Files written by pydra itself in the output directory, e.g. _task.pklz.
+    return name.startswith("_") and name.endswith(".pklz")
+
+
+class ResultStore:
+    """Directory of task results, addressed by :func:`task_key`.
+
+    Parameters
+    ----------
+    root : path-like
+        Directory of the store, created if needed.
+    max_size : int
+        Total size in bytes above which least recently used results are evicted.
+    """
+
+    def __init__(self, root: os.PathLike, max_size: int = DEFAULT_MAX_SIZE):
+        self.root = Path(root)
+        self.max_size = max_size
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self.root)!r}, max_size={self.max_size})"
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _entries(self) -> ty.Iterator[Path]:
+        return self.root.glob(f"??/*/{_RESULT_FILE}")
+
+    def fetch(self, key: str, output_dir: os.PathLike) -> ty.Optional[dict]:
+        """Copy a stored result into an output directory.
+
+        Returns the captured output of the task, or None if the result is not stored.
+        """
+        entry = self._entry(key)
+        try:
+            record = json.loads((entry / _RESULT_FILE).read_text())
+            shutil.copytree(entry / "outputs", output_dir, dirs_exist_ok=True)
+        except (OSError, ValueError):
+            return None
+        # Mark the result as recently used.
+        (entry / _RESULT_FILE).touch()
+
+        output_dir = str(output_dir)
+        return {
+            "return_code": record["return_code"],
+            "stdout": record["stdout"].replace(_OUTPUT_DIR, output_dir),
+            "stderr": record["stderr"].replace(_OUTPUT_DIR, output_dir),
+        }
+
+    def save(self, key: str, output_dir: os.PathLike, output: dict):
+        """Store the content of an output directory and the captured output."""
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        # Results are written aside then renamed, so that they appear atomically.
+        staging = self.root / "staging" / uuid.uuid4().hex
+        shutil.copytree(
+            output_dir,
+            staging / "outputs",
+            ignore=lambda _, names: [name for name in names if _is_pydra_file(name)],
+        )
+        size = sum(path.stat().st_size for path in staging.rglob("*") if path.is_file())
+        output_dir = str(output_dir)
+        record = {
+            "return_code": output["return_code"],
+            "stdout": output["stdout"].replace(output_dir, _OUTPUT_DIR),
+            "stderr": output["stderr"].replace(output_dir, _OUTPUT_DIR),
+            "size": size,
+        }
+        (staging / _RESULT_FILE).write_text(json.dumps(record))
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            staging.rename(entry)
+        except OSError:
+            # Stored concurrently by another task.
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        with self._ledger() as ledger:
+            total = ledger.read()
+            # Stores whose running total is missing or unreadable are scanned.
+            total = int(total) + size if total.isdigit() else None
+            if total is None or total > self.max_size:
+                total = self._evict()
+            ledger.seek(0)
+            ledger.truncate()
+            ledger.write(str(total))
+
+    @contextlib.contextmanager
+    def _ledger(self) -> ty.Iterator[ty.TextIO]:
+        # The running total is updated under an exclusive lock, shared with evictions.
+        fd = os.open(self.root / _LEDGER_FILE, os.O_RDWR | os.O_CREAT, 0o666)
+        with open(fd, "r+") as ledger:
+            fcntl.flock(ledger, fcntl.LOCK_EX)
+            yield ledger
+
+    def evict(self):
+        """Remove least recently used results if the store exceeds its maximum size."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._ledger() as ledger:
+            total = self._evict()
+            ledger.truncate()
+            ledger.write(str(total))
+
+    def _evict(self) -> int:
+        # Evicts down to the low-water mark, returning the size of the remaining results.
+        entries = []
+        for result_file in self._entries():
+            try:
+                size = json.loads(result_file.read_text())["size"]
+                entries.append((result_file.stat().st_mtime, size, result_file.parent))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size:
+            return total
+        for _, size, entry in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size * _LOW_WATER_MARK:
+                break
+            # Renamed before removal, so that it cannot be fetched partially removed.
+            trash = self.root / "staging" / f"{entry.name}.{time.time_ns()}"
+            try:
+                entry.rename(trash)
+            except OSError:
+                continue
+            shutil.rmtree(trash, ignore_errors=True)
+            total -= size
+        return total
+
+
+def result_store() -> ty.Optional[ResultStore]:
+    """Return the store set by ``$PYDRA_FSL_RESULT_STORE``, if any."""
+    root = os.getenv("PYDRA_FSL_RESULT_STORE")
+    if not root:
+        return None
+    max_size = os.getenv("PYDRA_FSL_RESULT_STORE_SIZE")
+    return ResultStore(root, int(max_size) if max_size else DEFAULT_MAX_SIZE)
+
+
+class StoredResultsMixin:
+    """Reuse the results of a task from the result store, when it is enabled.
+
+    To be placed before :class:`pydra.engine.ShellCommandTask` in the bases of tasks
+    whose results only depend on their inputs, command line and FSL version.
+    """
+
+    def _is_deterministic(self) -> bool:
+        """Whether the results of this run can be stored and reused."""
+        return True
+
+    def _run_task(self, *args, **kwargs):
+        store = result_store()
+        if store is None or not self._is_deterministic():
+            return super()._run_task(*args, **kwargs)
+
+        key = task_key(self)
+        output = store.fetch(key, self.output_dir)
+        if output is not None:
+            self.output_ = output
+            return
+
+        super()._run_task(*args, **kwargs)
+        if self.output_["return_code"] == 0:
+            store.save(key, self.output_dir, self.output_)
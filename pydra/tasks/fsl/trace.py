@@ -0,0 +1,143 @@
+"""
+Trace
+=====
+
+Timeline of the phases of FSL tasks, as a Chrome trace viewable with Perfetto or
+``chrome://tracing``.
+
+When ``PYDRA_FSL_TRACE`` is set to the path of a trace file, tasks record a span for
+each of their phases:
+
+- ``init``, the construction and validation of their input specification,
+- ``cmdline``, the rendering of their command line, including ``formatter`` callables,
+- ``run``, their whole run, including the hashing of inputs, the lookup of cached
+  results and the saving of the result,
+- ``validate``, the check of their mandatory, exclusive and required inputs, within
+  ``run``,
+- ``execute``, the run of their executable, or of their numpy backend for tasks such
+  as ``Maths`` or ``ROI``, within ``run``,
+- ``outputs``, the collection of their outputs by output callables, within ``run``,
+
+so that the overhead of pydra and of the task definitions shows against the time spent
+in FSL, e.g. in workflows of many small nodes. Pydra checks inputs at the start of the
+run, which traced tasks check beforehand under ``validate``, pydra then checking them
+again.
+
+Spans are appended to the trace file as they end, in the JSON array format of the
+trace event format, so that tasks run by concurrent workers and processes share a
+single trace.
+
+Examples
+--------
+
+>>> import json, os, tempfile
+>>> path = os.path.join(tempfile.mkdtemp(), "trace.json")
+>>> os.environ["PYDRA_FSL_TRACE"] = path
+>>> with span("merge", cat="workflow", shards=4):
+...     pass
+>>> del os.environ["PYDRA_FSL_TRACE"]
+>>> [event] = json.loads(open(path).read().rstrip(",\\n") + "]")
+>>> event["name"], event["ph"], event["args"]
+('merge', 'X', {'shards': 4})
+"""
+
+__all__ = ["TraceMixin", "span", "trace_path"]
+
+import contextlib
+import json
+import os
+import threading
+import time
+import typing as ty
+
+import attrs
+
+
+def trace_path() -> ty.Optional[str]:
+    """Return the trace file set by ``$PYDRA_FSL_TRACE``, if any."""
+    return os.getenv("PYDRA_FSL_TRACE") or None
+
+
+def _write_event(path: str, event: dict):
+    try:
+        # The first writer opens the array, which is left open as the format allows.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND)
+        os.write(fd, b"[\n")
+    except FileExistsError:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        # A single write per event, so that events of concurrent writers do not mix.
+        os.write(fd, (json.dumps(event) + ",\n").encode())
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def span(name: str, cat: str = "task", **args):
+    """Record the duration of a block as a complete event of the trace, if enabled.
+
+    Parameters
+    ----------
+    name : str
+        Name of the span.
+    cat : str
+        Category of the span, by which spans may be filtered in trace viewers.
+    **args
+        Arguments of the span, shown with it in trace viewers.
+    """
+    path = trace_path()
+    if path is None:
+        yield
+        return
+
+    start = time.time_ns()
+    try:
+        yield
+    finally:
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (time.time_ns() - start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        _write_event(path, event)
+
+
+class TraceMixin:
+    """Record the phases of a task in the trace, when enabled.
+
+    To be placed first in the bases of tasks, so that spans cover the other mixins.
+    """
+
+    def _span(self, phase: str):
+        return span(f"{type(self).__name__}.{phase}", cat=phase, node=self.name)
+
+    def __init__(self, *args, **kwargs):
+        with span(f"{type(self).__name__}.init", cat="init", node=kwargs.get("name")):
+            super().__init__(*args, **kwargs)
+
+    def command_args(self, *args, **kwargs):
+        with self._span("cmdline"):
+            return super().command_args(*args, **kwargs)
+
+    def _run(self, rerun=False, environment=None, **kwargs):
+        with self._span("run"):
+            if trace_path() is not None:
+                # Checked as pydra does at the start of the run, which it repeats.
+                with self._span("validate"):
+                    self.inputs = attrs.evolve(self.inputs, **kwargs)
+                    self.inputs.check_fields_input_spec()
+                kwargs = {}
+            return super()._run(rerun=rerun, environment=environment, **kwargs)
+
+    def _run_task(self, *args, **kwargs):
+        with self._span("execute"):
+            return super()._run_task(*args, **kwargs)
+
+    def _collect_outputs(self, *args, **kwargs):
+        with self._span("outputs"):
+            return super()._collect_outputs(*args, **kwargs)
@@ -0,0 +1,315 @@
+"""
+Usage
+=====
+
+Accounting of the resources used by the FSL executables run by tasks.
+
+When ``PYDRA_FSL_RESOURCE_USAGE`` is set (to anything but ``0``), tasks run their
+executable themselves rather than through :func:`pydra.engine.helpers.execute`, so as to
+record its wall time, user and system CPU times and peak resident memory, as reported
+by ``wait4``, and the bytes it read and wrote, as counted by ``/proc/<pid>/io`` on
+Linux. Resources used by the subprocesses of the executable are included once they have
+been waited for, as FSL scripts do.
+
+The usage of each run is recorded as ``resource_usage.json`` in the output directory
+of the task, and exposed as its ``wall_time``, ``user_time``, ``system_time``,
+``peak_rss``, ``bytes_read`` and ``bytes_written`` outputs, which are None when
+accounting is disabled or the task did not run an executable (e.g. numpy backends).
+Records also hold the name of the task and the geometry of its main input image, from
+which :mod:`pydra.tasks.fsl.prediction` learns to predict the usage of later runs.
+
+Examples
+--------
+
+>>> import os
+>>> os.environ["PYDRA_FSL_RESOURCE_USAGE"] = "1"
+>>> accounting_enabled()
+True
+>>> return_code, stdout, stderr, usage = run_and_account(["echo", "hello"])
+>>> return_code, stdout
+(0, 'hello\\n')
+>>> usage.wall_time >= usage.user_time >= 0
+True
+>>> del os.environ["PYDRA_FSL_RESOURCE_USAGE"]
+>>> accounting_enabled()
+False
+"""
+
+__all__ = [
+    "GEOMETRY_INPUTS",
+    "USAGE_FILE",
+    "ResourceUsage",
+    "ResourceUsageMixin",
+    "ResourceUsageOutSpec",
+    "accounting_enabled",
+    "input_geometry",
+    "read_usage",
+    "run_and_account",
+]
+
+import json
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+import typing as ty
+from pathlib import Path
+
+import attrs
+
+import pydra
+from pydra.engine.environments import Native
+
+from .nifti import read_header
+
+#: Name of the record of the usage of a run, in the output directory of its task.
+USAGE_FILE = "resource_usage.json"
+
+#: Input image whose geometry drives the resources used by a task, by task name.
+GEOMETRY_INPUTS = {
+    "BET": "input_image",
+    "Eddy": "input_image",
+    "FAST": "input_image",
+    # Images are registered, hence warps computed, in the space of the reference.
+    "FNIRT": "reference_image",
+    "Topup": "input_image",
+}
+
+
+class ResourceUsage(ty.NamedTuple):
+    """Resources used by a run of an executable."""
+
+    #: elapsed time, in seconds
+    wall_time: float
+    #: CPU time spent in user mode, in seconds
+    user_time: float
+    #: CPU time spent in kernel mode, in seconds
+    system_time: float
+    #: peak resident set size, in bytes
+    peak_rss: int
+    #: bytes read (``rchar`` of ``/proc/<pid>/io``), None if not available
+    bytes_read: ty.Optional[int] = None
+    #: bytes written (``wchar`` of ``/proc/<pid>/io``), None if not available
+    bytes_written: ty.Optional[int] = None
+
+
+def accounting_enabled() -> bool:
+    """Whether accounting is enabled by ``$PYDRA_FSL_RESOURCE_USAGE``."""
+    return os.getenv("PYDRA_FSL_RESOURCE_USAGE", "0") not in ("", "0")
+
+
+def input_geometry(task) -> ty.Optional[ty.Dict[str, int]]:
+    """Return the geometry of the main input image of a task, if known.
+
+    Parameters
+    ----------
+    task : pydra.engine.ShellCommandTask
+        Task listed in :data:`GEOMETRY_INPUTS`.
+
+    Returns
+    -------
+    dict or None
+        Number of ``voxels`` per volume, number of ``volumes`` and ``bytes_per_voxel``
+        of the image, read from its header, or None if the task is not listed or its
+        image cannot be read.
+    """
+    name = GEOMETRY_INPUTS.get(type(task).__name__)
+    path = getattr(task.inputs, name, attrs.NOTHING) if name else attrs.NOTHING
+    if path is attrs.NOTHING or path is None:
+        return None
+    try:
+        header = read_header(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    shape = header.shape + (1,) * (3 - len(header.shape))
+    volumes = 1
+    for size in shape[3:]:
+        volumes *= size
+    return {
+        "voxels": shape[0] * shape[1] * shape[2],
+        "volumes": volumes,
+        "bytes_per_voxel": max(header.bitpix // 8, 1),
+    }
+
+
+def _read_io(pid: int) -> ty.Dict[str, int]:
+    # Counters of a process which exited but has not been waited for yet.
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            return {key: int(value) for key, value in (line.split(":") for line in f)}
+    except (OSError, ValueError):
+        return {}
+
+
+def _read_stream(stream, chunks: ty.List[bytes]):
+    chunks.append(stream.read())
+    stream.close()
+
+
+def run_and_account(
+    cmd: ty.Sequence[str], strip: bool = False
+) -> ty.Tuple[int, str, str, ResourceUsage]:
+    """Run a command and account for the resources it used.
+
+    Parameters
+    ----------
+    cmd : sequence of str
+        Command line to run.
+    strip : bool
+        Whether to strip the standard output, as :func:`pydra.engine.helpers.execute`.
+
+    Returns
+    -------
+    tuple
+        Return code, standard output and error of the command, and its usage.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Both streams are drained concurrently, lest the command blocks on a full pipe.
+    stdout, stderr = [], []
+    readers = [
+        threading.Thread(target=_read_stream, args=(process.stdout, stdout)),
+        threading.Thread(target=_read_stream, args=(process.stderr, stderr)),
+    ]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+
+    # I/O counters vanish once the process is reaped, so are read before.
+    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    io = _read_io(process.pid)
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_time = time.perf_counter() - start
+    if os.WIFEXITED(status):
+        process.returncode = os.WEXITSTATUS(status)
+    else:
+        process.returncode = -os.WTERMSIG(status)
+
+    usage = ResourceUsage(
+        wall_time=wall_time,
+        user_time=rusage.ru_utime,
+        system_time=rusage.ru_stime,
+        # Kilobytes on Linux, bytes on macOS.
+        peak_rss=rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        bytes_read=io.get("rchar"),
+        bytes_written=io.get("wchar"),
+    )
+    stdout, stderr = stdout[0].decode("utf-8"), stderr[0].decode("utf-8")
+    return process.returncode, stdout.strip() if strip else stdout, stderr, usage
+
+
+def read_usage(output_dir: os.PathLike) -> ty.Optional[ResourceUsage]:
+    """Read the usage recorded in the output directory of a task, if any."""
+    path = Path(output_dir) / USAGE_FILE
+    if not path.exists():
+        return None
+    return ResourceUsage(**json.loads(path.read_text())["usage"])
+
+
+def _usage_callable(field, output_dir):
+    usage = read_usage(output_dir)
+    return None if usage is None else getattr(usage, field.name)
+
+
+def _usage_file_callable(output_dir):
+    path = Path(output_dir) / USAGE_FILE
+    return path if path.exists() else None
+
+
+@attrs.define(slots=False, kw_only=True)
+class ResourceUsageOutSpec(pydra.specs.ShellOutSpec):
+    """Output specifications of the resources used by a task."""
+
+    wall_time: ty.Optional[float] = attrs.field(
+        metadata={
+            "help_string": "elapsed time, in seconds",
+            "callable": _usage_callable,
+        }
+    )
+
+    user_time: ty.Optional[float] = attrs.field(
+        metadata={
+            "help_string": "CPU time spent in user mode, in seconds",
+            "callable": _usage_callable,
+        }
+    )
+
+    system_time: ty.Optional[float] = attrs.field(
+        metadata={
+            "help_string": "CPU time spent in kernel mode, in seconds",
+            "callable": _usage_callable,
+        }
+    )
+
+    peak_rss: ty.Optional[int] = attrs.field(
+        metadata={
+            "help_string": "peak resident set size, in bytes",
+            "callable": _usage_callable,
+        }
+    )
+
+    bytes_read: ty.Optional[int] = attrs.field(
+        metadata={"help_string": "bytes read", "callable": _usage_callable}
+    )
+
+    bytes_written: ty.Optional[int] = attrs.field(
+        metadata={"help_string": "bytes written", "callable": _usage_callable}
+    )
+
+    resource_usage: ty.Optional[pydra.specs.File] = attrs.field(
+        metadata={
+            "help_string": "record of the resources used, as JSON",
+            "callable": _usage_file_callable,
+        }
+    )
+
+
+class ResourceUsageMixin:
+    """Account for the resources used by the executable of a task, when enabled.
+
+    To be placed right before :class:`pydra.engine.ShellCommandTask` in the bases of
+    tasks, whose output specifications are extended with :class:`ResourceUsageOutSpec`.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        spec = cls.output_spec or pydra.specs.SpecInfo(name="Output", fields=[])
+        bases = spec.bases or ()
+        if not any(issubclass(base, ResourceUsageOutSpec) for base in bases):
+            # ResourceUsageOutSpec already derives from ShellOutSpec.
+            bases = tuple(
+                base for base in bases if base is not pydra.specs.ShellOutSpec
+            )
+            cls.output_spec = pydra.specs.SpecInfo(
+                name=spec.name, fields=spec.fields, bases=(*bases, ResourceUsageOutSpec)
+            )
+
+    def _run_task(self, environment=None):
+        if environment is None:
+            environment = self.environment
+        # Containers run executables out of reach of wait4.
+        if not accounting_enabled() or type(environment) is not Native:
+            return super()._run_task(environment)
+
+        command = self.command_args()
+        return_code, stdout, stderr, usage = run_and_account(command, strip=self.strip)
+        record = {
+            "task": type(self).__name__,
+            "command": command,
+            "return_code": return_code,
+            "geometry": input_geometry(self),
+            "usage": usage._asdict(),
+        }
+        (Path(self.output_dir) / USAGE_FILE).write_text(json.dumps(record, indent=2))
+
+        self.output_ = {"return_code": return_code, "stdout": stdout, "stderr": stderr}
+        if return_code:
+            message = f"Error running '{self.name}' task with {command}:"
+            if stderr:
+                message += "\n\nstderr:\n" + stderr
+            if stdout:
+                message += "\n\nstdout:\n" + stdout
+            raise RuntimeError(message)
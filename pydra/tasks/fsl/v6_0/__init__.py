@@ -6,6 +6,10 @@ FSL interfaces are available within the `pydra.tasks.fsl` package.
 
 >>> from pydra.tasks import fsl
 
+Tasks are imported lazily, upon first access, so that importing this package only
+pays for the task modules actually used.
+
+.. automodule:: pydra.tasks.fsl.bedpostx
 .. automodule:: pydra.tasks.fsl.bet
 .. automodule:: pydra.tasks.fsl.eddy
 .. automodule:: pydra.tasks.fsl.fast
@@ -13,57 +17,107 @@ FSL interfaces are available within the `pydra.tasks.fsl` package.
 .. automodule:: pydra.tasks.fsl.fnirt
 .. automodule:: pydra.tasks.fsl.fslmaths
 .. automodule:: pydra.tasks.fsl.fugue
+.. automodule:: pydra.tasks.fsl.probtrackx2
+.. automodule:: pydra.tasks.fsl.randomise
 .. automodule:: pydra.tasks.fsl.susan
 .. automodule:: pydra.tasks.fsl.utils
 """
 
-from . import maths
-from .bet import BET, RobustFOV
-from .eddy import ApplyTopup, Eddy, Topup
-from .fast import FAST
-from .flirt import (
-    FLIRT,
-    ApplyXFM,
-    ConcatXFM,
-    ConvertXFM,
-    FixScaleSkew,
-    Img2ImgCoord,
-    Img2StdCoord,
-    InvertXFM,
-    Std2ImgCoord,
-)
-from .fnirt import FNIRT, ApplyWarp, ConvertWarp, FNIRTFileUtils, InvWarp
-from .fugue import FUGUE, Prelude, PrepareFieldmap, SigLoss
-from .susan import SUSAN
-from .utils import (
-    FFT,
-    ROI,
-    ChFileType,
-    Info,
-    Interleave,
-    Merge,
-    Orient,
-    Reorient2Std,
-    SelectVols,
-    Slice,
-    SmoothFill,
-    Split,
-    SwapDim,
-)
+import importlib
+import os
+
+# Images are hashed through their fingerprints once a strategy is selected, so that
+# workers of other processes inherit the choice through their environment.
+if os.getenv("PYDRA_FSL_FINGERPRINT"):
+    from ..fingerprint import register_image_hashing
+
+    register_image_hashing()
+
+# Map each task to the sub-module providing it.
+_TASKS = {
+    "XFibres5": "bedpostx",
+    "sharded_bedpostx": "bedpostx",
+    "BET": "bet",
+    "RobustFOV": "bet",
+    "ApplyTopup": "eddy",
+    "Eddy": "eddy",
+    "Topup": "eddy",
+    "FAST": "fast",
+    "FLIRT": "flirt",
+    "ApplyXFM": "flirt",
+    "ConcatXFM": "flirt",
+    "ConvertXFM": "flirt",
+    "FixScaleSkew": "flirt",
+    "Img2ImgCoord": "flirt",
+    "Img2StdCoord": "flirt",
+    "InvertXFM": "flirt",
+    "Std2ImgCoord": "flirt",
+    "FNIRT": "fnirt",
+    "ApplyWarp": "fnirt",
+    "ConvertWarp": "fnirt",
+    "FNIRTFileUtils": "fnirt",
+    "InvWarp": "fnirt",
+    "TransformChain": "fnirt",
+    "FUGUE": "fugue",
+    "Prelude": "fugue",
+    "PrepareFieldmap": "fugue",
+    "SigLoss": "fugue",
+    "ProbTrackX2": "probtrackx2",
+    "sharded_probtrackx2": "probtrackx2",
+    "Randomise": "randomise",
+    "sharded_randomise": "randomise",
+    "SUSAN": "susan",
+    "FFT": "utils",
+    "ROI": "utils",
+    "ChFileType": "utils",
+    "Info": "utils",
+    "Interleave": "utils",
+    "Merge": "utils",
+    "Orient": "utils",
+    "Reorient2Std": "utils",
+    "SelectVols": "utils",
+    "Slice": "utils",
+    "SmoothFill": "utils",
+    "Split": "utils",
+    "SwapDim": "utils",
+}
 
 # TODO: Drop compatibility aliases when 0.x is released.
-FSLFFT = FFT
-FSLROI = ROI
-FSLChFileType = ChFileType
-FSLInfo = Info
-FSLInterleave = Interleave
-FSLMerge = Merge
-FSLOrient = Orient
-FSLPrepareFieldmap = PrepareFieldmap
-FSLReorient2Std = Reorient2Std
-FSLSelectVols = SelectVols
-FSLSlice = Slice
-FSLSmoothFill = SmoothFill
-FSLSplit = Split
-FSLSwapDim = SwapDim
-fslmaths = maths
+_ALIASES = {
+    "FSLFFT": "FFT",
+    "FSLROI": "ROI",
+    "FSLChFileType": "ChFileType",
+    "FSLInfo": "Info",
+    "FSLInterleave": "Interleave",
+    "FSLMerge": "Merge",
+    "FSLOrient": "Orient",
+    "FSLPrepareFieldmap": "PrepareFieldmap",
+    "FSLReorient2Std": "Reorient2Std",
+    "FSLSelectVols": "SelectVols",
+    "FSLSlice": "Slice",
+    "FSLSmoothFill": "SmoothFill",
+    "FSLSplit": "Split",
+    "FSLSwapDim": "SwapDim",
+    "fslmaths": "maths",
+}
+
+__all__ = ["maths", *_TASKS, *_ALIASES]
+
+
+def __getattr__(name):
+    target = _ALIASES.get(name, name)
+
+    if target == "maths":
+        value = importlib.import_module(".maths", __name__)
+    elif target in _TASKS:
+        module = importlib.import_module(f".{_TASKS[target]}", __name__)
+        value = getattr(module, target)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,396 @@
+"""
+BEDPOSTX
+========
+
+Bayesian estimation of diffusion parameters obtained using sampling techniques, with
+crossing fibres modelling.
+
+Examples
+--------
+
+xfibres fits the model to the voxels of a mask:
+
+>>> task = XFibres5(
+...     dwi="data_slice_0000.nii.gz",
+...     mask="nodif_brain_mask_slice_0000.nii.gz",
+...     bvecs="bvecs",
+...     bvals="bvals",
+...     num_fibres=3,
+... )
+>>> task.cmdline
+'xfibres --data=data_slice_0000.nii.gz --mask=nodif_brain_mask_slice_0000.nii.gz \
+-r bvecs -b bvals --logdir=xfibres --forcedir --nf=3'
+
+bedpostx fits each axial slice separately, as tasks which may run in parallel, then
+reassembles their samples. Slices already fitted are not fitted again when running
+the workflow again with the same cache directory, e.g. after being preempted:
+
+>>> wf = sharded_bedpostx(
+...     name="bedpostx",
+...     dwi="data.nii.gz",
+...     mask="nodif_brain_mask.nii.gz",
+...     bvecs="bvecs",
+...     bvals="bvals",
+... )
+>>> [node.name for node in wf.nodes]
+['slice', 'xfibres', 'merge']
+"""
+
+__all__ = ["XFibres5", "sharded_bedpostx"]
+
+import os
+import typing as ty
+
+import attrs
+
+import pydra
+
+from ..compression import OutputTypeMixin
+from ..resources import ResourceHints, ResourceHintsMixin
+from ..trace import TraceMixin
+from ..usage import ResourceUsageMixin
+
+
+@attrs.define(slots=False, kw_only=True)
+class XFibres5Spec(pydra.specs.ShellSpec):
+    """Specifications for xfibres."""
+
+    dwi: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "diffusion weighted image",
+            "mandatory": True,
+            "argstr": "--data={dwi}",
+        }
+    )
+
+    mask: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "brain mask",
+            "mandatory": True,
+            "argstr": "--mask={mask}",
+        }
+    )
+
+    bvecs: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "b vectors file",
+            "mandatory": True,
+            "argstr": "-r",
+        }
+    )
+
+    bvals: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "b values file",
+            "mandatory": True,
+            "argstr": "-b",
+        }
+    )
+
+    gradient_deviations: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "gradient deviations due to gradient nonlinearities",
+            "argstr": "--gradnonlin={gradient_deviations}",
+        }
+    )
+
+    log_dir: str = attrs.field(
+        default="xfibres",
+        metadata={
+            "help_string": "output directory",
+            "argstr": "--logdir={log_dir}",
+        },
+    )
+
+    force_dir: bool = attrs.field(
+        default=True,
+        metadata={
+            "help_string": "use the given output directory, not a new one",
+            "argstr": "--forcedir",
+        },
+    )
+
+    num_fibres: int = attrs.field(
+        metadata={
+            "help_string": "maximum number of fibres to fit in each voxel",
+            "argstr": "--nf={num_fibres}",
+        }
+    )
+
+    model: int = attrs.field(
+        metadata={
+            "help_string": (
+                "monoexponential (1, required for single-shell), multiexponential (2) "
+                "or zeppelin (3) model"
+            ),
+            "argstr": "--model={model}",
+            "allowed_values": {1, 2, 3},
+        }
+    )
+
+    fudge: int = attrs.field(
+        metadata={
+            "help_string": "ARD fudge factor",
+            "argstr": "--fudge={fudge}",
+        }
+    )
+
+    num_jumps: int = attrs.field(
+        metadata={
+            "help_string": "number of jumps of the MCMC",
+            "argstr": "--nj={num_jumps}",
+        }
+    )
+
+    burn_in: int = attrs.field(
+        metadata={
+            "help_string": "number of jumps discarded at the start of the MCMC",
+            "argstr": "--bi={burn_in}",
+        }
+    )
+
+    burn_in_no_ard: int = attrs.field(
+        metadata={
+            "help_string": "number of burn-in jumps before ARD is imposed",
+            "argstr": "--burnin_noard={burn_in_no_ard}",
+        }
+    )
+
+    sample_every: int = attrs.field(
+        metadata={
+            "help_string": "number of jumps between samples",
+            "argstr": "--se={sample_every}",
+        }
+    )
+
+    update_proposal_every: int = attrs.field(
+        metadata={
+            "help_string": "number of jumps between updates of the proposal density",
+            "argstr": "--upe={update_proposal_every}",
+        }
+    )
+
+    seed: int = attrs.field(
+        metadata={
+            "help_string": "seed of the random number generator",
+            "argstr": "--seed={seed}",
+        }
+    )
+
+    no_ard: bool = attrs.field(
+        metadata={
+            "help_string": "turn ARD off on all fibres",
+            "argstr": "--noard",
+            "xor": {"no_ard", "all_ard"},
+        }
+    )
+
+    all_ard: bool = attrs.field(
+        metadata={
+            "help_string": "turn ARD on on all fibres",
+            "argstr": "--allard",
+            "xor": {"no_ard", "all_ard"},
+        }
+    )
+
+    no_spatial: bool = attrs.field(
+        metadata={
+            "help_string": "initialise with tensor, not spatially",
+            "argstr": "--nospat",
+        }
+    )
+
+    non_linear: bool = attrs.field(
+        metadata={
+            "help_string": "initialise with nonlinear fitting",
+            "argstr": "--nonlinear",
+            "xor": {"non_linear", "constrained_non_linear"},
+        }
+    )
+
+    constrained_non_linear: bool = attrs.field(
+        metadata={
+            "help_string": "initialise with constrained nonlinear fitting",
+            "argstr": "--cnonlinear",
+            "xor": {"non_linear", "constrained_non_linear"},
+        }
+    )
+
+    rician: bool = attrs.field(
+        metadata={
+            "help_string": "use Rician noise modelling",
+            "argstr": "--rician",
+        }
+    )
+
+    f0: bool = attrs.field(
+        metadata={
+            "help_string": "model the noise floor with an unattenuated compartment",
+            "argstr": "--f0",
+        }
+    )
+
+    ard_f0: bool = attrs.field(
+        metadata={
+            "help_string": "use ARD on the noise floor compartment",
+            "argstr": "--ardf0",
+            "requires": ["f0"],
+        }
+    )
+
+
+def get_log_dir(output_dir, log_dir):
+    return os.path.join(output_dir, log_dir)
+
+
+@attrs.define(slots=False, kw_only=True)
+class XFibres5OutSpec(pydra.specs.ShellOutSpec):
+    """Output specifications for xfibres."""
+
+    log_dir: pydra.specs.Directory = attrs.field(
+        metadata={
+            "help_string": "output directory, with the samples of the parameters",
+            "callable": get_log_dir,
+        }
+    )
+
+
+class XFibres5(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
+    """Task definition for xfibres."""
+
+    executable = "xfibres"
+
+    resource_hints = ResourceHints(threads=1, memory_gb=1.0, runtime="hours")
+
+    input_spec = pydra.specs.SpecInfo(name="Input", bases=(XFibres5Spec,))
+
+    output_spec = pydra.specs.SpecInfo(name="Output", bases=(XFibres5OutSpec,))
+
+
+# Outputs of bedpostx, by kind.
+_OUTPUTS = (
+    "merged_thsamples",
+    "merged_phsamples",
+    "merged_fsamples",
+    "mean_thsamples",
+    "mean_phsamples",
+    "mean_fsamples",
+    "mean_dsamples",
+    "mean_S0samples",
+    "dyads",
+    "dyads_dispersion",
+)
+
+
+@pydra.mark.task
+@pydra.mark.annotate(
+    {"return": {"dwi_slices": ty.List[str], "mask_slices": ty.List[str]}}
+)
+def split_slices(dwi: pydra.specs.File, mask: pydra.specs.File):
+    """Split diffusion data and its brain mask into axial slices."""
+    from ..native.bedpostx import split_slices
+
+    dwi_slices, mask_slices = split_slices(dwi, mask)
+    return [str(path) for path in dwi_slices], [str(path) for path in mask_slices]
+
+
+@pydra.mark.task
+@pydra.mark.annotate({"return": {name: ty.List[str] for name in _OUTPUTS}})
+def merge_slices(slice_dirs: ty.List[str], mask: pydra.specs.File):
+    """Reassemble the samples fitted for each slice."""
+    from ..native.bedpostx import merge_slices
+
+    outputs = merge_slices(slice_dirs, mask)
+    return tuple([str(path) for path in outputs[name]] for name in _OUTPUTS)
+
+
+def sharded_bedpostx(
+    name: str,
+    num_fibres: int = 3,
+    fudge: int = 1,
+    burn_in: int = 1000,
+    num_jumps: int = 1250,
+    sample_every: int = 25,
+    model: int = 1,
+    **kwargs,
+) -> pydra.Workflow:
+    """Build a workflow fitting the diffusion model of bedpostx slice by slice.
+
+    The diffusion data and the brain mask are split into axial slices, xfibres is
+    split over the slices, then the samples of all slices are reassembled, as bedpostx
+    does. Each slice being a task of its own, slices are fitted in parallel by the
+    ``cf`` worker, or as jobs by the SGE and SLURM workers.
+
+    The result of each slice is cached once fitted, so running the workflow again
+    with the same cache directory only fits the slices missing from a previous run.
+
+    Parameters
+    ----------
+    name : str
+        Name of the workflow.
+    num_fibres, fudge, burn_in, num_jumps, sample_every, model
+        Parameters of the model and of its sampling, defaulting to those of bedpostx.
+    **kwargs
+        Inputs of :class:`XFibres5`, at least ``dwi``, ``mask``, ``bvecs`` and
+        ``bvals``, passed as inputs of the workflow, and other arguments passed to the
+        workflow, e.g. cache_dir.
+
+    Returns
+    -------
+    pydra.Workflow
+        Workflow with the outputs of BEDPOSTX5: ``merged_thsamples``,
+        ``merged_phsamples``, ``merged_fsamples``, ``mean_thsamples``,
+        ``mean_phsamples``, ``mean_fsamples`` and ``dyads`` with one image per
+        fibre, ``mean_dsamples`` and ``mean_S0samples``.
+    """
+    fields = attrs.fields_dict(XFibres5Spec)
+    inputs = {
+        "num_fibres": num_fibres,
+        "fudge": fudge,
+        "burn_in": burn_in,
+        "num_jumps": num_jumps,
+        "sample_every": sample_every,
+        "model": model,
+        "constrained_non_linear": True,
+        **kwargs,
+    }
+    kwargs = {key: inputs.pop(key) for key in kwargs if key not in fields}
+    # The workflow itself always runs again, as a previous run interrupted by an error
+    # would be reported as failed, whereas its nodes are only run when not cached.
+    kwargs.setdefault("rerun", True)
+    kwargs.setdefault("propagate_rerun", False)
+    wf = pydra.Workflow(name=name, input_spec=list(inputs), **inputs, **kwargs)
+
+    wf.add(split_slices(name="slice", dwi=wf.lzin.dwi, mask=wf.lzin.mask))
+
+    wf.add(
+        XFibres5(
+            name="xfibres",
+            **{
+                key: getattr(wf.lzin, key)
+                for key in inputs
+                if key not in ("dwi", "mask")
+            },
+        )
+        .split(
+            ("dwi", "mask"),
+            dwi=wf.slice.lzout.dwi_slices,
+            mask=wf.slice.lzout.mask_slices,
+        )
+        .combine(["dwi", "mask"])
+    )
+
+    wf.add(
+        merge_slices(
+            name="merge", slice_dirs=wf.xfibres.lzout.log_dir, mask=wf.lzin.mask
+        )
+    )
+
+    wf.set_output([(output, getattr(wf.merge.lzout, output)) for output in _OUTPUTS])
+    return wf
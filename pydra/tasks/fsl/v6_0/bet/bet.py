@@ -16,6 +16,12 @@ import attrs
 
 import pydra
 
+from ...compression import OutputTypeMixin
+from ...resources import ResourceHints, ResourceHintsMixin
+from ...results import StoredResultsMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class BETSpec(pydra.specs.ShellSpec):
@@ -197,11 +203,20 @@ class BETOutSpec(pydra.specs.ShellOutSpec):
     )
 
 
-class BET(pydra.engine.ShellCommandTask):
+class BET(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    StoredResultsMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for BET."""
 
     executable = "bet"
 
+    resource_hints = ResourceHints(threads=1, memory_gb=1.0, runtime="minutes")
+
     input_spec = pydra.specs.SpecInfo(name="Input", bases=(BETSpec, BETVariationsSpec))
 
     output_spec = pydra.specs.SpecInfo(name="Output", bases=(BETOutSpec,))
@@ -21,6 +21,10 @@ import attrs
 
 import pydra
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class RobustFOVSpec(pydra.specs.ShellSpec):
@@ -60,7 +64,9 @@ class RobustFOVSpec(pydra.specs.ShellSpec):
     )
 
 
-class RobustFOV(pydra.engine.ShellCommandTask):
+class RobustFOV(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for robustfov."""
 
     executable = "robustfov"
@@ -39,6 +39,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 def _to_input_image(field: Union[PathLike, Sequence[PathLike]]) -> str:
     try:
@@ -185,7 +189,7 @@ class ApplyTopupSpec(ShellSpec):
     )
 
 
-class ApplyTopup(ShellCommandTask):
+class ApplyTopup(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for applytopup."""
 
     executable = "applytopup"
@@ -26,10 +26,17 @@ __all__ = ["Eddy"]
 from os import PathLike
 from pathlib import PurePath
 
+import attrs
 from attrs import define, field
 from pydra.engine.specs import File, ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...resources import ResourceHints, ResourceHintsMixin
+from ...results import StoredResultsMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(slots=False, kw_only=True)
 class EddySpec(ShellSpec):
@@ -324,6 +331,13 @@ class EddySpec(ShellSpec):
         }
     )
 
+    num_threads: int = field(
+        metadata={
+            "help_string": "number of threads to use",
+            "argstr": "--nthr={num_threads}",
+        }
+    )
+
     save_cnr_maps: bool = field(
         metadata={"help_string": "save shell-wise CNR maps", "argstr": "--cnr_maps"}
     )
@@ -419,11 +433,24 @@ class EddyOutSpec(ShellOutSpec):
     )
 
 
-class Eddy(ShellCommandTask):
+class Eddy(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    StoredResultsMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for eddy."""
 
     executable = "eddy"
 
+    resource_hints = ResourceHints(threads=1, memory_gb=8.0, runtime="hours")
+
     input_spec = SpecInfo(name="Input", bases=(EddySpec,))
 
     output_spec = SpecInfo(name="Output", bases=(EddyOutSpec,))
+
+    def _is_deterministic(self) -> bool:
+        # Voxels are selected at random unless a seed is given.
+        return self.inputs.random_seed is not attrs.NOTHING
@@ -34,6 +34,12 @@ from attrs import define, field
 from pydra.engine.specs import File, ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...resources import ResourceHints, ResourceHintsMixin
+from ...results import StoredResultsMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 def to_field_per_level(field, param) -> str:
     return f"--{param}={','.join([str(elem) for elem in field])}"
@@ -239,11 +245,20 @@ class TopupOutSpec(ShellOutSpec):
     )
 
 
-class Topup(ShellCommandTask):
+class Topup(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    StoredResultsMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for topup."""
 
     executable = "topup"
 
+    resource_hints = ResourceHints(threads=1, memory_gb=2.0, runtime="hours")
+
     input_spec = SpecInfo(name="Input", bases=(TopupSpec,))
 
     output_spec = SpecInfo(name="Output", bases=(TopupOutSpec,))
@@ -13,6 +13,12 @@ import attrs
 
 import pydra
 
+from ..compression import OutputTypeMixin
+from ..resources import ResourceHints, ResourceHintsMixin
+from ..results import StoredResultsMixin
+from ..trace import TraceMixin
+from ..usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class FASTSpec(pydra.specs.ShellSpec):
@@ -124,6 +130,12 @@ class FASTSpec(pydra.specs.ShellSpec):
         }
     )
 
+    num_threads: int = attrs.field(
+        metadata={
+            "help_string": "number of threads to use (through OMP_NUM_THREADS)",
+        }
+    )
+
 
 def get_segmentation_image(output_basename):
     return f"{output_basename}_seg"
@@ -205,11 +217,22 @@ class FASTOutSpec(pydra.specs.ShellOutSpec):
     )
 
 
-class FAST(pydra.engine.ShellCommandTask):
+class FAST(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    StoredResultsMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for FAST."""
 
     executable = "fast"
 
+    resource_hints = ResourceHints(threads=1, memory_gb=2.0, runtime="minutes")
+
+    thread_variables = ("OMP_NUM_THREADS",)
+
     input_spec = pydra.specs.SpecInfo(name="Input", bases=(FASTSpec,))
 
     output_spec = pydra.specs.SpecInfo(name="Ouput", bases=(FASTOutSpec,))
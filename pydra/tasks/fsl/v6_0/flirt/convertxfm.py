@@ -28,6 +28,21 @@ Use ConvertXFM to combine multiple operations at once, such as concatenation and
 >>> task = ConvertXFM(input_matrix="AtoB.mat", concat_matrix="BtoC.mat", inverse=True, output_matrix="CtoA.mat")
 >>> task.cmdline
 'convert_xfm -omat CtoA.mat -concat BtoC.mat -inverse AtoB.mat'
+
+Compute the same matrix in-process with NumPy instead of running convert_xfm:
+
+>>> task = ConvertXFM(
+...     input_matrix="AtoB.mat",
+...     concat_matrix="BtoC.mat",
+...     inverse=True,
+...     output_matrix="CtoA.mat",
+...     backend="numpy",
+... )
+>>> task.cmdline
+'convert_xfm -omat CtoA.mat -concat BtoC.mat -inverse AtoB.mat'
+
+Matrices of a whole series are best processed at once with
+:func:`pydra.tasks.fsl.native.xfm.convert_xfm`, which accepts lists of matrices.
 """
 
 __all__ = ["ConvertXFM", "ConcatXFM", "InvertXFM", "FixScaleSkew"]
@@ -38,6 +53,11 @@ import attrs
 
 import pydra
 
+from ...backends import NativeBackendMixin, value_or_none
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class BaseSpec(pydra.specs.ShellSpec):
@@ -60,6 +80,14 @@ class BaseSpec(pydra.specs.ShellSpec):
         }
     )
 
+    backend: str = attrs.field(
+        default="fsl",
+        metadata={
+            "help_string": "run convert_xfm (fsl) or compute in-process (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
 
 @attrs.define(slots=False, kw_only=True)
 class ConvertXFMSpec(BaseSpec):
@@ -81,13 +109,32 @@ class ConvertXFMSpec(BaseSpec):
     )
 
 
-class ConvertXFM(pydra.engine.ShellCommandTask):
+class ConvertXFM(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for convert_xfm."""
 
     executable = "convert_xfm"
 
     input_spec = pydra.specs.SpecInfo(name="Input", bases=(ConvertXFMSpec,))
 
+    def _run_native(self):
+        from ...native.xfm import convert_xfm
+
+        convert_xfm(
+            self.inputs.input_matrix,
+            self._output_path("output_matrix"),
+            concat_matrix=value_or_none(getattr(self.inputs, "concat_matrix", None)),
+            fixscaleskew_matrix=value_or_none(
+                getattr(self.inputs, "fixscaleskew_matrix", None)
+            ),
+            inverse=getattr(self.inputs, "inverse", False) is True,
+        )
+
 
 @attrs.define(slots=False, kw_only=True)
 class ConcatXFMSpec(BaseSpec):
@@ -67,6 +67,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...results import StoredResultsMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
 from . import specs
 
 
@@ -148,7 +152,13 @@ class FLIRTSpec(BaseSpec):
     )
 
 
-class FLIRT(ShellCommandTask):
+class FLIRT(
+    TraceMixin,
+    OutputTypeMixin,
+    StoredResultsMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for FLIRT."""
 
     executable = "flirt"
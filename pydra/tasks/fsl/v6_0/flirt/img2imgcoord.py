@@ -25,6 +25,11 @@ import pydra
 
 from . import specs
 
+from ...backends import NativeBackendMixin
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class Img2ImgCoordSpec(specs.BaseCoordSpec):
@@ -51,7 +56,13 @@ class Img2ImgCoordOutSpec(specs.CoordOutSpec):
     """Output specifications for img2imgcoord."""
 
 
-class Img2ImgCoord(pydra.engine.ShellCommandTask):
+class Img2ImgCoord(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for img2imgcoord."""
 
     executable = "img2imgcoord"
@@ -61,3 +72,23 @@ class Img2ImgCoord(pydra.engine.ShellCommandTask):
     )
 
     output_spec = pydra.specs.SpecInfo(name="Output", bases=(Img2ImgCoordOutSpec,))
+
+    def _run_task(self, *args, **kwargs):
+        super()._run_task(*args, **kwargs)
+        specs._write_output_coordinates(self)
+
+    def _run_native(self):
+        from ...native.coords import format_points, img2img
+
+        points = img2img(
+            self.inputs.input_coordinates,
+            self.inputs.source_image,
+            self.inputs.destination_image,
+            **specs._transform_options(self.inputs),
+        )
+        # Output coordinates are written from stdout, formatted as by img2imgcoord.
+        return format_points(
+            points,
+            header="Coordinates in Destination volume "
+            f"(in {'mm' if self.inputs.unit == 'mm' else 'voxels'})",
+        )
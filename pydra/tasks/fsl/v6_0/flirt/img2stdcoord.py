@@ -25,6 +25,11 @@ import pydra
 
 from . import specs
 
+from ...backends import NativeBackendMixin, value_or_none
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class Img2StdCoordSpec(specs.BaseCoordSpec):
@@ -50,7 +55,13 @@ class Img2StdCoordOutSpec(specs.CoordOutSpec):
     """Output specifications for img2stdcoord."""
 
 
-class Img2StdCoord(pydra.engine.ShellCommandTask):
+class Img2StdCoord(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for img2stdcoord."""
 
     executable = "img2stdcoord"
@@ -60,3 +71,19 @@ class Img2StdCoord(pydra.engine.ShellCommandTask):
     )
 
     output_spec = pydra.specs.SpecInfo(name="Output", bases=(Img2StdCoordOutSpec,))
+
+    def _run_task(self, *args, **kwargs):
+        super()._run_task(*args, **kwargs)
+        specs._write_output_coordinates(self)
+
+    def _run_native(self):
+        from ...native.coords import format_points, img2std
+
+        points = img2std(
+            self.inputs.input_coordinates,
+            self.inputs.input_image,
+            standard_image=value_or_none(self.inputs.standard_image),
+            **specs._transform_options(self.inputs),
+        )
+        # Output coordinates are written from stdout, formatted as by img2stdcoord.
+        return format_points(points)
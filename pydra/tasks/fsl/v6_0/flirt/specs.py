@@ -14,6 +14,9 @@ import typing as ty
 import attrs
 
 import pydra
+from pydra.engine.helpers_file import template_update
+
+from ...backends import value_or_none
 
 
 @attrs.define(slots=False, kw_only=True)
@@ -161,6 +164,14 @@ class BaseCoordSpec(pydra.specs.ShellSpec):
         }
     )
 
+    pre_affine_matrix: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "affine transformation matrix applied before the warpfield",
+            "argstr": "-premat",
+            "requires": {"input_warpfield"},
+        }
+    )
+
     unit: str = attrs.field(
         default="vox",
         metadata={
@@ -170,9 +181,44 @@ class BaseCoordSpec(pydra.specs.ShellSpec):
         },
     )
 
+    backend: str = attrs.field(
+        default="fsl",
+        metadata={
+            "help_string": (
+                "run the FSL tool (fsl) or transform coordinates in-process (numpy)"
+            ),
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
+
+def _transform_options(inputs) -> dict:
+    """Return the transformation arguments of the in-process backend."""
+    return {
+        "affine_matrix": value_or_none(inputs.affine_matrix),
+        "warpfield": value_or_none(inputs.input_warpfield),
+        "premat": value_or_none(inputs.pre_affine_matrix),
+        "unit": inputs.unit,
+    }
+
+
+def _output_coordinates_path(inputs, output_dir) -> pathlib.Path:
+    # Resolve the templated name, unset inputs being passed as is to callables.
+    output_coordinates = template_update(inputs, output_dir=output_dir)[
+        "output_coordinates"
+    ]
+    return pathlib.Path(output_dir) / output_coordinates
+
+
+def _write_output_coordinates(task):
+    """Write the coordinates printed to stdout to the output coordinates file."""
+    if task.output_["return_code"] == 0:
+        output_coordinates = _output_coordinates_path(task.inputs, task.output_dir)
+        output_coordinates.write_text(task.output_["stdout"])
+
 
-def _get_output_coordinates(output_coordinates: str, stdout):
-    output_coordinates = pathlib.Path.cwd() / output_coordinates
+def _get_output_coordinates(inputs, output_dir, stdout):
+    output_coordinates = _output_coordinates_path(inputs, output_dir)
 
     with open(output_coordinates, mode="w") as f:
         f.write(stdout)
@@ -182,7 +228,7 @@ def _get_output_coordinates(output_coordinates: str, stdout):
 
 @attrs.define(slots=False, kw_only=True)
 class CoordOutSpec(pydra.specs.ShellOutSpec):
-    output_coordinates: os.PathLike = attrs.field(
+    output_coordinates: pydra.specs.File = attrs.field(
         metadata={
             "help_string": "output coordinates",
             "callable": _get_output_coordinates,
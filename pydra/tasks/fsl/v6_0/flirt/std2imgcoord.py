@@ -25,6 +25,11 @@ import pydra
 
 from . import specs
 
+from ...backends import NativeBackendMixin, value_or_none
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class Std2ImgCoordSpec(specs.BaseCoordSpec):
@@ -50,7 +55,13 @@ class Std2ImgCoordOutSpec(specs.CoordOutSpec):
     """Output specifications for std2imgcoord."""
 
 
-class Std2ImgCoord(pydra.engine.ShellCommandTask):
+class Std2ImgCoord(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for std2imgcoord."""
 
     executable = "std2imgcoord"
@@ -60,3 +71,19 @@ class Std2ImgCoord(pydra.engine.ShellCommandTask):
     )
 
     output_spec = pydra.specs.SpecInfo(name="Output", bases=(Std2ImgCoordOutSpec,))
+
+    def _run_task(self, *args, **kwargs):
+        super()._run_task(*args, **kwargs)
+        specs._write_output_coordinates(self)
+
+    def _run_native(self):
+        from ...native.coords import format_points, std2img
+
+        points = std2img(
+            self.inputs.input_coordinates,
+            self.inputs.input_image,
+            standard_image=value_or_none(self.inputs.standard_image),
+            **specs._transform_options(self.inputs),
+        )
+        # Output coordinates are written from stdout, formatted as by std2imgcoord.
+        return format_points(points)
@@ -7,9 +7,11 @@ FNIRT
 .. automodule:: pydra.tasks.fsl.fnirt.applywarp
 .. automodule:: pydra.tasks.fsl.fnirt.convertwarp
 .. automodule:: pydra.tasks.fsl.fnirt.invwarp
+.. automodule:: pydra.tasks.fsl.fnirt.chain
 """
 
 from .applywarp import ApplyWarp
+from .chain import TransformChain
 from .convertwarp import ConvertWarp
 from .fnirt import FNIRT
 from .fnirtfileutils import FNIRTFileUtils
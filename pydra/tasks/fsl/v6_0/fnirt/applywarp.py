@@ -36,6 +36,10 @@ import pydra
 
 from . import specs
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class ApplyWarpSpec(pydra.specs.ShellSpec):
@@ -142,7 +146,9 @@ class ApplyWarpSpec(pydra.specs.ShellSpec):
     )
 
 
-class ApplyWarp(pydra.engine.ShellCommandTask):
+class ApplyWarp(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for applywarp."""
 
     executable = "applywarp"
@@ -0,0 +1,232 @@
+"""
+TransformChain
+==============
+
+Accumulate affine matrices, warp fields and shiftmaps, then resample only once.
+
+Transformations are recorded in the order they apply to the input image, without
+running anything. The chain is materialized as a workflow which composes consecutive
+affine matrices in-process, combines all transformations with a single convertwarp
+and resamples the input image with a single applywarp, or with a single ApplyXFM
+when every transformation is affine.
+
+Examples
+--------
+
+Correct distortions, register to the structural image then normalize to a template:
+
+>>> chain = (
+...     TransformChain(input_image="func.nii.gz")
+...     .shiftmap("shiftmap.nii.gz", direction="y-")
+...     .affine("func2struct.mat")
+...     .warp("struct2mni_warp.nii.gz")
+... )
+>>> wf = chain.workflow(name="func2mni", reference_image="MNI152_T1_2mm.nii.gz")
+>>> [node.name for node in wf.nodes]
+['convertwarp', 'applywarp']
+
+Affine-only chains resample with FLIRT, consecutive matrices being composed first:
+
+>>> chain = (
+...     TransformChain(input_image="func.nii.gz")
+...     .affine("func2struct.mat")
+...     .affine("struct2mni.mat")
+... )
+>>> wf = chain.workflow(name="func2mni", reference_image="MNI152_T1_2mm.nii.gz")
+>>> [node.name for node in wf.nodes]
+['compose_pre_affine_matrix_1', 'applyxfm']
+"""
+
+__all__ = ["TransformChain"]
+
+import typing as ty
+
+import pydra
+
+from ..flirt import ApplyXFM, ConcatXFM
+from .applywarp import ApplyWarp
+from .convertwarp import ConvertWarp
+
+# Slots of convertwarp, in the order in which they are applied.
+_SLOTS = (
+    "input_shiftmap",
+    "pre_affine_matrix",
+    "pre_warpfield",
+    "mid_affine_matrix",
+    "post_warpfield",
+    "post_affine_matrix",
+)
+
+# Names of interpolation methods for FLIRT, from those of applywarp.
+_FLIRT_INTERPOLATION = {
+    "nn": "nearestneighbour",
+    "trilinear": "trilinear",
+    "sinc": "sinc",
+    "spline": "spline",
+}
+
+
+class TransformChain:
+    """Builder of a chain of transformations resampled by a single task.
+
+    Each call appends a transformation and returns a new chain, leaving the original
+    one untouched. Transformations may be paths or lazy fields of a workflow.
+    """
+
+    def __init__(self, input_image, transforms=()):
+        self._input_image = input_image
+        self._transforms = tuple(transforms)
+
+    def _then(self, kind: str, value, **options) -> "TransformChain":
+        return TransformChain(
+            self._input_image, self._transforms + ((kind, value, options),)
+        )
+
+    def affine(self, matrix) -> "TransformChain":
+        """Apply an affine matrix, as estimated by FLIRT."""
+        return self._then("affine", matrix)
+
+    def warp(self, warpfield) -> "TransformChain":
+        """Apply a warp field, as estimated by FNIRT."""
+        return self._then("warp", warpfield)
+
+    def shiftmap(self, shiftmap, direction: str = "y") -> "TransformChain":
+        """Apply a shiftmap, as estimated by FUGUE, before any other transformation."""
+        if self._transforms:
+            raise ValueError("A shiftmap must be the first transformation of a chain")
+        return self._then("shiftmap", shiftmap, direction=direction)
+
+    @property
+    def is_affine(self) -> bool:
+        """Whether every transformation of the chain is affine."""
+        return all(kind == "affine" for kind, _, _ in self._transforms)
+
+    def _slots(self) -> ty.Dict[str, ty.List[ty.Any]]:
+        # Assign transformations to the slots of convertwarp, consecutive matrices
+        # sharing the same slot to be composed beforehand.
+        slots, position = {}, -1
+        for kind, value, _ in self._transforms:
+            if kind == "shiftmap":
+                position = 0
+            elif kind == "warp":
+                position = 2 if position < 2 else 4
+                if position in slots:
+                    raise ValueError(
+                        "A chain can only combine two warp fields in a single "
+                        "convertwarp call"
+                    )
+            elif position not in (1, 3, 5):
+                position = 1 if position < 1 else 3 if position < 3 else 5
+            slots.setdefault(position, []).append(value)
+        return {_SLOTS[position]: values for position, values in slots.items()}
+
+    def workflow(
+        self,
+        name: str,
+        reference_image,
+        output_image: ty.Optional[str] = None,
+        interpolation: str = "trilinear",
+        warpfield_as: ty.Optional[str] = None,
+        **kwargs,
+    ) -> pydra.Workflow:
+        """Materialize the chain into a workflow resampling the input image once.
+
+        Parameters
+        ----------
+        name : str
+            Name of the workflow.
+        reference_image : path-like or lazy field
+            Image defining the space and grid of the output.
+        output_image : str, optional
+            Name of the output image.
+        interpolation : {"nn", "trilinear", "sinc", "spline"}
+            Interpolation method.
+        warpfield_as : {"abs", "rel"}, optional
+            Whether warp fields are absolute or relative, guessed by convertwarp if
+            not set.
+        **kwargs
+            Other arguments passed to the workflow, e.g. cache_dir.
+
+        Returns
+        -------
+        pydra.Workflow
+            Workflow with an ``output_image`` output, and the combined warp field as
+            ``output_warpfield`` output when the chain is not affine.
+        """
+        if not self._transforms:
+            raise ValueError("Cannot materialize an empty chain of transformations")
+
+        slots = self._slots()
+        inputs = {"input_image": self._input_image, "reference_image": reference_image}
+        for slot, values in slots.items():
+            for index, value in enumerate(values):
+                inputs[f"{slot}_{index}"] = value
+
+        wf = pydra.Workflow(name=name, input_spec=list(inputs), **inputs, **kwargs)
+
+        # Compose consecutive matrices in-process, each one following the previous.
+        for slot, values in slots.items():
+            matrix = getattr(wf.lzin, f"{slot}_0")
+            for index in range(1, len(values)):
+                node = f"compose_{slot}_{index}"
+                wf.add(
+                    ConcatXFM(
+                        name=node,
+                        input_matrix=matrix,
+                        concat_matrix=getattr(wf.lzin, f"{slot}_{index}"),
+                        backend="numpy",
+                    )
+                )
+                matrix = getattr(wf, node).lzout.output_matrix
+            slots[slot] = matrix
+
+        resampling = {"output_image": output_image} if output_image else {}
+
+        if self.is_affine:
+            wf.add(
+                ApplyXFM(
+                    name="applyxfm",
+                    input_image=wf.lzin.input_image,
+                    reference_image=wf.lzin.reference_image,
+                    initial_matrix=slots["pre_affine_matrix"],
+                    interpolation=_FLIRT_INTERPOLATION[interpolation],
+                    **resampling,
+                )
+            )
+            wf.set_output([("output_image", wf.applyxfm.lzout.output_image)])
+            return wf
+
+        options = {}
+        for kind, _, transform_options in self._transforms:
+            if kind == "shiftmap":
+                options["shift_direction"] = transform_options["direction"]
+        if warpfield_as:
+            options["warpfield_as"] = warpfield_as
+
+        wf.add(
+            ConvertWarp(
+                name="convertwarp",
+                reference_image=wf.lzin.reference_image,
+                output_warpfield_as="rel",
+                **slots,
+                **options,
+            )
+        )
+        wf.add(
+            ApplyWarp(
+                name="applywarp",
+                input_image=wf.lzin.input_image,
+                reference_image=wf.lzin.reference_image,
+                input_warpfield=wf.convertwarp.lzout.output_warpfield,
+                warpfield_as="rel",
+                interpolation=interpolation,
+                **resampling,
+            )
+        )
+        wf.set_output(
+            [
+                ("output_image", wf.applywarp.lzout.output_image),
+                ("output_warpfield", wf.convertwarp.lzout.output_warpfield),
+            ]
+        )
+        return wf
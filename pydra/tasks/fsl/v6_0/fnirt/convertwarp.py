@@ -46,6 +46,10 @@ import pydra
 
 from . import specs
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class ConvertWarpSpec(pydra.specs.ShellSpec):
@@ -166,7 +170,9 @@ class ConvertWarpSpec(pydra.specs.ShellSpec):
     )
 
 
-class ConvertWarp(pydra.engine.ShellCommandTask):
+class ConvertWarp(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for convertwarp."""
 
     executable = "convertwarp"
@@ -37,6 +37,11 @@ import attrs
 
 import pydra
 
+from ...compression import OutputTypeMixin
+from ...resources import ResourceHints, ResourceHintsMixin
+from ...results import StoredResultsMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
 from . import specs
 
 
@@ -256,12 +261,29 @@ class FNIRTSpec(pydra.specs.ShellSpec):
         },
     )
 
+    num_threads: int = attrs.field(
+        metadata={
+            "help_string": "number of threads to use (through OMP_NUM_THREADS)",
+        }
+    )
 
-class FNIRT(pydra.engine.ShellCommandTask):
+
+class FNIRT(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    StoredResultsMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
     """Task definition for FNIRT."""
 
     executable = "fnirt"
 
+    resource_hints = ResourceHints(threads=1, memory_gb=3.0, runtime="minutes")
+
+    thread_variables = ("OMP_NUM_THREADS",)
+
     input_spec = pydra.specs.SpecInfo(
         name="Input", bases=(FNIRTSpec, specs.VerboseSpec)
     )
@@ -34,6 +34,10 @@ import pydra
 
 from . import specs
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class FNIRTFileUtilsSpec(pydra.specs.ShellSpec):
@@ -110,7 +114,9 @@ class FNIRTFileUtilsSpec(pydra.specs.ShellSpec):
     )
 
 
-class FNIRTFileUtils(pydra.engine.ShellCommandTask):
+class FNIRTFileUtils(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for fnirtfileutils."""
 
     executable = "fnirtfileutils"
@@ -33,6 +33,10 @@ import pydra
 
 from . import specs
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class InvWarpSpec(pydra.specs.ShellSpec):
@@ -95,7 +99,9 @@ class InvWarpSpec(pydra.specs.ShellSpec):
     )
 
 
-class InvWarp(pydra.engine.ShellCommandTask):
+class InvWarp(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for invwarp."""
 
     executable = "invwarp"
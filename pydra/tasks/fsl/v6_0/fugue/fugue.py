@@ -36,6 +36,10 @@ import attrs
 
 import pydra
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class FUGUESpec(pydra.specs.ShellSpec):
@@ -232,7 +236,9 @@ class FUGUEOutSpec(pydra.specs.ShellOutSpec):
     )
 
 
-class FUGUE(pydra.engine.ShellCommandTask):
+class FUGUE(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for fugue."""
 
     executable = "fugue"
@@ -29,6 +29,10 @@ import attrs
 
 import pydra
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 def _output_filename_factory(complex_image, phase_image, suffix):
     from pathlib import PurePath
@@ -165,7 +169,9 @@ class PreludeSpec(pydra.specs.ShellSpec):
     )
 
 
-class Prelude(pydra.engine.ShellCommandTask):
+class Prelude(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for prelude."""
 
     executable = "prelude"
@@ -20,6 +20,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class PrepareFieldmapSpec(ShellSpec):
@@ -66,7 +70,9 @@ class PrepareFieldmapSpec(ShellSpec):
     )
 
 
-class PrepareFieldmap(ShellCommandTask):
+class PrepareFieldmap(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask
+):
     """Task definition for fsl_prepare_fieldmap."""
 
     executable = "fsl_prepare_fieldmap"
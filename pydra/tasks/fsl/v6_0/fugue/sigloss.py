@@ -20,6 +20,10 @@ import attrs
 
 import pydra
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class SigLossSpec(pydra.specs.ShellSpec):
@@ -60,7 +64,9 @@ class SigLossSpec(pydra.specs.ShellSpec):
     )
 
 
-class SigLoss(pydra.engine.ShellCommandTask):
+class SigLoss(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for sigloss."""
 
     executable = "sigloss"
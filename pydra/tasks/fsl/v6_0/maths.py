@@ -22,16 +22,46 @@ Multiply input image with a binary mask:
 >>> task = Threshold(input_image="input.nii", threshold=0.3, output_image="output.nii")
 >>> task.cmdline
 'fslmaths input.nii -thr 0.3 output.nii'
+
+Evaluate the same operation in-process with NumPy instead of running fslmaths,
+the command line being kept as the reference:
+
+>>> task = Threshold(
+...     input_image="input.nii", threshold=0.3, output_image="output.nii", backend="numpy"
+... )
+>>> task.cmdline
+'fslmaths input.nii -thr 0.3 output.nii'
+>>> task.operations
+[('-thr', 0.3)]
+
+Chain several operations into a single fslmaths call, without intermediate images:
+
+>>> task = (
+...     Maths.chain(input_image="input.nii", output_image="output.nii")
+...     .mul("mask.nii")
+...     .thr(0.3)
+...     .bin()
+...     .task()
+... )
+>>> task.cmdline
+'fslmaths input.nii -mul mask.nii -thr 0.3 -bin output.nii'
 """
 
-__all__ = ["Maths", "MathsSpec", "Mul", "Threshold"]
+__all__ = ["Maths", "MathsChain", "MathsSpec", "Mul", "Threshold"]
 
 from os import PathLike
+from pathlib import Path
 
+import attrs
 from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ..backends import NativeBackendMixin, is_set, value_or_none
+from ..compression import OutputTypeMixin
+from ..trace import TraceMixin
+from ..usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class MathsSpec(ShellSpec):
@@ -75,14 +105,58 @@ class MathsSpec(ShellSpec):
         }
     )
 
+    backend: str = field(
+        default="fsl",
+        metadata={
+            "help_string": "run fslmaths (fsl) or evaluate in-process with NumPy (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
 
-class Maths(ShellCommandTask):
+
+class Maths(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for fslmaths."""
 
     executable = "fslmaths"
 
     input_spec = SpecInfo(name="Input", bases=(MathsSpec,))
 
+    @property
+    def operations(self):
+        """Operations of the command line, as (flag, operand) pairs."""
+        operations = []
+        for fld in attrs.fields(type(self.inputs)):
+            argstr = fld.metadata.get("argstr", "")
+            value = getattr(self.inputs, fld.name)
+            # Operations are the options placed between input and output images.
+            if "position" in fld.metadata or not argstr.startswith("-"):
+                continue
+            if is_set(value) and value is not False:
+                operations.append((argstr, None if value is True else value))
+        return operations
+
+    @classmethod
+    def chain(cls, **inputs) -> "MathsChain":
+        """Start a chain of operations to be evaluated by a single fslmaths call."""
+        return MathsChain(inputs=inputs)
+
+    def _run_native(self):
+        from ..native.maths import evaluate
+
+        evaluate(
+            self.inputs.input_image,
+            self.operations,
+            output_image=self._output_path("output_image"),
+            internal_datatype=value_or_none(self.inputs.internal_datatype),
+            output_datatype=value_or_none(self.inputs.output_datatype),
+        )
+
 
 @define(kw_only=True)
 class MulSpec(MathsSpec):
@@ -122,6 +196,87 @@ class Threshold(Maths):
     input_spec = SpecInfo(name="Input", bases=(ThresholdSpec,))
 
 
+def _is_number(value) -> bool:
+    # Lazy fields of workflows carry the type of the output they point to.
+    return isinstance(value, (int, float)) or getattr(value, "type", None) in (
+        int,
+        float,
+    )
+
+
+class MathsChain:
+    """Builder of a chain of fslmaths operations compiled into a single task.
+
+    Each call appends an operation and returns a new chain, leaving the original one
+    untouched so that a common prefix can be shared between chains. Operands may be
+    numbers, images or lazy fields of a workflow.
+    """
+
+    def __init__(self, operations=(), inputs=None):
+        self._operations = tuple(operations)
+        self._inputs = dict(inputs or {})
+
+    def _then(self, flag: str, operand=True) -> "MathsChain":
+        return MathsChain(self._operations + ((flag, operand),), self._inputs)
+
+    def add(self, other) -> "MathsChain":
+        """Add a number or an image."""
+        return self._then("-add", other)
+
+    def sub(self, other) -> "MathsChain":
+        """Subtract a number or an image."""
+        return self._then("-sub", other)
+
+    def mul(self, other) -> "MathsChain":
+        """Multiply by a number or an image."""
+        return self._then("-mul", other)
+
+    def max(self, other) -> "MathsChain":
+        """Take the maximum with a number or an image."""
+        return self._then("-max", other)
+
+    def min(self, other) -> "MathsChain":
+        """Take the minimum with a number or an image."""
+        return self._then("-min", other)
+
+    def mas(self, mask) -> "MathsChain":
+        """Mask with the non-zero voxels of an image."""
+        return self._then("-mas", mask)
+
+    def thr(self, threshold) -> "MathsChain":
+        """Zero voxels below a threshold."""
+        return self._then("-thr", threshold)
+
+    def uthr(self, threshold) -> "MathsChain":
+        """Zero voxels above a threshold."""
+        return self._then("-uthr", threshold)
+
+    def abs(self) -> "MathsChain":
+        """Take the absolute value."""
+        return self._then("-abs")
+
+    def bin(self) -> "MathsChain":
+        """Binarise voxels greater than zero."""
+        return self._then("-bin")
+
+    def task(self, **inputs) -> Maths:
+        """Compile the chain into a single fslmaths task."""
+        fields, values = [], {}
+        for index, (flag, operand) in enumerate(self._operations, start=1):
+            name = f"{flag[1:]}_{index}"
+            if operand is True:
+                type_, help_string = bool, f"apply {flag}"
+            elif flag in {"-thr", "-uthr"} or _is_number(operand):
+                type_, help_string = float, f"operand of {flag}"
+            else:
+                type_, help_string = Path, f"image operand of {flag}"
+            fields.append((name, type_, {"help_string": help_string, "argstr": flag}))
+            values[name] = operand
+
+        input_spec = SpecInfo(name="Input", fields=fields, bases=(MathsSpec,))
+        return Maths(input_spec=input_spec, **values, **{**self._inputs, **inputs})
+
+
 # TODO: Drop compatibility alias for 0.x
 FSLMaths = Maths
 FSLMathsSpec = MathsSpec
@@ -0,0 +1,426 @@
+"""
+ProbTrackX2
+===========
+
+Probabilistic tractography on the samples of bedpostx.
+
+Examples
+--------
+
+>>> task = ProbTrackX2(
+...     samples="bedpostx/merged",
+...     mask="bedpostx/nodif_brain_mask.nii.gz",
+...     seed="thalamus.nii.gz",
+...     num_samples=1000,
+... )
+>>> task.cmdline
+'probtrackx2 --samples=bedpostx/merged --mask=bedpostx/nodif_brain_mask.nii.gz \
+--seed=thalamus.nii.gz --dir=probtrackx --forcedir --opd --nsamples=1000'
+
+Seeds may be partitioned into shards tracked by tasks running in parallel, their
+outputs being merged as those of a single run:
+
+>>> wf = sharded_probtrackx2(
+...     name="tractography",
+...     num_shards=16,
+...     samples="bedpostx/merged",
+...     mask="bedpostx/nodif_brain_mask.nii.gz",
+...     seed="thalamus.nii.gz",
+...     target2="lowres_mask.nii.gz",
+...     matrix2=True,
+... )
+>>> [node.name for node in wf.nodes]
+['seeds', 'probtrackx2', 'merge']
+"""
+
+__all__ = ["ProbTrackX2", "sharded_probtrackx2"]
+
+import os
+import typing as ty
+
+import attrs
+
+import pydra
+
+from ..compression import OutputTypeMixin
+from ..resources import ResourceHints, ResourceHintsMixin
+from ..trace import TraceMixin
+from ..usage import ResourceUsageMixin
+
+
+@attrs.define(slots=False, kw_only=True)
+class ProbTrackX2Spec(pydra.specs.ShellSpec):
+    """Specifications for probtrackx2."""
+
+    samples: str = attrs.field(
+        metadata={
+            "help_string": "basename of the samples of bedpostx, e.g. bedpostx/merged",
+            "mandatory": True,
+            "argstr": "--samples={samples}",
+        }
+    )
+
+    mask: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "brain mask in diffusion space",
+            "mandatory": True,
+            "argstr": "--mask={mask}",
+        }
+    )
+
+    seed: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "seed mask, or list of voxel coordinates in simple mode",
+            "mandatory": True,
+            "argstr": "--seed={seed}",
+        }
+    )
+
+    simple: bool = attrs.field(
+        metadata={
+            "help_string": "track from a list of voxel coordinates",
+            "argstr": "--simple",
+        }
+    )
+
+    seed_reference: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "reference image defining the space of seeds in simple mode",
+            "argstr": "--seedref={seed_reference}",
+        }
+    )
+
+    out_dir: str = attrs.field(
+        default="probtrackx",
+        metadata={
+            "help_string": "output directory",
+            "argstr": "--dir={out_dir}",
+        },
+    )
+
+    force_dir: bool = attrs.field(
+        default=True,
+        metadata={
+            "help_string": "use the given output directory, not a new one",
+            "argstr": "--forcedir",
+        },
+    )
+
+    path_distribution: bool = attrs.field(
+        default=True,
+        metadata={
+            "help_string": "output the path distribution (fdt_paths)",
+            "argstr": "--opd",
+        },
+    )
+
+    correct_path_distribution: bool = attrs.field(
+        metadata={
+            "help_string": "correct the path distribution for the length of pathways",
+            "argstr": "--pd",
+        }
+    )
+
+    target_masks: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "list of target masks, for seeds to targets classification",
+            "argstr": "--targetmasks={target_masks}",
+        }
+    )
+
+    seeds_to_targets: bool = attrs.field(
+        metadata={
+            "help_string": "output seeds to targets images",
+            "argstr": "--os2t",
+            "requires": ["target_masks"],
+        }
+    )
+
+    waypoints: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "waypoint mask, or list of waypoint masks",
+            "argstr": "--waypoints={waypoints}",
+        }
+    )
+
+    avoid: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "reject pathways passing through this mask",
+            "argstr": "--avoid={avoid}",
+        }
+    )
+
+    stop: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "stop tracking at this mask",
+            "argstr": "--stop={stop}",
+        }
+    )
+
+    xfm: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "transformation from seed space to diffusion space",
+            "argstr": "--xfm={xfm}",
+        }
+    )
+
+    inv_xfm: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "transformation from diffusion space to seed space",
+            "argstr": "--invxfm={inv_xfm}",
+        }
+    )
+
+    matrix1: bool = attrs.field(
+        metadata={
+            "help_string": "output the seed to seed connectivity matrix",
+            "argstr": "--omatrix1",
+        }
+    )
+
+    matrix2: bool = attrs.field(
+        metadata={
+            "help_string": "output the seed to low resolution mask connectivity matrix",
+            "argstr": "--omatrix2",
+            "requires": ["target2"],
+        }
+    )
+
+    target2: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "low resolution brain mask of matrix2",
+            "argstr": "--target2={target2}",
+        }
+    )
+
+    matrix3: bool = attrs.field(
+        metadata={
+            "help_string": "output the NxN connectivity matrix between target3 voxels",
+            "argstr": "--omatrix3",
+            "requires": ["target3"],
+        }
+    )
+
+    target3: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "mask of matrix3",
+            "argstr": "--target3={target3}",
+        }
+    )
+
+    lrtarget3: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "column space mask of matrix3",
+            "argstr": "--lrtarget3={lrtarget3}",
+        }
+    )
+
+    num_samples: int = attrs.field(
+        metadata={
+            "help_string": "number of samples (5000 by default)",
+            "argstr": "--nsamples={num_samples}",
+        }
+    )
+
+    num_steps: int = attrs.field(
+        metadata={
+            "help_string": "number of steps per sample (2000 by default)",
+            "argstr": "--nsteps={num_steps}",
+        }
+    )
+
+    step_length: float = attrs.field(
+        metadata={
+            "help_string": "step length, in millimeters (0.5 by default)",
+            "argstr": "--steplength={step_length}",
+        }
+    )
+
+    curvature_threshold: float = attrs.field(
+        metadata={
+            "help_string": "curvature threshold (0.2 by default)",
+            "argstr": "--cthr={curvature_threshold}",
+        }
+    )
+
+    distance_threshold: float = attrs.field(
+        metadata={
+            "help_string": "discard samples shorter than this, in millimeters",
+            "argstr": "--distthresh={distance_threshold}",
+        }
+    )
+
+    fibre_threshold: float = attrs.field(
+        metadata={
+            "help_string": "volume fraction below which fibres are not sampled",
+            "argstr": "--fibthresh={fibre_threshold}",
+        }
+    )
+
+    loop_check: bool = attrs.field(
+        metadata={
+            "help_string": "perform loop checks on paths",
+            "argstr": "--loopcheck",
+        }
+    )
+
+    use_anisotropy: bool = attrs.field(
+        metadata={
+            "help_string": "use anisotropy to constrain tracking",
+            "argstr": "--usef",
+        }
+    )
+
+    random_fibre: int = attrs.field(
+        metadata={
+            "help_string": "how initial fibres are sampled (0 by default)",
+            "argstr": "--randfib={random_fibre}",
+            "allowed_values": {0, 1, 2, 3},
+        }
+    )
+
+    modified_euler: bool = attrs.field(
+        metadata={
+            "help_string": "use modified Euler streamlining",
+            "argstr": "--modeuler",
+        }
+    )
+
+    random_seed: int = attrs.field(
+        metadata={
+            "help_string": "seed of the random number generator",
+            "argstr": "--rseed={random_seed}",
+        }
+    )
+
+
+def get_out_dir(output_dir, out_dir):
+    return os.path.join(output_dir, out_dir)
+
+
+@attrs.define(slots=False, kw_only=True)
+class ProbTrackX2OutSpec(pydra.specs.ShellOutSpec):
+    """Output specifications for probtrackx2."""
+
+    out_dir: pydra.specs.Directory = attrs.field(
+        metadata={
+            "help_string": "output directory",
+            "callable": get_out_dir,
+        }
+    )
+
+
+class ProbTrackX2(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
+    """Task definition for probtrackx2."""
+
+    executable = "probtrackx2"
+
+    resource_hints = ResourceHints(threads=1, memory_gb=4.0, runtime="hours")
+
+    input_spec = pydra.specs.SpecInfo(name="Input", bases=(ProbTrackX2Spec,))
+
+    output_spec = pydra.specs.SpecInfo(name="Output", bases=(ProbTrackX2OutSpec,))
+
+
+# Merged outputs, None when not produced.
+_OUTPUTS = {
+    "fdt_paths": ty.Optional[str],
+    "way_total": ty.Optional[str],
+    "targets": ty.List[str],
+    "matrix2_dot": ty.Optional[str],
+    "lookup_tractspace": ty.Optional[str],
+    "matrix3_dot": ty.Optional[str],
+}
+
+
+@pydra.mark.task
+@pydra.mark.annotate({"return": {"seeds": ty.List[str], "num_seeds": ty.List[int]}})
+def split_seeds(seed: pydra.specs.File, num_shards: int, simple: bool):
+    """Partition seeds into shards."""
+    from ..native.probtrackx import split_seeds
+
+    seeds, num_seeds = split_seeds(seed, num_shards, simple=simple)
+    return [str(path) for path in seeds], num_seeds
+
+
+@pydra.mark.task
+@pydra.mark.annotate({"return": _OUTPUTS})
+def merge_shards(shard_dirs: ty.List[str], num_seeds: ty.List[int]):
+    """Merge the outputs of runs over shards of seeds."""
+    from ..native.probtrackx import merge_shards
+
+    outputs = merge_shards(shard_dirs, num_seeds)
+    targets = [str(path) for path in outputs.pop("targets", [])]
+    files = {name: str(path) for name, path in outputs.items()}
+    return tuple(targets if name == "targets" else files.get(name) for name in _OUTPUTS)
+
+
+def sharded_probtrackx2(name: str, num_shards: int, **kwargs) -> pydra.Workflow:
+    """Build a workflow tracking from seeds partitioned into shards.
+
+    Each shard of seeds is tracked by a task of its own, in parallel with the ``cf``
+    worker or as jobs with the SGE and SLURM workers. Path distributions, seeds to
+    targets images, way totals and matrix2 and matrix3 connectivity matrices are then
+    merged by a single task once every shard is tracked, reading one shard at a time.
+    Seed to seed matrices (matrix1) cannot be merged, and are rejected.
+
+    Parameters
+    ----------
+    name : str
+        Name of the workflow.
+    num_shards : int
+        Number of shards, fewer if there are fewer seeds.
+    **kwargs
+        Inputs of :class:`ProbTrackX2`, at least ``samples``, ``mask`` and ``seed``,
+        passed as inputs of the workflow, and other arguments passed to the workflow,
+        e.g. cache_dir.
+
+    Returns
+    -------
+    pydra.Workflow
+        Workflow with merged outputs: ``fdt_paths``, ``way_total``, ``targets``,
+        ``matrix2_dot``, ``lookup_tractspace`` and ``matrix3_dot``, the outputs not
+        produced being None.
+    """
+    if kwargs.get("matrix1"):
+        raise ValueError("Cannot merge seed to seed matrices (matrix1) across shards")
+
+    fields = attrs.fields_dict(ProbTrackX2Spec)
+    inputs = {"simple": False, **kwargs}
+    kwargs = {key: inputs.pop(key) for key in kwargs if key not in fields}
+    wf = pydra.Workflow(name=name, input_spec=list(inputs), **inputs, **kwargs)
+
+    wf.add(
+        split_seeds(
+            name="seeds",
+            seed=wf.lzin.seed,
+            num_shards=num_shards,
+            simple=wf.lzin.simple,
+        )
+    )
+
+    wf.add(
+        ProbTrackX2(
+            name="probtrackx2",
+            **{key: getattr(wf.lzin, key) for key in inputs if key != "seed"},
+        )
+        .split("seed", seed=wf.seeds.lzout.seeds)
+        .combine("seed")
+    )
+
+    wf.add(
+        merge_shards(
+            name="merge",
+            shard_dirs=wf.probtrackx2.lzout.out_dir,
+            num_seeds=wf.seeds.lzout.num_seeds,
+        )
+    )
+
+    wf.set_output([(output, getattr(wf.merge.lzout, output)) for output in _OUTPUTS])
+    return wf
@@ -0,0 +1,453 @@
+"""
+Randomise
+=========
+
+Permutation-based inference for the general linear model.
+
+Examples
+--------
+
+>>> task = Randomise(
+...     input_image="all_FA_skeletonised.nii.gz",
+...     design_matrix="design.mat",
+...     t_contrasts="design.con",
+...     mask="mean_FA_skeleton_mask.nii.gz",
+...     tfce_2d=True,
+... )
+>>> task.cmdline
+'randomise -i all_FA_skeletonised.nii.gz -o randomise -d design.mat -t design.con \
+-m mean_FA_skeleton_mask.nii.gz --T2'
+
+Permutations may be split across tasks running in parallel, with independent seeds,
+their results being merged as if computed by a single run:
+
+>>> wf = sharded_randomise(
+...     name="tbss_stats",
+...     num_shards=8,
+...     num_permutations=5000,
+...     input_image="all_FA_skeletonised.nii.gz",
+...     design_matrix="design.mat",
+...     t_contrasts="design.con",
+...     mask="mean_FA_skeleton_mask.nii.gz",
+...     tfce_2d=True,
+... )
+>>> [node.name for node in wf.nodes]
+['randomise', 'merge']
+"""
+
+__all__ = ["Randomise", "sharded_randomise"]
+
+import glob
+import os
+import re
+import typing as ty
+
+import attrs
+
+import pydra
+
+from ..compression import OutputTypeMixin
+from ..resources import ResourceHints, ResourceHintsMixin
+from ..trace import TraceMixin
+from ..usage import ResourceUsageMixin
+
+
+@attrs.define(slots=False, kw_only=True)
+class RandomiseSpec(pydra.specs.ShellSpec):
+    """Specifications for randomise."""
+
+    input_image: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "4D input image",
+            "mandatory": True,
+            "argstr": "-i",
+            "position": 1,
+        }
+    )
+
+    output_basename: str = attrs.field(
+        default="randomise",
+        metadata={
+            "help_string": "basename of output files",
+            "argstr": "-o",
+            "position": 2,
+        },
+    )
+
+    design_matrix: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "design matrix",
+            "argstr": "-d",
+            "position": 3,
+        }
+    )
+
+    t_contrasts: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "t contrasts",
+            "argstr": "-t",
+            "position": 4,
+        }
+    )
+
+    f_contrasts: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "f contrasts",
+            "argstr": "-f",
+        }
+    )
+
+    mask: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "mask image",
+            "argstr": "-m",
+        }
+    )
+
+    exchangeability_blocks: os.PathLike = attrs.field(
+        metadata={
+            "help_string": "exchangeability block labels",
+            "argstr": "-e",
+        }
+    )
+
+    demean: bool = attrs.field(
+        metadata={
+            "help_string": "demean data temporally before model fitting",
+            "argstr": "-D",
+        }
+    )
+
+    one_sample_group_mean: bool = attrs.field(
+        metadata={
+            "help_string": "perform a 1-sample group-mean test",
+            "argstr": "-1",
+        }
+    )
+
+    num_permutations: int = attrs.field(
+        metadata={
+            "help_string": "number of permutations (5000 by default, 0 for exhaustive)",
+            "argstr": "-n",
+        }
+    )
+
+    seed: int = attrs.field(
+        metadata={
+            "help_string": "seed of the random number generator",
+            "argstr": "--seed={seed}",
+        }
+    )
+
+    voxel_p_values: bool = attrs.field(
+        metadata={
+            "help_string": "output voxelwise corrected and uncorrected p-values",
+            "argstr": "-x",
+        }
+    )
+
+    tfce: bool = attrs.field(
+        metadata={
+            "help_string": "carry out threshold-free cluster enhancement",
+            "argstr": "-T",
+            "xor": {"tfce", "tfce_2d"},
+        }
+    )
+
+    tfce_2d: bool = attrs.field(
+        metadata={
+            "help_string": "carry out threshold-free cluster enhancement with 2D "
+            "optimisation, e.g. for TBSS",
+            "argstr": "--T2",
+            "xor": {"tfce", "tfce_2d"},
+        }
+    )
+
+    tfce_height: float = attrs.field(
+        metadata={
+            "help_string": "TFCE height parameter (2 by default)",
+            "argstr": "--tfce_H={tfce_height}",
+        }
+    )
+
+    tfce_extent: float = attrs.field(
+        metadata={
+            "help_string": "TFCE extent parameter (0.5 by default)",
+            "argstr": "--tfce_E={tfce_extent}",
+        }
+    )
+
+    tfce_connectivity: int = attrs.field(
+        metadata={
+            "help_string": "TFCE connectivity (6 by default)",
+            "argstr": "--tfce_C={tfce_connectivity}",
+            "allowed_values": {6, 26},
+        }
+    )
+
+    cluster_threshold: float = attrs.field(
+        metadata={
+            "help_string": "threshold for cluster-based inference",
+            "argstr": "-c",
+        }
+    )
+
+    cluster_mass_threshold: float = attrs.field(
+        metadata={
+            "help_string": "threshold for cluster-mass-based inference",
+            "argstr": "-C",
+        }
+    )
+
+    f_cluster_threshold: float = attrs.field(
+        metadata={
+            "help_string": "threshold for f cluster-based inference",
+            "argstr": "-F",
+        }
+    )
+
+    f_cluster_mass_threshold: float = attrs.field(
+        metadata={
+            "help_string": "threshold for f cluster-mass-based inference",
+            "argstr": "-S",
+        }
+    )
+
+    f_only: bool = attrs.field(
+        metadata={
+            "help_string": "calculate f statistics only",
+            "argstr": "--fonly",
+        }
+    )
+
+    raw_stats_images: bool = attrs.field(
+        metadata={
+            "help_string": "output raw (unpermuted) statistic images",
+            "argstr": "-R",
+        }
+    )
+
+    null_distributions: bool = attrs.field(
+        metadata={
+            "help_string": "output permutation vectors and null distribution text files",
+            "argstr": "-P",
+        }
+    )
+
+    variance_smoothing: float = attrs.field(
+        metadata={
+            "help_string": "variance smoothing, in millimeters",
+            "argstr": "-v",
+        }
+    )
+
+
+# Outputs are named {basename}_[{kind}_][{p|corrp}_]{t|f}stat{index}.
+_OUTPUTS = {
+    "tstat_images": r"tstat\d+",
+    "fstat_images": r"fstat\d+",
+    "t_p_images": r"(?:vox|tfce|clustere|clusterm)_p_tstat\d+",
+    "f_p_images": r"(?:vox|tfce|clustere|clusterm)_p_fstat\d+",
+    "t_corrected_p_images": r"(?:vox|tfce|clustere|clusterm)_corrp_tstat\d+",
+    "f_corrected_p_images": r"(?:vox|tfce|clustere|clusterm)_corrp_fstat\d+",
+}
+
+
+def _natural_key(path: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+def _match_outputs(paths, output_basename: str, name: str) -> ty.List[str]:
+    regex = re.compile(
+        rf"{re.escape(os.path.basename(output_basename))}_{_OUTPUTS[name]}\.nii(\.gz)?"
+    )
+    return sorted(
+        (path for path in paths if regex.fullmatch(os.path.basename(path))),
+        key=_natural_key,
+    )
+
+
+def get_output_files(output_dir, output_basename):
+    prefix = os.path.join(output_dir, output_basename)
+    return sorted(glob.glob(f"{glob.escape(prefix)}_*"), key=_natural_key)
+
+
+def get_outputs(field, output_dir, output_basename):
+    paths = get_output_files(output_dir, output_basename)
+    return _match_outputs(paths, output_basename, field.name)
+
+
+@attrs.define(slots=False, kw_only=True)
+class RandomiseOutSpec(pydra.specs.ShellOutSpec):
+    """Output specifications for randomise."""
+
+    tstat_images: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "raw t statistic images",
+            "callable": get_outputs,
+        }
+    )
+
+    fstat_images: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "raw f statistic images",
+            "callable": get_outputs,
+        }
+    )
+
+    t_p_images: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "uncorrected p-value images (1 - p) of t contrasts",
+            "callable": get_outputs,
+        }
+    )
+
+    f_p_images: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "uncorrected p-value images (1 - p) of f contrasts",
+            "callable": get_outputs,
+        }
+    )
+
+    t_corrected_p_images: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "FWE-corrected p-value images (1 - p) of t contrasts",
+            "callable": get_outputs,
+        }
+    )
+
+    f_corrected_p_images: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "FWE-corrected p-value images (1 - p) of f contrasts",
+            "callable": get_outputs,
+        }
+    )
+
+    output_files: pydra.specs.MultiOutputFile = attrs.field(
+        metadata={
+            "help_string": "all output files, including null distributions",
+            "callable": get_output_files,
+        }
+    )
+
+
+class Randomise(
+    TraceMixin,
+    OutputTypeMixin,
+    ResourceHintsMixin,
+    ResourceUsageMixin,
+    pydra.engine.ShellCommandTask,
+):
+    """Task definition for randomise."""
+
+    executable = "randomise"
+
+    resource_hints = ResourceHints(threads=1, memory_gb=2.0, runtime="days")
+
+    input_spec = pydra.specs.SpecInfo(name="Input", bases=(RandomiseSpec,))
+
+    output_spec = pydra.specs.SpecInfo(name="Output", bases=(RandomiseOutSpec,))
+
+
+@pydra.mark.task
+@pydra.mark.annotate(
+    {
+        "return": {
+            "output_files": ty.List[str],
+            **{name: ty.List[str] for name in _OUTPUTS},
+        }
+    }
+)
+def merge_randomise(
+    shards: ty.List[ty.List[str]], num_permutations: ty.List[int], output_basename: str
+):
+    """Merge the outputs of randomise runs over disjoint sets of permutations."""
+    from ..native.randomise import merge_shards
+
+    output_files = [
+        os.path.abspath(path) for path in merge_shards(shards, num_permutations)
+    ]
+    return (output_files,) + tuple(
+        _match_outputs(output_files, output_basename, name) for name in _OUTPUTS
+    )
+
+
+def sharded_randomise(
+    name: str,
+    num_shards: int,
+    num_permutations: int = 5000,
+    seed: int = 0,
+    **kwargs,
+) -> pydra.Workflow:
+    """Build a workflow running randomise over permutations split across shards.
+
+    Each shard runs with its own seed, the unpermuted design counting as one of the
+    permutations of every shard, and null distributions and p-value images of all
+    shards are merged as ``randomise_parallel`` does. Only voxelwise and TFCE
+    corrected p-values can be merged.
+
+    Parameters
+    ----------
+    name : str
+        Name of the workflow.
+    num_shards : int
+        Number of randomise runs.
+    num_permutations : int
+        Total number of permutations, including the unpermuted design.
+    seed : int
+        Seed of the first shard, incremented for each other shard.
+    **kwargs
+        Other inputs of :class:`Randomise`, passed as inputs of the workflow, and
+        other arguments passed to the workflow, e.g. cache_dir.
+
+    Returns
+    -------
+    pydra.Workflow
+        Workflow with the outputs of :class:`Randomise`, merged across shards.
+    """
+    if not 0 < num_shards < num_permutations:
+        raise ValueError(
+            f"Cannot split {num_permutations} permutations across {num_shards} shards"
+        )
+
+    # Permutations other than the unpermuted design, evenly split.
+    shares = [
+        (num_permutations - 1) * (index + 1) // num_shards
+        - (num_permutations - 1) * index // num_shards
+        for index in range(num_shards)
+    ]
+    counts = [share + 1 for share in shares]
+    seeds = [seed + index for index in range(num_shards)]
+
+    fields = attrs.fields_dict(RandomiseSpec)
+    inputs = {"output_basename": "randomise", **kwargs}
+    kwargs = {key: inputs.pop(key) for key in kwargs if key not in fields}
+    wf = pydra.Workflow(name=name, input_spec=list(inputs), **inputs, **kwargs)
+
+    wf.add(
+        Randomise(
+            name="randomise",
+            null_distributions=True,
+            raw_stats_images=True,
+            **{key: getattr(wf.lzin, key) for key in inputs},
+        )
+        .split(("num_permutations", "seed"), num_permutations=counts, seed=seeds)
+        .combine(["num_permutations", "seed"])
+    )
+
+    wf.add(
+        merge_randomise(
+            name="merge",
+            shards=wf.randomise.lzout.output_files,
+            num_permutations=counts,
+            output_basename=wf.lzin.output_basename,
+        )
+    )
+
+    wf.set_output(
+        [
+            (output, getattr(wf.merge.lzout, output))
+            for output in ("output_files", *_OUTPUTS)
+        ]
+    )
+    return wf
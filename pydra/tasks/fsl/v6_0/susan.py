@@ -29,6 +29,10 @@ import attrs
 
 import pydra
 
+from ..compression import OutputTypeMixin
+from ..trace import TraceMixin
+from ..usage import ResourceUsageMixin
+
 
 @attrs.define(slots=False, kw_only=True)
 class SUSANSpec(pydra.specs.ShellSpec):
@@ -98,7 +102,9 @@ class SUSANSpec(pydra.specs.ShellSpec):
     )
 
 
-class SUSAN(pydra.engine.ShellCommandTask):
+class SUSAN(
+    TraceMixin, OutputTypeMixin, ResourceUsageMixin, pydra.engine.ShellCommandTask
+):
     """Task definition for SUSAN."""
 
     executable = "susan"
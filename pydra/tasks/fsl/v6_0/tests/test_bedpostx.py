@@ -0,0 +1,100 @@
+import os
+import sys
+
+import nibabel as nib
+import numpy as np
+import pytest
+
+from pydra.tasks.fsl.native.bedpostx import dyadic_vectors
+from pydra.tasks.fsl.v6_0.bedpostx import XFibres5, sharded_bedpostx
+
+# Stand-in for xfibres, recording the slices it fits and failing on a flagged slice.
+FAKE_XFIBRES = f"""#!{sys.executable}
+import os
+import sys
+import nibabel as nib
+import numpy as np
+
+args = dict(arg.split("=", 1) for arg in sys.argv[1:] if "=" in arg)
+root = os.path.dirname(sys.argv[0])
+name = os.path.basename(args["--data"])
+with open(os.path.join(root, "calls"), "a") as f:
+    f.write(name + "\\n")
+if os.path.exists(os.path.join(root, "fail_" + name)):
+    sys.exit(1)
+
+shape = nib.load(args["--data"]).shape[:3]
+os.makedirs(args["--logdir"], exist_ok=True)
+
+def save(data, name):
+    image = nib.Nifti1Image(np.asarray(data, dtype=np.float32), np.eye(4))
+    nib.save(image, os.path.join(args["--logdir"], name + ".nii.gz"))
+
+index = float(name[len("data_slice_"):][:4])
+for fibre in range(1, int(args["--nf"]) + 1):
+    save(np.full(shape + (4,), np.pi / 2), f"th{{fibre}}samples")
+    save(np.full(shape + (4,), index), f"ph{{fibre}}samples")
+    save(np.full(shape + (4,), 0.5 / fibre), f"f{{fibre}}samples")
+save(np.full(shape, index), "mean_dsamples")
+save(np.ones(shape), "mean_S0samples")
+"""
+
+
+def test_dyadic_vectors():
+    # Samples spread around the x axis, in the xy plane.
+    theta = np.full((1, 4), np.pi / 2)
+    phi = np.array([[-0.1, 0.1, -0.2, 0.2]])
+    dyads, dispersion = dyadic_vectors(theta, phi)
+    assert np.allclose(np.abs(dyads), [[1, 0, 0]], atol=1e-6)
+    assert 0 < dispersion[0] < 0.05
+
+
+def test_sharded_bedpostx(tmp_path, monkeypatch):
+    executable = tmp_path / "xfibres"
+    executable.write_text(FAKE_XFIBRES)
+    executable.chmod(0o755)
+    monkeypatch.setattr(XFibres5, "executable", str(executable))
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+
+    dwi, mask = tmp_path / "data.nii.gz", tmp_path / "mask.nii.gz"
+    nib.save(nib.Nifti1Image(np.ones((2, 2, 3, 5), dtype=np.float32), np.eye(4)), dwi)
+    nib.save(nib.Nifti1Image(np.ones((2, 2, 3), dtype=np.uint8), np.eye(4)), mask)
+    (tmp_path / "bvecs").write_text("0 1 0 0 1\n0 0 1 0 0\n0 0 0 1 0\n")
+    (tmp_path / "bvals").write_text("0 1000 1000 1000 1000\n")
+
+    def run():
+        wf = sharded_bedpostx(
+            name="bedpostx",
+            dwi=str(dwi),
+            mask=str(mask),
+            bvecs=str(tmp_path / "bvecs"),
+            bvals=str(tmp_path / "bvals"),
+            num_fibres=2,
+            cache_dir=tmp_path / "cache",
+        )
+        return wf(plugin="serial")
+
+    # A first run is interrupted on the last slice.
+    (tmp_path / "fail_data_slice_0002.nii.gz").touch()
+    with pytest.raises(Exception):
+        run()
+
+    # Only the missing slice is fitted when resuming.
+    (tmp_path / "fail_data_slice_0002.nii.gz").unlink()
+    result = run()
+    calls = sorted((tmp_path / "calls").read_text().split())
+    assert calls == [f"data_slice_{index:04d}.nii.gz" for index in (0, 1, 2, 2)]
+
+    outputs = result.output
+    assert [os.path.basename(path) for path in outputs.merged_thsamples] == [
+        "merged_th1samples.nii.gz",
+        "merged_th2samples.nii.gz",
+    ]
+    assert nib.load(outputs.merged_phsamples[0]).shape == (2, 2, 3, 4)
+    assert np.allclose(nib.load(outputs.mean_fsamples[1]).get_fdata(), 0.25)
+    assert np.allclose(nib.load(outputs.mean_dsamples[0]).get_fdata()[0, 0], [0, 1, 2])
+
+    # Fibres lie along phi, which is the index of their slice.
+    dyads = nib.load(outputs.dyads[0]).get_fdata()
+    expected = [[np.cos(index), np.sin(index), 0] for index in range(3)]
+    assert np.allclose(np.abs(dyads[0, 0]), np.abs(expected), atol=1e-6)
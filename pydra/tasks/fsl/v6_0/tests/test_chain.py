@@ -0,0 +1,54 @@
+import pytest
+
+from pydra.tasks.fsl.v6_0.fnirt import TransformChain
+
+
+def test_affine_chain():
+    chain = TransformChain("input.nii").affine("a.mat").affine("b.mat").affine("c.mat")
+
+    wf = chain.workflow(name="wf", reference_image="ref.nii")
+
+    assert chain.is_affine
+    assert [node.name for node in wf.nodes] == [
+        "compose_pre_affine_matrix_1",
+        "compose_pre_affine_matrix_2",
+        "applyxfm",
+    ]
+
+
+def test_nonlinear_chain():
+    chain = (
+        TransformChain("input.nii")
+        .shiftmap("shift.nii", direction="y-")
+        .affine("a.mat")
+        .warp("w1.nii")
+        .affine("b.mat")
+        .affine("c.mat")
+        .warp("w2.nii")
+        .affine("d.mat")
+    )
+
+    assert chain._slots() == {
+        "input_shiftmap": ["shift.nii"],
+        "pre_affine_matrix": ["a.mat"],
+        "pre_warpfield": ["w1.nii"],
+        "mid_affine_matrix": ["b.mat", "c.mat"],
+        "post_warpfield": ["w2.nii"],
+        "post_affine_matrix": ["d.mat"],
+    }
+    wf = chain.workflow(name="wf", reference_image="ref.nii", interpolation="spline")
+    assert [node.name for node in wf.nodes] == [
+        "compose_mid_affine_matrix_1",
+        "convertwarp",
+        "applywarp",
+    ]
+    assert wf.convertwarp.inputs.shift_direction == "y-"
+
+
+def test_invalid_chains():
+    with pytest.raises(ValueError, match="shiftmap"):
+        TransformChain("input.nii").affine("a.mat").shiftmap("shift.nii")
+
+    chain = TransformChain("input.nii").warp("w1.nii").warp("w2.nii").warp("w3.nii")
+    with pytest.raises(ValueError, match="two warp fields"):
+        chain.workflow(name="wf", reference_image="ref.nii")
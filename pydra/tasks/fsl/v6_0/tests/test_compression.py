@@ -0,0 +1,117 @@
+import gzip
+import os
+import sys
+
+import nibabel as nib
+import numpy as np
+import pydra
+import pytest
+
+from pydra.tasks.fsl.compression import set_output_types
+from pydra.tasks.fsl.v6_0.maths import Mul, Threshold
+
+# Stand-in for fslmaths, writing its output in the format of $FSLOUTPUTTYPE as FSL
+# does, whatever the extension it is given.
+FAKE_FSLMATHS = f"""#!{sys.executable}
+import os
+import sys
+import nibabel as nib
+
+extensions = {{"NIFTI": ".nii", "NIFTI_GZ": ".nii.gz"}}
+output = sys.argv[-1].split(".")[0] + extensions[os.environ["FSLOUTPUTTYPE"]]
+nib.save(nib.load(sys.argv[1]), output)
+"""
+
+
+def test_output_types(tmp_path, monkeypatch):
+    executable = tmp_path / "fslmaths"
+    executable.write_text(FAKE_FSLMATHS)
+    executable.chmod(0o755)
+    for task in (Threshold, Mul):
+        monkeypatch.setattr(task, "executable", str(executable))
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+
+    image, mask = tmp_path / "image.nii.gz", tmp_path / "mask.nii.gz"
+    nib.save(nib.Nifti1Image(np.ones((2, 2, 2), dtype=np.float32), np.eye(4)), image)
+    nib.save(nib.Nifti1Image(np.ones((2, 2, 2), dtype=np.uint8), np.eye(4)), mask)
+
+    wf = pydra.Workflow(
+        name="wf",
+        input_spec=["image", "mask"],
+        image=image,
+        mask=mask,
+        cache_dir=tmp_path / "cache",
+    )
+    wf.add(Threshold(name="threshold", input_image=wf.lzin.image, threshold=0.5))
+    wf.add(
+        Mul(
+            name="mask",
+            input_image=wf.threshold.lzout.output_image,
+            other_image=wf.lzin.mask,
+        )
+    )
+    wf.set_output([("masked", wf.mask.lzout.output_image)])
+    assert set_output_types(wf) == {"threshold": "NIFTI", "mask": "NIFTI_GZ"}
+
+    masked = wf(plugin="serial").output.masked
+    # The intermediate image is left uncompressed, and read as such downstream.
+    [thresholded] = (tmp_path / "cache").rglob("image_fslmaths.*")
+    assert thresholded.name == "image_fslmaths.nii"
+    assert os.path.basename(masked) == "image_fslmaths_fslmaths.nii.gz"
+    assert nib.load(masked).shape == (2, 2, 2)
+    assert os.environ["FSLOUTPUTTYPE"] == "NIFTI_GZ"
+
+
+def test_output_type_input(tmp_path, monkeypatch):
+    executable = tmp_path / "fslmaths"
+    executable.write_text(FAKE_FSLMATHS)
+    executable.chmod(0o755)
+    monkeypatch.setattr(Threshold, "executable", str(executable))
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI")
+    image = tmp_path / "image.nii"
+    nib.save(nib.Nifti1Image(np.ones((2, 2, 2), dtype=np.float32), np.eye(4)), image)
+
+    tasks = {
+        output_type: Threshold(
+            input_image=image,
+            threshold=0.5,
+            output_type=output_type,
+            cache_dir=tmp_path / "cache",
+        )
+        for output_type in ("NIFTI", "NIFTI_GZ")
+    }
+    # The output type is part of the checksum, so that results are not reused across.
+    assert tasks["NIFTI"].checksum != tasks["NIFTI_GZ"].checksum
+    assert tasks["NIFTI_GZ"].cmdline.startswith("env FSLOUTPUTTYPE=NIFTI_GZ ")
+
+    outputs = {name: task().output.output_image for name, task in tasks.items()}
+    assert os.path.basename(outputs["NIFTI"]) == "image_fslmaths.nii"
+    assert os.path.basename(outputs["NIFTI_GZ"]) == "image_fslmaths.nii.gz"
+    # The tool is given the output type in its own environment.
+    assert os.environ["FSLOUTPUTTYPE"] == "NIFTI"
+
+
+@pytest.mark.parametrize("backend", ["fsl", "numpy"])
+def test_parallel_compression(backend, tmp_path, monkeypatch):
+    executable = tmp_path / "fslmaths"
+    executable.write_text(FAKE_FSLMATHS)
+    executable.chmod(0o755)
+    monkeypatch.setattr(Threshold, "executable", str(executable))
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+    monkeypatch.setenv("PYDRA_FSL_COMPRESSION_THREADS", "2")
+
+    image = tmp_path / "image.nii.gz"
+    data = np.arange(64**3, dtype=np.float32).reshape((64, 64, 64))
+    nib.save(nib.Nifti1Image(data, np.eye(4)), image)
+
+    task = Threshold(
+        input_image=image, threshold=0.5, backend=backend, cache_dir=tmp_path
+    )
+    output_image = task().output.output_image
+
+    # The image written uncompressed is replaced by its compressed counterpart.
+    assert os.path.basename(output_image) == "image_fslmaths.nii.gz"
+    assert not list(task.output_dir.glob("*.nii"))
+    with gzip.open(output_image) as f:
+        assert f.read(4) == (348).to_bytes(4, "little")
+    assert np.array_equal(nib.load(output_image).get_fdata()[1:], data[1:])
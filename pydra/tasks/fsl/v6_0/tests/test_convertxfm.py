@@ -0,0 +1,141 @@
+import shutil
+
+import pytest
+
+from pydra.tasks.fsl.v6_0.flirt import ConcatXFM, ConvertXFM, FixScaleSkew, InvertXFM
+
+np = pytest.importorskip("numpy")
+
+from pydra.tasks.fsl.native.xfm import convert_xfm, read_matrix  # noqa: E402
+
+requires_convert_xfm = pytest.mark.skipif(
+    shutil.which("convert_xfm") is None, reason="convert_xfm is not available"
+)
+
+# Output of convert_xfm -omat output.mat -concat second.mat -inverse first.mat for the
+# matrices below: 10 significant digits, each value followed by two spaces.
+FIRST = "2  0  0  4  \n0  3  0  -1  \n0  0  0.5  1  \n0  0  0  1  \n"
+SECOND = "1  0  0  1  \n0  1  0  2  \n0  0  1  3  \n0  0  0  1  \n"
+CONVERT_XFM_OUTPUT = (
+    "0.5  0  0  -2.5  \n"
+    "0  0.3333333333  0  -0.3333333333  \n"
+    "0  0  2  -8  \n"
+    "0  0  0  1  \n"
+)
+
+
+def _affine(angle, scales, skews, translation):
+    cos, sin = np.cos(angle), np.sin(angle)
+    rotation = np.array([[cos, -sin, 0.0], [sin, cos, 0.0], [0.0, 0.0, 1.0]])
+    skew = np.eye(3)
+    skew[0, 1], skew[0, 2], skew[1, 2] = skews
+    affine = np.eye(4)
+    affine[:3, :3] = rotation @ skew @ np.diag(scales)
+    affine[:3, 3] = translation
+    return affine
+
+
+@pytest.fixture
+def matrices(tmp_path):
+    first = _affine(0.3, [1.1, 0.9, 1.2], [0.1, 0.05, -0.02], [1.0, 2.0, 3.0])
+    second = _affine(-0.7, [1.0, 1.3, 0.8], [0.0, 0.2, 0.1], [5.0, -5.0, 5.0])
+    paths = []
+    for name, matrix in (("first", first), ("second", second)):
+        np.savetxt(tmp_path / f"{name}.mat", matrix)
+        paths.append(tmp_path / f"{name}.mat")
+    return paths, first, second
+
+
+def _run(task_type, tmp_path, backend, **inputs):
+    result = task_type(backend=backend, cache_dir=tmp_path / backend, **inputs)()
+    return read_matrix(result.output.output_matrix)
+
+
+@pytest.mark.parametrize(
+    "task_type,field,expected",
+    [
+        (ConcatXFM, "concat_matrix", lambda first, second: second @ first),
+        (InvertXFM, None, lambda first, _: np.linalg.inv(first)),
+        (
+            FixScaleSkew,
+            "fixscaleskew_matrix",
+            lambda *_: _affine(0.3, [1.0, 1.3, 0.8], [0.0, 0.2, 0.1], [1.0, 2.0, 3.0]),
+        ),
+    ],
+)
+def test_numpy_convert_xfm(matrices, tmp_path, task_type, field, expected):
+    (first_path, second_path), first, second = matrices
+    inputs = {field: second_path} if field else {}
+
+    output = _run(task_type, tmp_path, "numpy", input_matrix=first_path, **inputs)
+
+    np.testing.assert_allclose(output, expected(first, second), atol=1e-6)
+
+
+def test_numpy_convert_xfm_format(tmp_path):
+    (tmp_path / "first.mat").write_text(FIRST)
+    (tmp_path / "second.mat").write_text(SECOND)
+
+    result = ConvertXFM(
+        input_matrix=tmp_path / "first.mat",
+        concat_matrix=tmp_path / "second.mat",
+        inverse=True,
+        backend="numpy",
+        cache_dir=tmp_path,
+    )()
+
+    with open(result.output.output_matrix, "rb") as f:
+        assert f.read() == CONVERT_XFM_OUTPUT.encode()
+
+
+def test_batch_convert_xfm(matrices, tmp_path):
+    (first_path, second_path), first, second = matrices
+    outputs = [tmp_path / f"output{index}.mat" for index in range(2)]
+
+    convert_xfm(
+        [first_path, second_path], outputs, concat_matrix=second_path, inverse=True
+    )
+
+    for path, matrix in zip(outputs, (first, second)):
+        expected = np.linalg.inv(second @ matrix)
+        np.testing.assert_allclose(read_matrix(path), expected, atol=1e-8)
+    assert (tmp_path / "output0.mat").read_text().endswith("0  0  0  1  \n")
+
+
+@requires_convert_xfm
+@pytest.mark.parametrize(
+    "task_type,inputs",
+    [
+        (ConcatXFM, lambda second: {"concat_matrix": second}),
+        (InvertXFM, lambda _: {}),
+        (FixScaleSkew, lambda second: {"fixscaleskew_matrix": second}),
+        (ConvertXFM, lambda second: {"concat_matrix": second, "inverse": True}),
+    ],
+)
+def test_parity(matrices, tmp_path, task_type, inputs):
+    (first_path, second_path), *_ = matrices
+    inputs = {"input_matrix": first_path, **inputs(second_path)}
+
+    expected = _run(task_type, tmp_path, "fsl", **inputs)
+    output = _run(task_type, tmp_path, "numpy", **inputs)
+
+    np.testing.assert_allclose(output, expected, atol=1e-6)
+
+
+@requires_convert_xfm
+def test_format_parity(tmp_path):
+    (tmp_path / "first.mat").write_text(FIRST)
+    (tmp_path / "second.mat").write_text(SECOND)
+    outputs = []
+    for backend in ("fsl", "numpy"):
+        result = ConvertXFM(
+            input_matrix=tmp_path / "first.mat",
+            concat_matrix=tmp_path / "second.mat",
+            inverse=True,
+            backend=backend,
+            cache_dir=tmp_path / backend,
+        )()
+        with open(result.output.output_matrix, "rb") as f:
+            outputs.append(f.read())
+
+    assert outputs[0] == outputs[1] == CONVERT_XFM_OUTPUT.encode()
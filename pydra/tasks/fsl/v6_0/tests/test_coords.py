@@ -0,0 +1,122 @@
+import pytest
+
+from pydra.tasks.fsl.v6_0.flirt import Img2ImgCoord, Img2StdCoord, Std2ImgCoord
+
+np = pytest.importorskip("numpy")
+nib = pytest.importorskip("nibabel")
+
+
+@pytest.fixture
+def images(tmp_path):
+    # A neurological functional image and a radiological standard image.
+    func_affine = np.diag([3.0, 3.0, 4.0, 1.0])
+    func_affine[:3, 3] = [-90.0, -90.0, -60.0]
+    std_affine = np.diag([-2.0, 2.0, 2.0, 1.0])
+    std_affine[:3, 3] = [90.0, -126.0, -72.0]
+
+    paths = {}
+    for name, shape, affine in (
+        ("func", (64, 64, 36), func_affine),
+        ("std", (91, 109, 91), std_affine),
+    ):
+        paths[name] = tmp_path / f"{name}.nii.gz"
+        nib.save(nib.Nifti1Image(np.zeros(shape, dtype=np.uint8), affine), paths[name])
+
+    matrix = np.eye(4)
+    matrix[:3, 3] = [1.0, 2.0, 3.0]
+    paths["matrix"] = tmp_path / "func2std.mat"
+    np.savetxt(paths["matrix"], matrix)
+
+    paths["coordinates"] = tmp_path / "coordinates.txt"
+    np.savetxt(paths["coordinates"], [[0.0, 0.0, 0.0], [10.0, 20.0, 30.0]])
+    return paths
+
+
+def _read(result, skiprows=0):
+    return np.loadtxt(result.output.output_coordinates, skiprows=skiprows, ndmin=2)
+
+
+def test_img2imgcoord(images, tmp_path):
+    result = Img2ImgCoord(
+        input_coordinates=images["coordinates"],
+        source_image=images["func"],
+        destination_image=images["std"],
+        affine_matrix=images["matrix"],
+        backend="numpy",
+        cache_dir=tmp_path,
+    )()
+
+    # The x axis of the functional image is flipped into FSL coordinates.
+    np.testing.assert_allclose(_read(result, skiprows=1)[0], [95.0, 1.0, 1.5])
+
+
+def test_std2img_roundtrip(images, tmp_path):
+    inputs = {
+        "input_image": images["func"],
+        "standard_image": images["std"],
+        "affine_matrix": images["matrix"],
+        "backend": "numpy",
+        "cache_dir": tmp_path,
+    }
+    std_coordinates = _read(
+        Img2StdCoord(input_coordinates=images["coordinates"], **inputs)()
+    )
+    np.testing.assert_allclose(std_coordinates[0], [-100.0, -124.0, -69.0])
+
+    np.savetxt(tmp_path / "std.txt", std_coordinates)
+    img_coordinates = _read(
+        Std2ImgCoord(input_coordinates=tmp_path / "std.txt", **inputs)()
+    )
+    np.testing.assert_allclose(img_coordinates, np.loadtxt(images["coordinates"]))
+
+
+def _warpfield(path, reference, shift, absolute=False):
+    # Constant displacement in scaled-voxel coordinates, on a radiological grid.
+    reference = nib.load(reference)
+    field = np.broadcast_to(np.float32(shift), reference.shape + (3,)).copy()
+    if absolute:
+        grid = np.indices(reference.shape, dtype=np.float32).transpose(1, 2, 3, 0)
+        field += grid * np.float32(reference.header.get_zooms())
+    nib.save(nib.Nifti1Image(field, reference.affine), path)
+    return path
+
+
+@pytest.mark.parametrize("absolute", [False, True])
+def test_warp_roundtrip(images, tmp_path, absolute):
+    inputs = {
+        "input_image": images["func"],
+        "standard_image": images["std"],
+        "input_warpfield": _warpfield(
+            tmp_path / "warp.nii", images["std"], [2.0, -4.0, 6.0], absolute
+        ),
+        "pre_affine_matrix": images["matrix"],
+        "backend": "numpy",
+        "cache_dir": tmp_path,
+    }
+    std_coordinates = _read(
+        Img2StdCoord(input_coordinates=images["coordinates"], **inputs)()
+    )
+    # The affine result, shifted back by the warp field (radiological x axis).
+    np.testing.assert_allclose(std_coordinates[0], [-98.0, -120.0, -75.0], atol=1e-3)
+
+    np.savetxt(tmp_path / "std.txt", std_coordinates)
+    img_coordinates = _read(
+        Std2ImgCoord(input_coordinates=tmp_path / "std.txt", **inputs)()
+    )
+    np.testing.assert_allclose(
+        img_coordinates, np.loadtxt(images["coordinates"]), atol=1e-3
+    )
+
+
+def test_warp_chunks(images, tmp_path):
+    from pydra.tasks.fsl.native.coords import warp_points_from_std
+
+    warpfield = _warpfield(tmp_path / "warp.nii", images["std"], [1.0, 2.0, 3.0])
+    points = np.random.default_rng(0).uniform(-80, 80, size=(1000, 3))
+    warped = [
+        warp_points_from_std(
+            points, images["func"], images["std"], warpfield, chunk_size=chunk_size
+        )
+        for chunk_size in (1000, 7)
+    ]
+    np.testing.assert_array_equal(*warped)
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from pydra.tasks.fsl import fingerprint
+
+
+@pytest.fixture(autouse=True)
+def index(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYDRA_FSL_FINGERPRINT_INDEX", str(tmp_path / "index.sqlite"))
+    fingerprint.clear_cache()
+    yield tmp_path / "index.sqlite"
+    fingerprint.clear_cache()
+
+
+@pytest.mark.parametrize("mode", fingerprint.MODES)
+def test_fingerprint(tmp_path, mode):
+    first, second = tmp_path / "first.bin", tmp_path / "second.bin"
+    first.write_bytes(os.urandom(3 << 20))
+    second.write_bytes(first.read_bytes())
+
+    assert fingerprint.fingerprint(first, mode=mode).startswith(f"{mode}:")
+    if mode != "stat":
+        # Identical contents, wherever they are.
+        assert fingerprint.fingerprint(first, mode) == fingerprint.fingerprint(
+            second, mode
+        )
+
+
+def test_index(tmp_path, monkeypatch):
+    path = tmp_path / "image.nii"
+    path.write_bytes(b"\0" * 1000)
+    digest = fingerprint.fingerprint(path, mode="full")
+
+    # Unchanged files are looked up in the index, in a new process or not.
+    fingerprint.clear_cache()
+    monkeypatch.setattr(fingerprint, "_full", None)
+    assert fingerprint.fingerprint(path, mode="full") == digest
+
+    path.write_bytes(b"\1" * 1000)
+    with pytest.raises(TypeError):
+        fingerprint.fingerprint(path, mode="full")
+
+
+def test_index_hash(tmp_path, monkeypatch):
+    path = tmp_path / "image.nii"
+    path.write_bytes(b"\0" * 1000)
+    digest = fingerprint.fingerprint(path, mode="full")
+
+    # Fingerprints recorded with another hash are not reused.
+    fingerprint.clear_cache()
+    monkeypatch.setattr(fingerprint, "_HASH", "other")
+    monkeypatch.setattr(fingerprint, "_full", lambda path, size: b"\1")
+    assert fingerprint.fingerprint(path, mode="full") == "full:01"
+    assert digest != "full:01"
+
+
+def test_no_index(tmp_path, monkeypatch):
+    monkeypatch.delenv("PYDRA_FSL_FINGERPRINT_INDEX")
+    monkeypatch.setattr(fingerprint, "_index", None)
+    path = tmp_path / "image.nii"
+    path.write_bytes(b"\0" * 1000)
+
+    # Without an index, fingerprints are only memoized by the process.
+    digest = fingerprint.fingerprint(path, mode="full")
+    monkeypatch.setattr(fingerprint, "_full", None)
+    assert fingerprint.fingerprint(path, mode="full") == digest
+    assert os.listdir(tmp_path) == ["image.nii"]
+
+
+def test_pydra_hash(tmp_path, monkeypatch):
+    from fileformats.medimage import Nifti1
+    from pydra.utils.hash import hash_function
+
+    monkeypatch.setenv("PYDRA_FSL_FINGERPRINT", "sampled")
+    fingerprint.register_image_hashing()
+    header = b"\x5c\x01\x00\x00" + b"\0" * 340 + b"n+1\0"
+    path = tmp_path / "image.nii"
+    path.write_bytes(header)
+    before = hash_function(Nifti1(path))
+
+    path.write_bytes(header + b"\1")
+    assert hash_function(Nifti1(path)) != before
@@ -0,0 +1,64 @@
+import shutil
+
+import attrs
+import pytest
+
+from pydra.tasks.fsl.v6_0.utils.info import Info, _parse_fslinfo, info_table
+
+np = pytest.importorskip("numpy")
+nib = pytest.importorskip("nibabel")
+
+requires_fslinfo = pytest.mark.skipif(
+    shutil.which("fslinfo") is None, reason="fslinfo is not available"
+)
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "image.nii.gz"
+    data = np.zeros((4, 5, 6, 7), dtype=np.int16)
+    nib.save(nib.Nifti1Image(data, np.diag([2.0, 2.0, 3.0, 1.0])), path)
+    return path
+
+
+def _outputs(image, tmp_path, backend):
+    result = Info(input_image=image, backend=backend, cache_dir=tmp_path / backend)()
+    return {
+        name: value
+        for name, value in attrs.asdict(result.output).items()
+        if name not in {"return_code", "stdout", "stderr"}
+    }
+
+
+def test_numpy_info(image, tmp_path):
+    outputs = _outputs(image, tmp_path, "numpy")
+
+    assert outputs["data_type"] == "INT16"
+    assert [outputs[f"dim{i}"] for i in range(1, 5)] == [4, 5, 6, 7]
+    assert [outputs[f"pixdim{i}"] for i in range(1, 4)] == [2.0, 2.0, 3.0]
+    assert outputs["file_type"] == "NIFTI-1+"
+
+
+def test_info_table(image, tmp_path):
+    pair = tmp_path / "pair.img"
+    nib.save(nib.Nifti1Pair(np.zeros((4, 5, 6), dtype=np.float32), np.eye(4)), pair)
+
+    table = info_table([image, pair])
+
+    assert table["image"] == [str(image), str(pair)]
+    assert table["data_type"] == ["INT16", "FLOAT32"]
+    assert table["dim4"] == [7, 1]
+    assert table["file_type"] == ["NIFTI-1+", "NIFTI-1"]
+
+
+@requires_fslinfo
+def test_parity(image, tmp_path):
+    assert _outputs(image, tmp_path, "numpy") == _outputs(image, tmp_path, "fsl")
+
+
+def test_parse_fslinfo():
+    # Columns separated by tabs, as by some versions of fslinfo.
+    fields = _parse_fslinfo("data_type\tFLOAT32\ndim1\t\t64\n\npixdim1  2.000000\n")
+    assert dict(fields) == {"data_type": "FLOAT32", "dim1": 64, "pixdim1": 2.0}
+    with pytest.raises(TypeError):
+        fields["dim1"] = 32
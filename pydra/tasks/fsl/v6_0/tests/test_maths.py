@@ -0,0 +1,105 @@
+import shutil
+
+import pytest
+
+from pydra.tasks.fsl.v6_0.maths import Maths, Mul, Threshold
+
+np = pytest.importorskip("numpy")
+nib = pytest.importorskip("nibabel")
+
+requires_fslmaths = pytest.mark.skipif(
+    shutil.which("fslmaths") is None, reason="fslmaths is not available"
+)
+
+
+@pytest.fixture
+def images(tmp_path):
+    rng = np.random.default_rng(0)
+    affine = np.diag([2.0, 2.0, 2.0, 1.0])
+
+    input_image = tmp_path / "input.nii.gz"
+    data = rng.normal(loc=0.5, scale=1.0, size=(8, 9, 10, 4)).astype(np.float32)
+    nib.save(nib.Nifti1Image(data, affine), input_image)
+
+    mask_image = tmp_path / "mask.nii.gz"
+    mask = (rng.random((8, 9, 10)) > 0.5).astype(np.uint8)
+    nib.save(nib.Nifti1Image(mask, affine), mask_image)
+
+    return {"input_image": input_image, "mask_image": mask_image}
+
+
+def _run(task_type, tmp_path, backend, **inputs):
+    task = task_type(backend=backend, cache_dir=tmp_path / backend, **inputs)
+    result = task()
+    image = nib.load(result.output.output_image)
+    return image.get_data_dtype(), np.asanyarray(image.dataobj)
+
+
+def test_numpy_mul(images, tmp_path):
+    dtype, data = _run(
+        Mul,
+        tmp_path,
+        "numpy",
+        input_image=images["input_image"],
+        other_image=images["mask_image"],
+    )
+
+    expected = nib.load(images["input_image"]).get_fdata(dtype=np.float32)
+    expected *= nib.load(images["mask_image"]).get_fdata(dtype=np.float32)[..., None]
+    assert dtype == np.float32
+    np.testing.assert_allclose(data, expected)
+
+
+@requires_fslmaths
+@pytest.mark.parametrize(
+    "task_type,inputs",
+    [
+        (Maths, {}),
+        (Maths, {"output_datatype": "short"}),
+        (Maths, {"internal_datatype": "double", "output_datatype": "double"}),
+        (Mul, {"other_image": "mask_image"}),
+        (Mul, {"other_image": "mask_image", "output_datatype": "char"}),
+        (Threshold, {"threshold": 0.3}),
+        (Threshold, {"threshold": 0.3, "output_datatype": "int"}),
+    ],
+)
+def test_parity(images, tmp_path, task_type, inputs):
+    inputs = {k: images.get(v, v) for k, v in inputs.items()}
+    inputs["input_image"] = images["input_image"]
+
+    expected_dtype, expected = _run(task_type, tmp_path, "fsl", **inputs)
+    dtype, data = _run(task_type, tmp_path, "numpy", **inputs)
+
+    assert dtype == expected_dtype
+    np.testing.assert_allclose(data, expected, rtol=1e-6)
+
+
+def _run_chain(images, tmp_path, backend):
+    task = (
+        Maths.chain(input_image=images["input_image"], backend=backend)
+        .mul(images["mask_image"])
+        .thr(0.3)
+        .bin()
+        .task(cache_dir=tmp_path / backend)
+    )
+    image = nib.load(task().output.output_image)
+    return image.get_data_dtype(), np.asanyarray(image.dataobj)
+
+
+def test_numpy_chain(images, tmp_path):
+    dtype, data = _run_chain(images, tmp_path, "numpy")
+
+    expected = nib.load(images["input_image"]).get_fdata(dtype=np.float32)
+    expected *= nib.load(images["mask_image"]).get_fdata(dtype=np.float32)[..., None]
+    expected = (expected >= 0.3).astype(np.float32)
+    assert dtype == np.float32
+    np.testing.assert_array_equal(data, expected)
+
+
+@requires_fslmaths
+def test_chain_parity(images, tmp_path):
+    expected_dtype, expected = _run_chain(images, tmp_path, "fsl")
+    dtype, data = _run_chain(images, tmp_path, "numpy")
+
+    assert dtype == expected_dtype
+    np.testing.assert_array_equal(data, expected)
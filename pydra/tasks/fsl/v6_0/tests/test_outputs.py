@@ -0,0 +1,79 @@
+import os
+from glob import glob
+
+import attrs
+import pytest
+
+from pydra.tasks.fsl.outputs import cache_outputs, clear_outputs_cache
+
+
+@attrs.define
+class Inputs:
+    in_file: str
+    out_prefix: str = "out"
+
+
+calls = []
+
+
+# Resolves outputs by globbing the output directory, as the callables of bedpostx,
+# fast or randomise do.
+@cache_outputs
+def _list_outputs(inputs=None, stdout=None, stderr=None, output_dir=None):
+    calls.append(output_dir)
+    pattern = os.path.join(output_dir, f"{inputs.out_prefix}_*.nii.gz")
+    return {"out_files": sorted(glob(pattern)), "log_file": stdout.strip()}
+
+
+def out_files_callable(output_dir, inputs, stdout, stderr):
+    outputs = _list_outputs(
+        output_dir=output_dir, inputs=inputs, stdout=stdout, stderr=stderr
+    )
+    return outputs["out_files"]
+
+
+def log_file_callable(output_dir, inputs, stdout, stderr):
+    outputs = _list_outputs(
+        output_dir=output_dir, inputs=inputs, stdout=stdout, stderr=stderr
+    )
+    return outputs["log_file"]
+
+
+@pytest.fixture(autouse=True)
+def _clear():
+    calls.clear()
+    clear_outputs_cache()
+    yield
+    clear_outputs_cache()
+
+
+def test_outputs_shared_within_run(tmp_path):
+    (tmp_path / "out_0.nii.gz").touch()
+    run = {"output_dir": tmp_path, "inputs": Inputs("in.nii.gz"), "stdout": "log\n"}
+
+    assert out_files_callable(stderr="", **run) == [str(tmp_path / "out_0.nii.gz")]
+    # The second output field of the same run reuses the resolved outputs.
+    assert log_file_callable(stderr="", **run) == "log"
+    assert len(calls) == 1
+
+
+def test_outputs_recomputed(tmp_path):
+    (tmp_path / "out_0.nii.gz").touch()
+    inputs = Inputs("in.nii.gz")
+    run = {"output_dir": tmp_path, "stdout": "", "stderr": ""}
+    assert len(out_files_callable(inputs=inputs, **run)) == 1
+
+    # Files added to the output directory, e.g. by a rerun, invalidate the outputs.
+    mtime = os.stat(tmp_path).st_mtime_ns
+    (tmp_path / "out_1.nii.gz").touch()
+    os.utime(tmp_path, ns=(mtime + 1, mtime + 1))
+    assert len(out_files_callable(inputs=inputs, **run)) == 2
+    assert len(calls) == 2
+
+    # As do other inputs, other streams and other output directories.
+    out_files_callable(inputs=Inputs("in.nii.gz", "other"), **run)
+    log_file_callable(inputs=inputs, **{**run, "stdout": "other"})
+    other = tmp_path / "other"
+    other.mkdir()
+    assert out_files_callable(inputs=inputs, **{**run, "output_dir": other}) == []
+    assert len(calls) == 5
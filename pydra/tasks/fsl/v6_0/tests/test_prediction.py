@@ -0,0 +1,51 @@
+import json
+
+import nibabel as nib
+import numpy as np
+
+from pydra.tasks.fsl.prediction import Predictor, main
+from pydra.tasks.fsl.usage import USAGE_FILE, input_geometry
+from pydra.tasks.fsl.v6_0.bet import BET
+
+
+def _record(directory, voxels, wall_time, peak_rss, return_code=0):
+    directory.mkdir(parents=True)
+    record = {
+        "task": "BET",
+        "return_code": return_code,
+        "geometry": {"voxels": voxels, "volumes": 1, "bytes_per_voxel": 4},
+        "usage": {"wall_time": wall_time, "peak_rss": peak_rss},
+    }
+    (directory / USAGE_FILE).write_text(json.dumps(record))
+
+
+def test_refit(tmp_path, monkeypatch, capsys):
+    # Runs using 100 MiB plus 16 bytes per voxel, with some noise.
+    for index, (voxels, noise) in enumerate(
+        [(10**6, 1.0), (2 * 10**6, 1.1), (4 * 10**6, 0.9), (6 * 10**6, 1.0)]
+        + [(8 * 10**6, 1.05), (9 * 10**6, 0.95)]
+    ):
+        memory = (100 * 2**20 + 16 * voxels) * noise
+        _record(tmp_path / "cache" / f"BET_{index}", voxels, voxels / 1e5, memory)
+    # Failed runs are not learnt from.
+    _record(tmp_path / "cache" / "BET_failed", 10**6, 1e6, 1e12, return_code=1)
+
+    path = tmp_path / "predictor.json"
+    assert main(["--output", str(path), str(tmp_path / "cache")]) == 0
+    assert capsys.readouterr().out.startswith("BET: runtime margin 1.00")
+
+    runtime, memory = Predictor.load(path).models["BET"]
+    assert 1.0 < memory.margin < 1.2
+    geometry = {"voxels": 5 * 10**6, "volumes": 1, "bytes_per_voxel": 4}
+    assert np.isclose(runtime(geometry), 50)
+    assert 100 * 2**20 + 16 * 5 * 10**6 < memory(geometry) < 2**30
+
+    # Hinted tasks request the predicted resources.
+    image = tmp_path / "image.nii.gz"
+    nib.save(nib.Nifti1Image(np.zeros((200, 200, 125), dtype=np.float32), None), image)
+    task = BET(input_image=image)
+    assert input_geometry(task) == geometry
+    assert task.qsub_args == "-pe smp 1 -l mem_free=1G"
+    monkeypatch.setenv("PYDRA_FSL_PREDICTOR", str(path))
+    assert task.resources.runtime == "seconds"
+    assert 0.1 < task.resources.memory_gb < 1
@@ -0,0 +1,130 @@
+import os
+import sys
+
+import nibabel as nib
+import numpy as np
+import pytest
+
+from pydra.tasks.fsl.native.probtrackx import merge_shards, split_seeds
+from pydra.tasks.fsl.v6_0.probtrackx2 import ProbTrackX2, sharded_probtrackx2
+
+# Stand-in for probtrackx2, each seed reaching its own voxel and the first of matrix3.
+FAKE_PROBTRACKX2 = f"""#!{sys.executable}
+import os
+import sys
+import nibabel as nib
+import numpy as np
+
+args = dict(arg.split("=", 1) for arg in sys.argv[1:] if "=" in arg)
+os.makedirs(args["--dir"], exist_ok=True)
+seed = nib.load(args["--seed"])
+data = np.asanyarray(seed.dataobj)
+nib.save(seed, os.path.join(args["--dir"], "fdt_paths.nii.gz"))
+
+voxels = np.flatnonzero(data.ravel(order="F"))
+with open(os.path.join(args["--dir"], "waytotal"), "w") as f:
+    f.write(f"{{len(voxels)}}\\n")
+with open(os.path.join(args["--dir"], "fdt_matrix2.dot"), "w") as f:
+    for row, voxel in enumerate(voxels, 1):
+        f.write(f"{{row}} {{voxel + 1}} 1\\n")
+    f.write(f"{{len(voxels)}} {{data.size}} 0\\n")
+with open(os.path.join(args["--dir"], "fdt_matrix3.dot"), "w") as f:
+    f.write(f"1 1 {{len(voxels)}}\\n2 2 0\\n")
+"""
+
+
+def _mask(path, data):
+    nib.save(nib.Nifti1Image(np.asarray(data, dtype=np.uint8), np.eye(4)), path)
+    return path
+
+
+def test_split_seeds(tmp_path, monkeypatch):
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+    data = np.zeros((3, 2, 2))
+    data[[0, 2, 1, 0, 2], [0, 0, 1, 1, 1], [0, 0, 0, 1, 1]] = 1
+    seeds, num_seeds = split_seeds(
+        _mask(tmp_path / "seed.nii.gz", data), 2, output_dir=tmp_path
+    )
+    assert num_seeds == [2, 3]
+    shards = [np.asanyarray(nib.load(path).dataobj) for path in seeds]
+    assert np.array_equal(sum(shards), data)
+    # Shards are contiguous in the x-fastest order of probtrackx2.
+    assert np.flatnonzero(shards[0].ravel(order="F")).tolist() == [0, 2]
+
+    (tmp_path / "seeds.txt").write_text("1 1 1\n2 2 2\n3 3 3\n")
+    seeds, num_seeds = split_seeds(
+        tmp_path / "seeds.txt", 4, simple=True, output_dir=tmp_path
+    )
+    assert num_seeds == [1, 1, 1]
+    assert seeds[2].read_text() == "3 3 3\n"
+
+
+def test_merge_shards(tmp_path):
+    for index, (rows, matrix3) in enumerate(((2, "1 1 2\n1 2 1\n"), (1, "1 1 3\n"))):
+        shard = tmp_path / f"shard{index}"
+        shard.mkdir()
+        _mask(shard / "fdt_paths.nii.gz", np.full((2, 2, 2), index + 1))
+        (shard / "waytotal").write_text(f"{rows * 10}\n")
+        (shard / "fdt_matrix2.dot").write_text(
+            "".join(f"{row} 2 1\n" for row in range(1, rows + 1)) + f"{rows} 4 0\n"
+        )
+        (shard / "fdt_matrix3.dot").write_text(matrix3 + "3 3 0\n")
+
+    outputs = merge_shards(
+        [tmp_path / "shard0", tmp_path / "shard1"], [2, 1], output_dir=tmp_path
+    )
+
+    assert np.allclose(nib.load(outputs["fdt_paths"]).get_fdata(), 3)
+    assert outputs["way_total"].read_text() == "30\n"
+    assert outputs["matrix2_dot"].read_text() == "1 2 1\n2 2 1\n3 2 1\n3 4 0\n"
+    assert outputs["matrix3_dot"].read_text() == "1 1 5\n1 2 1\n3 3 0\n"
+
+    (tmp_path / "shard0" / "fdt_matrix1.dot").write_text("1 1 1\n")
+    with pytest.raises(ValueError, match="fdt_matrix1"):
+        merge_shards([tmp_path / "shard0", tmp_path / "shard1"], [2, 1], tmp_path)
+
+
+@pytest.mark.parametrize("matrices", [("", "1 2 4\n"), ("", "")])
+def test_merge_empty_shards(tmp_path, matrices):
+    # Shards whose seeds reach no pair of target voxels only record the shape.
+    for index, matrix3 in enumerate(matrices):
+        shard = tmp_path / f"shard{index}"
+        shard.mkdir()
+        (shard / "fdt_matrix3.dot").write_text(matrix3 + "5 5 0\n")
+
+    outputs = merge_shards(
+        [tmp_path / "shard0", tmp_path / "shard1"], [1, 1], output_dir=tmp_path
+    )
+
+    assert outputs["matrix3_dot"].read_text() == matrices[1] + "5 5 0\n"
+
+
+def test_sharded_probtrackx2(tmp_path, monkeypatch):
+    executable = tmp_path / "probtrackx2"
+    executable.write_text(FAKE_PROBTRACKX2)
+    executable.chmod(0o755)
+    monkeypatch.setattr(ProbTrackX2, "executable", str(executable))
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+
+    data = np.zeros((4, 3, 2))
+    data[1:, 1:, :] = 1
+    wf = sharded_probtrackx2(
+        name="tractography",
+        num_shards=3,
+        samples=str(tmp_path / "merged"),
+        mask=str(_mask(tmp_path / "mask.nii.gz", np.ones((4, 3, 2)))),
+        seed=str(_mask(tmp_path / "seed.nii.gz", data)),
+        cache_dir=tmp_path / "cache",
+    )
+    outputs = wf(plugin="serial").output
+
+    # Merged outputs are those of a single run over all seeds.
+    assert np.array_equal(nib.load(outputs.fdt_paths).get_fdata(), data)
+    assert open(outputs.way_total).read() == "12\n"
+    voxels = np.flatnonzero(data.ravel(order="F")) + 1
+    entries = np.loadtxt(outputs.matrix2_dot)
+    assert entries[:-1, 0].tolist() == list(range(1, 13))
+    assert entries[:-1, 1].tolist() == voxels.tolist()
+    assert open(outputs.matrix3_dot).read() == "1 1 12\n2 2 0\n"
+    assert outputs.targets == []
+    assert os.path.basename(outputs.fdt_paths) == "fdt_paths.nii.gz"
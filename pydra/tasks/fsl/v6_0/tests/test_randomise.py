@@ -0,0 +1,116 @@
+import os
+import sys
+
+import nibabel as nib
+import numpy as np
+import pytest
+
+from pydra.tasks.fsl.native.randomise import merge_shards, parse_output_name
+from pydra.tasks.fsl.v6_0.randomise import Randomise, sharded_randomise
+
+# Stand-in for randomise, permutations of each seed drawing 0.5 + seed, 1.5 + seed...
+FAKE_RANDOMISE = f"""#!{sys.executable}
+import sys
+import nibabel as nib
+import numpy as np
+
+args = sys.argv[1:]
+basename = args[args.index("-o") + 1]
+count = int(args[args.index("-n") + 1])
+seed = int(next(arg for arg in args if arg.startswith("--seed="))[7:])
+
+def save(data, suffix):
+    image = nib.Nifti1Image(np.asarray(data, dtype=np.float32), np.eye(4))
+    nib.save(image, f"{{basename}}_{{suffix}}.nii.gz")
+
+null = [3.0] + [0.5 + seed + index for index in range(count - 1)]
+observed = np.array([1.0, 2.0, 3.0])
+save(observed, "tstat1")
+save(1 - (null >= observed[:, None]).sum(1) / count, "vox_p_tstat1")
+save(np.zeros(3), "vox_corrp_tstat1")
+np.savetxt(f"{{basename}}_vox_corrp_tstat1.txt", null)
+np.savetxt(f"{{basename}}_perm_tstat1.txt", np.ones((count, 2)))
+"""
+
+
+def _image(path, data):
+    nib.save(nib.Nifti1Image(np.asarray(data, dtype=np.float32), np.eye(4)), path)
+    return str(path)
+
+
+def test_parse_output_name():
+    parsed = parse_output_name("stats_tfce_corrp_fstat2.nii.gz")
+    assert (parsed.basename, parsed.kind, parsed.test, parsed.stat, parsed.ext) == (
+        "stats",
+        "tfce",
+        "corrp",
+        "fstat2",
+        ".nii.gz",
+    )
+    assert parse_output_name("stats_perm_tstat1.txt").test is None
+
+
+def test_merge_shards(tmp_path):
+    shards = []
+    for index, (null, counts) in enumerate(
+        (([3.0, 1.5, 2.5], [3, 2, 1]), ([3.0, 0.5, 3.5], [2, 1, 1]))
+    ):
+        shard = tmp_path / f"shard{index}"
+        shard.mkdir()
+        np.savetxt(shard / "stats_vox_corrp_tstat1.txt", null)
+        shards.append(
+            [
+                _image(shard / "stats_tstat1.nii.gz", [1.0, 2.0, 3.0]),
+                _image(shard / "stats_vox_p_tstat1.nii.gz", 1 - np.divide(counts, 3)),
+                _image(shard / "stats_vox_corrp_tstat1.nii.gz", [0.0, 0.0, 0.0]),
+                str(shard / "stats_vox_corrp_tstat1.txt"),
+            ]
+        )
+
+    outputs = merge_shards(shards, [3, 3], output_dir=tmp_path / "merged")
+    assert len(outputs) == 4
+
+    # Both runs count as a single one over 5 permutations, including the unpermuted.
+    merged = tmp_path / "merged"
+    null = np.loadtxt(merged / "stats_vox_corrp_tstat1.txt")
+    assert sorted(null) == [0.5, 1.5, 2.5, 3.0, 3.5]
+    p = nib.load(merged / "stats_vox_p_tstat1.nii.gz").get_fdata()
+    assert np.allclose(p, [0.2, 0.6, 0.8])
+    corrp = nib.load(merged / "stats_vox_corrp_tstat1.nii.gz").get_fdata()
+    assert np.allclose(corrp, [0.2, 0.4, 0.6])
+
+
+def test_merge_shards_cluster(tmp_path):
+    path = _image(tmp_path / "stats_clustere_corrp_tstat1.nii.gz", [0.0])
+    with pytest.raises(ValueError, match="voxelwise and TFCE"):
+        merge_shards([[path], [path]], [2, 2], output_dir=tmp_path / "merged")
+
+
+def test_sharded_randomise(tmp_path, monkeypatch):
+    executable = tmp_path / "randomise"
+    executable.write_text(FAKE_RANDOMISE)
+    executable.chmod(0o755)
+    monkeypatch.setattr(Randomise, "executable", str(executable))
+
+    input_image = _image(tmp_path / "input.nii.gz", np.zeros((3, 2)))
+    wf = sharded_randomise(
+        name="stats",
+        num_shards=2,
+        num_permutations=5,
+        input_image=input_image,
+        voxel_p_values=True,
+        cache_dir=tmp_path / "cache",
+    )
+    result = wf(plugin="serial")
+
+    assert [os.path.basename(path) for path in result.output.output_files] == [
+        "randomise_tstat1.nii.gz",
+        "randomise_vox_corrp_tstat1.nii.gz",
+        "randomise_vox_corrp_tstat1.txt",
+        "randomise_vox_p_tstat1.nii.gz",
+    ]
+    assert result.output.t_corrected_p_images == [result.output.output_files[1]]
+
+    # Two shards of 3 permutations each, with the unpermuted design counted once.
+    null = np.loadtxt(result.output.output_files[2])
+    assert list(null) == [3.0, 0.5, 1.5, 1.5, 2.5]
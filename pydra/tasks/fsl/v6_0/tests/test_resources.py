@@ -0,0 +1,29 @@
+from pydra.tasks.fsl.resources import resource_hints
+from pydra.tasks.fsl.v6_0.eddy import Eddy
+from pydra.tasks.fsl.v6_0.fnirt import FNIRT
+
+
+def test_thread_variables():
+    inputs = {"reference_image": "template.nii", "input_image": "input.nii"}
+    assert FNIRT(**inputs).cmdline.startswith("fnirt ")
+
+    task = FNIRT(num_threads=4, **inputs)
+    assert task.cmdline.startswith("env OMP_NUM_THREADS=4 fnirt ")
+    assert resource_hints(task).threads == 4
+
+
+def test_thread_flag():
+    task = Eddy(
+        input_image="dwi.nii",
+        brain_mask="mask.nii",
+        encoding_file="acqp.txt",
+        index_file="index.txt",
+        bvec_file="dwi.bvec",
+        bval_file="dwi.bval",
+        num_threads=8,
+    )
+    assert "--nthr=8" in task.cmdline
+    assert task.qsub_args == "-pe smp 8 -l mem_free=8G"
+
+    task.qsub_args = "-pe smp 16"
+    assert task.qsub_args == "-pe smp 16"
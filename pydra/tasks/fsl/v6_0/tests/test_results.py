@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+from pydra.tasks.fsl.environment import use_output_type
+from pydra.tasks.fsl.results import ResultStore, task_key
+from pydra.tasks.fsl.v6_0.bet import BET
+
+# Stand-in for bet, recording its calls next to itself.
+FAKE_BET = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls"
+cp "$1" "$2"
+"""
+
+
+def test_result_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYDRA_FSL_RESULT_STORE", str(tmp_path / "store"))
+    executable = tmp_path / "bet"
+    executable.write_text(FAKE_BET)
+    executable.chmod(0o755)
+
+    # Identical inputs at different locations, run from different cache directories.
+    for study in ("study1", "study2"):
+        (tmp_path / study).mkdir()
+        input_image = tmp_path / study / "t1.nii"
+        input_image.write_bytes(b"t1")
+        result = BET(
+            input_image=input_image,
+            executable=str(executable),
+            cache_dir=tmp_path / study / "cache",
+        )()
+        output_image = Path(result.output.output_image)
+        assert output_image.read_bytes() == b"t1"
+        assert str(output_image).startswith(str(tmp_path / study))
+
+    assert len((tmp_path / "calls").read_text().splitlines()) == 1
+
+
+def test_task_key_output_type(tmp_path, monkeypatch):
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+    (tmp_path / "t1.nii").write_bytes(b"t1")
+    task = BET(input_image=tmp_path / "t1.nii", cache_dir=tmp_path)
+
+    # Output types overridden in-process are part of the key.
+    key = task_key(task)
+    with use_output_type("NIFTI_GZ"):
+        assert task_key(task) == key
+    with use_output_type("NIFTI"):
+        assert task_key(task) != key
+
+
+def _save(store, tmp_path, key, content):
+    output_dir = tmp_path / key
+    output_dir.mkdir()
+    (output_dir / "out.nii").write_bytes(content)
+    (output_dir / "_task.pklz").write_bytes(content)
+    store.save(key, output_dir, {"return_code": 0, "stdout": "", "stderr": ""})
+
+
+def test_evict(tmp_path):
+    store = ResultStore(tmp_path / "store", max_size=10)
+    for key, content in (("aa01", b"12345678"), ("aa02", b"87654321")):
+        _save(store, tmp_path, key, content)
+
+    # Only the most recent result fits, pydra files not being stored.
+    assert store.fetch("aa01", tmp_path / "fetched") is None
+    assert store.fetch("aa02", tmp_path / "fetched") is not None
+    assert sorted(os.listdir(tmp_path / "fetched")) == ["out.nii"]
+
+
+def test_running_total(tmp_path, monkeypatch):
+    store = ResultStore(tmp_path / "store", max_size=40)
+    scans = []
+    entries = ResultStore._entries
+    monkeypatch.setattr(
+        ResultStore, "_entries", lambda self: scans.append(1) or entries(self)
+    )
+
+    # Results are only scanned to initialise the running total, then once exceeded.
+    for index in range(5):
+        _save(store, tmp_path, f"aa{index:02d}", b"12345678")
+    assert len(scans) == 1
+    assert (store.root / "size").read_text() == "40"
+
+    # Evicted down to 90% of the maximum size, so that later saves do not scan.
+    _save(store, tmp_path, "aa05", b"12345678")
+    assert len(scans) == 2
+    assert (store.root / "size").read_text() == "32"
+    _save(store, tmp_path, "aa06", b"12345678")
+    assert len(scans) == 2
+    assert store.fetch("aa01", tmp_path / "fetched") is None
+    assert store.fetch("aa02", tmp_path / "fetched") is not None
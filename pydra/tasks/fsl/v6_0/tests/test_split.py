@@ -0,0 +1,35 @@
+import pytest
+
+from pydra.tasks.fsl.v6_0.utils.split import _get_output_images
+
+np = pytest.importorskip("numpy")
+nib = pytest.importorskip("nibabel")
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "input.nii.gz"
+    nib.save(nib.Nifti1Image(np.zeros((4, 5, 6, 3), dtype=np.float32), np.eye(4)), path)
+    return path
+
+
+@pytest.mark.parametrize("direction,count", [("x", 4), ("z", 6), ("t", 3)])
+def test_output_images(image, tmp_path, monkeypatch, direction, count):
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+    output_dir = tmp_path / "outputs"
+    output_dir.mkdir()
+    expected = [output_dir / f"vol{index:04d}.nii.gz" for index in range(count)]
+    for path in expected:
+        path.touch()
+    # Unrelated files sharing the basename must not be collected.
+    (output_dir / "vol_mean.nii.gz").touch()
+
+    assert _get_output_images("vol", image, direction, output_dir) == expected
+
+
+def test_missing_output_images(image, tmp_path, monkeypatch):
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+    (tmp_path / "vol0000.nii.gz").touch()
+
+    with pytest.raises(FileNotFoundError, match="2 expected output images"):
+        _get_output_images("vol", image, "t", tmp_path)
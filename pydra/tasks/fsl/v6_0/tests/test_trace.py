@@ -0,0 +1,64 @@
+import json
+import sys
+
+import nibabel as nib
+import numpy as np
+
+from pydra.tasks.fsl.v6_0.maths import Threshold
+from pydra.tasks.fsl.v6_0.utils import Reorient2Std
+
+# Stand-in for fslreorient2std, writing its outputs.
+FAKE_REORIENT2STD = f"""#!{sys.executable}
+import sys
+
+open(sys.argv[2], "w").close()
+open(sys.argv[-1], "w").close()
+"""
+
+
+def _events(path):
+    # The array is left open, which trace viewers accept.
+    events = {}
+    for event in json.loads(path.read_text().rstrip(",\n") + "]"):
+        events.setdefault(event["cat"], event)
+    return events
+
+
+def _within(inner, outer):
+    end = inner["ts"] + inner["dur"]
+    return outer["ts"] <= inner["ts"] and end <= outer["ts"] + outer["dur"]
+
+
+def test_trace(tmp_path, monkeypatch):
+    executable = tmp_path / "fslreorient2std"
+    executable.write_text(FAKE_REORIENT2STD)
+    executable.chmod(0o755)
+    monkeypatch.setattr(Reorient2Std, "executable", str(executable))
+    monkeypatch.setenv("PYDRA_FSL_TRACE", str(tmp_path / "trace.json"))
+    (tmp_path / "image.nii").touch()
+
+    task = Reorient2Std(
+        name="reorient", input_image=tmp_path / "image.nii", cache_dir=tmp_path
+    )
+    task()
+
+    events = _events(tmp_path / "trace.json")
+    assert set(events) == {"init", "cmdline", "run", "validate", "execute", "outputs"}
+    assert events["execute"]["name"] == "Reorient2Std.execute"
+    assert all(event["args"]["node"] == "reorient" for event in events.values())
+    for phase in ("validate", "execute", "outputs"):
+        assert _within(events[phase], events["run"])
+    assert events["validate"]["ts"] < events["execute"]["ts"]
+
+
+def test_trace_numpy_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYDRA_FSL_TRACE", str(tmp_path / "trace.json"))
+    image = tmp_path / "image.nii"
+    nib.save(nib.Nifti1Image(np.ones((2, 2, 2), dtype=np.float32), np.eye(4)), image)
+
+    Threshold(input_image=image, threshold=0.5, backend="numpy", cache_dir=tmp_path)()
+
+    # In-process work is attributed to the execution of the task.
+    events = _events(tmp_path / "trace.json")
+    assert events["execute"]["name"] == "Threshold.execute"
+    assert _within(events["execute"], events["run"])
@@ -0,0 +1,73 @@
+import json
+import sys
+
+import pytest
+
+from pydra.tasks.fsl.usage import USAGE_FILE
+from pydra.tasks.fsl.v6_0.utils import Reorient2Std
+
+# Stand-in for fslreorient2std, holding 64 MiB and writing 1 MiB.
+FAKE_REORIENT2STD = f"""#!{sys.executable}
+import sys
+
+memory = bytearray(64 * 2**20)
+with open(sys.argv[-1], "wb") as f:
+    f.write(bytes(2**20))
+open(sys.argv[2], "w").close()
+if sys.argv[-2].endswith("fail.nii"):
+    sys.exit(3)
+"""
+
+
+@pytest.fixture
+def reorient2std(tmp_path, monkeypatch):
+    executable = tmp_path / "fslreorient2std"
+    executable.write_text(FAKE_REORIENT2STD)
+    executable.chmod(0o755)
+    monkeypatch.setattr(Reorient2Std, "executable", str(executable))
+    (tmp_path / "image.nii").touch()
+    (tmp_path / "fail.nii").touch()
+    return tmp_path
+
+
+def test_usage_disabled(reorient2std, monkeypatch):
+    monkeypatch.delenv("PYDRA_FSL_RESOURCE_USAGE", raising=False)
+    task = Reorient2Std(
+        input_image=reorient2std / "image.nii", cache_dir=reorient2std / "cache"
+    )
+    outputs = task().output
+    assert outputs.wall_time is None
+    assert outputs.peak_rss is None
+    assert outputs.resource_usage is None
+
+
+def test_usage(reorient2std, monkeypatch):
+    monkeypatch.setenv("PYDRA_FSL_RESOURCE_USAGE", "1")
+    task = Reorient2Std(
+        input_image=reorient2std / "image.nii", cache_dir=reorient2std / "cache"
+    )
+    outputs = task().output
+    assert outputs.return_code == 0
+    assert outputs.wall_time >= outputs.user_time > 0
+    assert outputs.system_time >= 0
+    assert outputs.peak_rss > 64 * 2**20
+    assert outputs.bytes_written >= 2**20
+    assert outputs.bytes_read > 0
+
+    record = json.loads(outputs.resource_usage.read_text())
+    assert outputs.resource_usage.name == USAGE_FILE
+    assert record["return_code"] == 0
+    assert record["usage"]["peak_rss"] == outputs.peak_rss
+
+
+def test_usage_failure(reorient2std, monkeypatch):
+    monkeypatch.setenv("PYDRA_FSL_RESOURCE_USAGE", "1")
+    task = Reorient2Std(
+        input_image=reorient2std / "fail.nii", cache_dir=reorient2std / "cache"
+    )
+    with pytest.raises(Exception, match="Error running"):
+        task()
+    # The usage of failed runs is recorded all the same, e.g. to diagnose them.
+    record = json.loads((task.output_dir / USAGE_FILE).read_text())
+    assert record["return_code"] == 3
+    assert record["usage"]["peak_rss"] > 64 * 2**20
@@ -0,0 +1,130 @@
+import os
+import resource
+
+import pytest
+
+from pydra.tasks.fsl.native.volumes import merge
+from pydra.tasks.fsl.v6_0.utils import ROI, Merge, SelectVols, Split
+
+np = pytest.importorskip("numpy")
+nib = pytest.importorskip("nibabel")
+
+
+@pytest.fixture
+def image(tmp_path, monkeypatch):
+    monkeypatch.setenv("FSLOUTPUTTYPE", "NIFTI_GZ")
+    path = tmp_path / "input.nii"
+    data = np.arange(4 * 5 * 6 * 7, dtype=np.int16).reshape(4, 5, 6, 7)
+    nib.save(nib.Nifti1Image(data, np.diag([2.0, 2.0, 3.0, 1.0])), path)
+    return path, data
+
+
+def _load(path):
+    image = nib.load(path)
+    return image, np.asanyarray(image.dataobj)
+
+
+def test_split_merge(image, tmp_path):
+    path, data = image
+
+    # Outputs are left to their templates, Merge's lacking an extension.
+    result = Split(input_image=path, backend="numpy", cache_dir=tmp_path)()
+    assert len(result.output.output_images) == 7
+    assert os.path.basename(result.output.output_images[3]) == "input0003.nii.gz"
+    _, volume = _load(result.output.output_images[3])
+    np.testing.assert_array_equal(volume, data[..., 3])
+
+    result = Merge(
+        input_images=result.output.output_images,
+        dimension="t",
+        backend="numpy",
+        cache_dir=tmp_path,
+    )()
+    assert os.path.basename(result.output.output_image) == "merged.nii.gz"
+    merged, merged_data = _load(result.output.output_image)
+    assert merged.get_data_dtype() == np.int16
+    np.testing.assert_array_equal(merged_data, data)
+
+
+@pytest.mark.parametrize("dimension,axis", [("x", 0), ("z", 2), ("tr", 3)])
+def test_merge(image, tmp_path, dimension, axis):
+    path, data = image
+
+    result = Merge(
+        input_images=[path, path],
+        dimension=dimension,
+        repetition_time=2.5,
+        output_image="merged.nii.gz",
+        backend="numpy",
+        cache_dir=tmp_path,
+    )()
+    merged, merged_data = _load(result.output.output_image)
+    np.testing.assert_array_equal(merged_data, np.concatenate([data, data], axis))
+    assert merged.header.get_zooms() == (2.0, 2.0, 3.0, 2.5)
+
+
+def test_merge_many_inputs(tmp_path):
+    # More inputs than files the process may open at once.
+    open_files = len(os.listdir("/proc/self/fd"))
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    paths = []
+    for index in range(open_files + 100):
+        paths.append(tmp_path / f"vol{index:04d}.nii")
+        data = np.full((2, 2, 2), index, dtype=np.int16)
+        nib.save(nib.Nifti1Image(data, np.eye(4)), paths[-1])
+
+    resource.setrlimit(resource.RLIMIT_NOFILE, (open_files + 50, hard))
+    try:
+        output = merge(paths, tmp_path / "merged.nii")
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    _, merged = _load(output)
+    np.testing.assert_array_equal(merged[0, 0, 0], np.arange(len(paths)))
+
+
+def test_roi(image, tmp_path):
+    path, data = image
+
+    result = ROI(
+        input_image=path,
+        x_min=1,
+        x_size=2,
+        y_min=0,
+        y_size=-1,
+        z_min=2,
+        z_size=3,
+        t_min=5,
+        backend="numpy",
+        cache_dir=tmp_path,
+    )()
+    assert os.path.basename(result.output.output_image) == "input_roi.nii"
+    roi, roi_data = _load(result.output.output_image)
+    np.testing.assert_array_equal(roi_data, data[1:3, :, 2:5, 5:])
+    # The cropped voxels keep their world coordinates.
+    np.testing.assert_array_equal(roi.affine[:3, 3], [2.0, 0.0, 6.0])
+
+
+@pytest.mark.parametrize(
+    "inputs,expected",
+    [
+        ({}, lambda data: data[..., [6, 0, 2]]),
+        ({"calculate_mean": True}, lambda data: data[..., [6, 0, 2]].mean(axis=-1)),
+        (
+            {"calculate_variance": True},
+            lambda data: data[..., [6, 0, 2]].var(axis=-1, ddof=1),
+        ),
+    ],
+)
+def test_select_volumes(image, tmp_path, inputs, expected):
+    path, data = image
+
+    result = SelectVols(
+        input_image=path,
+        volumes=[6, 0, 2],
+        backend="numpy",
+        cache_dir=tmp_path,
+        **inputs,
+    )()
+    assert os.path.basename(result.output.output_image) == "input_selectvols.nii"
+    _, selected = _load(result.output.output_image)
+    np.testing.assert_allclose(selected, expected(data), rtol=1e-6)
@@ -18,7 +18,7 @@ Utils
 
 from .chfiletype import ChFileType
 from .fft import FFT
-from .info import Info
+from .info import Info, info_table
 from .interleave import Interleave
 from .merge import Merge
 from .orient import Orient
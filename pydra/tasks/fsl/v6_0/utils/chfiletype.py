@@ -21,6 +21,10 @@ from attrs import define, field
 from pydra.engine.specs import File, ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 ALLOWED_FILETYPES = {
     "ANALYZE",
     "ANALYZE_GZ",
@@ -97,7 +101,7 @@ class ChFileTypeOutSpec(ShellOutSpec):
     )
 
 
-class ChFileType(ShellCommandTask):
+class ChFileType(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslchfiletype."""
 
     executable = "fslchfiletype"
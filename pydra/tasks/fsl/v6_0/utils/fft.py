@@ -28,6 +28,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class FFTSpec(ShellSpec):
@@ -50,7 +54,7 @@ class FFTSpec(ShellSpec):
     )
 
 
-class FFT(ShellCommandTask):
+class FFT(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslfft."""
 
     executable = "fslfft"
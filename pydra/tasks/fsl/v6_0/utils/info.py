@@ -3,17 +3,161 @@ Info
 ====
 
 Read essential metadata from the header of a NIfTI image.
+
+Examples
+--------
+
+>>> task = Info(input_image="image.nii.gz")
+>>> task.cmdline
+'fslinfo image.nii.gz'
+
+The header can also be parsed in-process, without running fslinfo:
+
+>>> task = Info(input_image="image.nii.gz", backend="numpy")
+>>> result = task()  # doctest: +SKIP
+>>> result.output.dim4  # doctest: +SKIP
+300
+
+Sweep over many images at once, collecting the fields of each image into columns:
+
+>>> table = info_table(["sub-01.nii.gz", "sub-02.nii.gz"])  # doctest: +SKIP
+>>> table["dim4"]  # doctest: +SKIP
+[300, 280]
 """
 
-__all__ = ["Info"]
+__all__ = ["Info", "info_table"]
 
-import re
+import functools
+import os
+import types
+import typing as ty
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
 
 from attrs import define, field
 from pydra.engine.specs import ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...backends import NativeBackendMixin
+from ...compression import OutputTypeMixin
+from ...nifti import NiftiHeader, read_header
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
+#: Names of NIfTI data type codes, as reported by fslinfo.
+DATA_TYPES = {
+    0: "UNKNOWN",
+    1: "BINARY",
+    2: "UINT8",
+    4: "INT16",
+    8: "INT32",
+    16: "FLOAT32",
+    32: "COMPLEX64",
+    64: "FLOAT64",
+    128: "RGB24",
+    256: "INT8",
+    512: "UINT16",
+    768: "UINT32",
+    1024: "INT64",
+    1280: "UINT64",
+    1536: "FLOAT128",
+    1792: "COMPLEX128",
+    2048: "COMPLEX256",
+    2304: "RGBA32",
+}
+
+#: Fields reported by fslinfo, in order, with their type.
+FIELDS = {
+    "data_type": str,
+    "dim1": int,
+    "dim2": int,
+    "dim3": int,
+    "dim4": int,
+    "datatype": int,
+    "pixdim1": float,
+    "pixdim2": float,
+    "pixdim3": float,
+    "pixdim4": float,
+    "cal_max": float,
+    "cal_min": float,
+    "file_type": str,
+}
+
+
+def _file_type(header: NiftiHeader) -> str:
+    if header.version == 0:
+        return "ANALYZE-7.5"
+    return f"NIFTI-{header.version}{'+' if header.single_file else ''}"
+
+
+def _header_fields(header: NiftiHeader) -> ty.Dict[str, ty.Any]:
+    """Return the fields reported by fslinfo from a parsed header."""
+    # Unused dimensions are reported with a size and spacing of 1, as fslinfo does.
+    shape = header.shape + (1,) * (4 - len(header.shape))
+    pixdim = header.pixdim + (1.0,) * (4 - len(header.pixdim))
+    return {
+        "data_type": DATA_TYPES.get(header.datatype, "UNKNOWN"),
+        **{f"dim{i + 1}": shape[i] for i in range(4)},
+        "datatype": header.datatype,
+        **{f"pixdim{i + 1}": pixdim[i] for i in range(4)},
+        "cal_max": header.cal_max,
+        "cal_min": header.cal_min,
+        "file_type": _file_type(header),
+    }
+
+
+def _format_fslinfo(fields: ty.Dict[str, ty.Any]) -> str:
+    lines = []
+    for name, value in fields.items():
+        if isinstance(value, float):
+            value = f"{value:.6f}"
+        lines.append(f"{name:<15}{value}")
+    return "\n".join(lines) + "\n"
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_fslinfo(stdout: str) -> ty.Mapping[str, ty.Any]:
+    # Parse the whole report once, the output callables only looking up their field.
+    fields = {}
+    for line in stdout.splitlines():
+        # Columns are padded with spaces or tabs, depending on the version of fslinfo.
+        columns = line.split(None, 1)
+        if len(columns) == 2 and columns[0] in FIELDS:
+            name, value = columns
+            fields[name] = FIELDS[name](value.strip())
+    # Read-only, as the same fields are returned to every caller.
+    return types.MappingProxyType(fields)
+
+
+def info_table(
+    images: ty.Iterable[PathLike], max_workers: ty.Optional[int] = None
+) -> ty.Dict[str, list]:
+    """Read the fslinfo fields of many images in-process.
+
+    Parameters
+    ----------
+    images : iterable of path-like
+        Images to read the header of.
+    max_workers : int, optional
+        Number of threads reading headers concurrently, defaults to the heuristic of
+        :class:`concurrent.futures.ThreadPoolExecutor`.
+
+    Returns
+    -------
+    dict of str to list
+        Columns of the table, keyed by field name, with the paths to the images in the
+        ``image`` column.
+    """
+    images = [os.fspath(image) for image in images]
+    table = {"image": images, **{name: [] for name in FIELDS}}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for header in executor.map(read_header, images):
+            for name, value in _header_fields(header).items():
+                table[name].append(value)
+
+    return table
+
 
 @define(slots=False, kw_only=True)
 class InfoSpec(ShellSpec):
@@ -23,6 +167,14 @@ class InfoSpec(ShellSpec):
         metadata={"help_string": "input image", "mandatory": True, "argstr": ""}
     )
 
+    backend: str = field(
+        default="fsl",
+        metadata={
+            "help_string": "run fslinfo (fsl) or read the header in-process (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
 
 @define(kw_only=True)
 class InfoOutSpec(ShellOutSpec):
@@ -31,118 +183,102 @@ class InfoOutSpec(ShellOutSpec):
     data_type: str = field(
         metadata={
             "help_string": "data type string",
-            "callable": lambda stdout: re.search(r"data_type\s*(.*)", stdout).group(1),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["data_type"],
         }
     )
 
     dim1: int = field(
         metadata={
             "help_string": "array size in 1st dimension",
-            "callable": lambda stdout: int(
-                re.search(r"\sdim1\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["dim1"],
         }
     )
 
     dim2: int = field(
         metadata={
             "help_string": "array size in 2nd dimension",
-            "callable": lambda stdout: int(
-                re.search(r"\sdim2\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["dim2"],
         }
     )
 
     dim3: int = field(
         metadata={
             "help_string": "array size in 3rd dimension",
-            "callable": lambda stdout: int(
-                re.search(r"\sdim3\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["dim3"],
         }
     )
 
     dim4: int = field(
         metadata={
             "help_string": "array size in 4th dimension",
-            "callable": lambda stdout: int(
-                re.search(r"\sdim4\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["dim4"],
         }
     )
 
     datatype: int = field(
         metadata={
             "help_string": "data type code",
-            "callable": lambda stdout: int(
-                re.search(r"datatype\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["datatype"],
         }
     )
 
     pixdim1: float = field(
         metadata={
             "help_string": "pixel spacing in 1st dimension",
-            "callable": lambda stdout: float(
-                re.search(r"pixdim1\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["pixdim1"],
         }
     )
 
     pixdim2: float = field(
         metadata={
             "help_string": "pixel spacing in 2nd dimension",
-            "callable": lambda stdout: float(
-                re.search(r"pixdim2\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["pixdim2"],
         }
     )
 
     pixdim3: float = field(
         metadata={
             "help_string": "pixel spacing in 3rd dimension",
-            "callable": lambda stdout: float(
-                re.search(r"pixdim3\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["pixdim3"],
         }
     )
 
     pixdim4: float = field(
         metadata={
             "help_string": "pixel spacing in 4th dimension",
-            "callable": lambda stdout: float(
-                re.search(r"pixdim4\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["pixdim4"],
         }
     )
 
     cal_max: float = field(
         metadata={
             "help_string": "maximum display intensity",
-            "callable": lambda stdout: float(
-                re.search(r"cal_max\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["cal_max"],
         }
     )
 
     cal_min: float = field(
         metadata={
             "help_string": "minimum display intensity",
-            "callable": lambda stdout: float(
-                re.search(r"cal_min\s*(.*)", stdout).group(1)
-            ),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["cal_min"],
         }
     )
 
     file_type: str = field(
         metadata={
             "help_string": "NIfTI file type",
-            "callable": lambda stdout: re.search(r"file_type\s*(.*)", stdout).group(1),
+            "callable": lambda stdout: _parse_fslinfo(stdout)["file_type"],
         }
     )
 
 
-class Info(ShellCommandTask):
+class Info(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for fslinfo."""
 
     executable = "fslinfo"
@@ -150,3 +286,8 @@ class Info(ShellCommandTask):
     input_spec = SpecInfo(name="Input", bases=(InfoSpec,))
 
     output_spec = SpecInfo(name="Output", bases=(InfoOutSpec,))
+
+    def _run_native(self):
+        # Render the report of fslinfo, so that outputs are collected the same way.
+        header = read_header(self.inputs.input_image)
+        return _format_fslinfo(_header_fields(header))
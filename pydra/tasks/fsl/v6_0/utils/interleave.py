@@ -31,6 +31,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class InterleaveSpec(ShellSpec):
@@ -57,7 +61,7 @@ class InterleaveSpec(ShellSpec):
     )
 
 
-class Interleave(ShellCommandTask):
+class Interleave(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslinterleave."""
 
     executable = "fslinterleave"
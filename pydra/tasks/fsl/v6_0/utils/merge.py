@@ -19,6 +19,11 @@ from attrs import define, field
 from pydra.engine.specs import File, ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...backends import NativeBackendMixin, value_or_none
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class MergeSpec(ShellSpec):
@@ -66,10 +71,37 @@ class MergeSpec(ShellSpec):
         }
     )
 
+    backend: str = field(
+        default="fsl",
+        metadata={
+            "help_string": "run fslmerge (fsl) or process the images in-process (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
 
-class Merge(ShellCommandTask):
+class Merge(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for fslmerge."""
 
     executable = "fslmerge"
 
     input_spec = SpecInfo(name="Input", bases=(MergeSpec,))
+
+    image_outputs = ("output_image",)
+
+    def _run_native(self):
+        from ...native.volumes import merge
+
+        merge(
+            self.inputs.input_images,
+            self._output_path("output_image"),
+            dimension=value_or_none(self.inputs.dimension) or "t",
+            repetition_time=value_or_none(self.inputs.repetition_time),
+            volume_index=value_or_none(self.inputs.volume_index),
+        )
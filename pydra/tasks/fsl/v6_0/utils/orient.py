@@ -41,6 +41,10 @@ from attrs import define, field
 from pydra.engine.specs import File, ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class OrientSpec(ShellSpec):
@@ -108,7 +112,7 @@ class OrientOutSpec(ShellOutSpec):
     )
 
 
-class Orient(ShellCommandTask):
+class Orient(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslorient."""
 
     executable = "fslorient"
@@ -21,6 +21,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class Reorient2StdSpec(ShellSpec):
@@ -54,7 +58,7 @@ class Reorient2StdSpec(ShellSpec):
     )
 
 
-class Reorient2Std(ShellCommandTask):
+class Reorient2Std(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslreorient2std."""
 
     executable = "fslreorient2std"
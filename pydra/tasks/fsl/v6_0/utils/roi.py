@@ -36,6 +36,11 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...backends import NativeBackendMixin, is_set
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class ROISpec(ShellSpec):
@@ -113,10 +118,42 @@ class ROISpec(ShellSpec):
         metadata={"help_string": "size of ROI in t (-1 for maximum)", "argstr": ""},
     )
 
+    backend: str = field(
+        default="fsl",
+        metadata={
+            "help_string": "run fslroi (fsl) or process the images in-process (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
 
-class ROI(ShellCommandTask):
+class ROI(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for fslroi."""
 
     executable = "fslroi"
 
     input_spec = SpecInfo(name="Input", bases=(ROISpec,))
+
+    image_outputs = ("output_image",)
+
+    def _run_native(self):
+        from ...native.volumes import roi
+
+        bounds = {
+            name: getattr(self.inputs, name)
+            for name in ("x_min", "x_size", "y_min", "y_size", "z_min", "z_size")
+            if is_set(getattr(self.inputs, name))
+        }
+        roi(
+            self.inputs.input_image,
+            self._output_path("output_image"),
+            t_min=self.inputs.t_min,
+            t_size=self.inputs.t_size,
+            **bounds,
+        )
@@ -43,6 +43,11 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...backends import NativeBackendMixin
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class SelectVolsSpec(ShellSpec):
@@ -86,10 +91,37 @@ class SelectVolsSpec(ShellSpec):
         }
     )
 
+    backend: str = field(
+        default="fsl",
+        metadata={
+            "help_string": "run fslselectvols (fsl) or process the images in-process (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
 
-class SelectVols(ShellCommandTask):
+class SelectVols(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for fslselectvols."""
 
     executable = "fslselectvols"
 
     input_spec = SpecInfo(name="Input", bases=(SelectVolsSpec,))
+
+    image_outputs = ("output_image",)
+
+    def _run_native(self):
+        from ...native.volumes import select_volumes
+
+        select_volumes(
+            self.inputs.input_image,
+            self._output_path("output_image"),
+            self.inputs.volumes,
+            calculate_mean=self.inputs.calculate_mean is True,
+            calculate_variance=self.inputs.calculate_variance is True,
+        )
@@ -18,6 +18,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class SmoothFillSpec(ShellSpec):
@@ -44,7 +48,7 @@ class SmoothFillSpec(ShellSpec):
     )
 
 
-class SmoothFill(ShellCommandTask):
+class SmoothFill(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslsmoothfill."""
 
     executable = "fslsmoothfill"
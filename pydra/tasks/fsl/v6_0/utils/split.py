@@ -11,10 +11,17 @@ Examples
 >>> task = Slice(input_image="volume.nii", output_basename="slice")
 >>> task.cmdline
 'fslsplit volume.nii slice -z'
+
+Output images are named after the size of the input image along the split direction,
+as read from its header, and the extension of ``$FSLOUTPUTTYPE``:
+
+>>> _get_output_names("vol", "input.nii.gz", "t")  # doctest: +SKIP
+['vol0000.nii.gz', 'vol0001.nii.gz', 'vol0002.nii.gz']
 """
 
 __all__ = ["Split", "Slice"]
 
+import os
 from os import PathLike
 from pathlib import Path
 
@@ -22,15 +29,45 @@ from attrs import define, field
 from pydra.engine.specs import MultiOutputFile, ShellOutSpec, ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...backends import NativeBackendMixin
+from ...compression import OutputTypeMixin
+from ...environment import output_type, output_type_to_ext
+from ...nifti import image_shape
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
+_AXES = {"x": 0, "y": 1, "z": 2, "t": 3}
+
 
 def _get_output_basename(output_basename, input_image):
     return output_basename or Path(input_image).name.split(".", 1)[0]
 
 
-def _get_output_images(output_basename, input_image):
+def _get_output_names(output_basename, input_image, direction):
+    # fslsplit numbers its outputs with 4 digits along the split axis.
     output_basename = _get_output_basename(output_basename, input_image)
+    shape = image_shape(input_image) + (1,) * 4
+    ext = output_type_to_ext(output_type())
+    return [
+        f"{output_basename}{index:04d}{ext}" for index in range(shape[_AXES[direction]])
+    ]
+
+
+def _get_output_images(output_basename, input_image, direction, output_dir):
+    output_names = _get_output_names(output_basename, input_image, direction)
+
+    # Check the expected outputs against a single listing of the output directory,
+    # ignoring unrelated files which would share the same basename.
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
+    missing = [name for name in output_names if name not in existing]
+    if missing:
+        raise FileNotFoundError(
+            f"fslsplit did not produce {len(missing)} expected output images "
+            f"in {output_dir}: {', '.join(missing[:5])}"
+        )
 
-    return sorted(Path.cwd().glob(f"{output_basename}*.*"))
+    return [Path(output_dir) / name for name in output_names]
 
 
 @define(kw_only=True)
@@ -54,6 +91,14 @@ class SplitSpec(ShellSpec):
         },
     )
 
+    backend: str = field(
+        default="fsl",
+        metadata={
+            "help_string": "run fslsplit (fsl) or process the images in-process (numpy)",
+            "allowed_values": {"fsl", "numpy"},
+        },
+    )
+
 
 @define(slots=False, kw_only=True)
 class SplitOutSpec(ShellOutSpec):
@@ -64,7 +109,13 @@ class SplitOutSpec(ShellOutSpec):
     )
 
 
-class Split(ShellCommandTask):
+class Split(
+    TraceMixin,
+    OutputTypeMixin,
+    NativeBackendMixin,
+    ResourceUsageMixin,
+    ShellCommandTask,
+):
     """Task definition for fslsplit."""
 
     executable = "fslsplit"
@@ -73,6 +124,16 @@ class Split(ShellCommandTask):
 
     output_spec = SpecInfo(name="Output", bases=(SplitOutSpec,))
 
+    def _run_native(self):
+        from ...native.volumes import split
+
+        split(
+            self.inputs.input_image,
+            _get_output_basename(self.inputs.output_basename, self.inputs.input_image),
+            direction=self.inputs.direction,
+            output_dir=self.output_dir,
+        )
+
 
 @define(kw_only=True)
 class SliceSpec(SplitSpec):
@@ -33,6 +33,10 @@ from attrs import define, field
 from pydra.engine.specs import ShellSpec, SpecInfo
 from pydra.engine.task import ShellCommandTask
 
+from ...compression import OutputTypeMixin
+from ...trace import TraceMixin
+from ...usage import ResourceUsageMixin
+
 
 @define(kw_only=True)
 class SwapDimSpec(ShellSpec):
@@ -80,7 +84,7 @@ class SwapDimSpec(ShellSpec):
     )
 
 
-class SwapDim(ShellCommandTask):
+class SwapDim(TraceMixin, OutputTypeMixin, ResourceUsageMixin, ShellCommandTask):
     """Task definition for fslswapdim."""
 
     executable = "fslswapdim"
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import statistics
+import subprocess
+import sys
+import click
+
+BASELINE_STATEMENT = "import pydra.engine"
+
+TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def time_statement(statement: str) -> float:
+    """Time a statement in a fresh interpreter, so that imports start cold."""
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", TIMER.format(statement=statement)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+@click.command(
+    help="""Measure the cold start time of importing tasks from pydra.tasks.fsl, net of
+the time taken to import pydra itself.
+
+STATEMENTS the import statements to time, e.g. "from pydra.tasks.fsl import BET"
+"""
+)
+@click.argument("statements", nargs=-1)
+@click.option(
+    "--repeat", "-n", type=int, default=5, help="number of cold starts per statement"
+)
+@click.option(
+    "--max-overhead",
+    type=float,
+    default=None,
+    help="fail if the median overhead (in seconds) of any statement exceeds this value",
+)
+def benchmark_import(statements, repeat: int, max_overhead: float):
+    if not statements:
+        statements = (
+            "import pydra.tasks.fsl",
+            "from pydra.tasks.fsl import BET",
+            "from pydra.tasks.fsl.latest import *",
+        )
+
+    baseline = statistics.median(
+        time_statement(BASELINE_STATEMENT) for _ in range(repeat)
+    )
+    click.echo(f"{BASELINE_STATEMENT!r}: {baseline * 1000:.1f} ms (baseline)")
+
+    failed = False
+    for statement in statements:
+        # Import pydra beforehand so that only the overhead of the tasks is measured.
+        median = statistics.median(
+            time_statement(f"{BASELINE_STATEMENT}\n{statement}") for _ in range(repeat)
+        )
+        overhead = max(median - baseline, 0.0)
+        click.echo(f"{statement!r}: {overhead * 1000:.1f} ms")
+        if max_overhead is not None and overhead > max_overhead:
+            failed = True
+
+    if failed:
+        raise click.ClickException(
+            f"import overhead exceeds the {max_overhead * 1000:.1f} ms limit"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_import()